@@ -0,0 +1,25 @@
+"""Add jobs.idempotency_fingerprint for Idempotency-Key replay checks
+
+Revision ID: 20261019_0002
+Revises: 20250913_0001
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261019_0002"
+down_revision: str | None = "20250913_0001"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("idempotency_fingerprint", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("jobs", "idempotency_fingerprint")
@@ -0,0 +1,37 @@
+"""Add archived_jobs index for cold-archived terminal jobs
+
+Revision ID: 20261019_0004
+Revises: 20261019_0003
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261019_0004"
+down_revision: str | None = "20261019_0003"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "archived_jobs",
+        sa.Column("job_id", pg.UUID(as_uuid=True), primary_key=True),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("s3_key", sa.Text(), nullable=False),
+        sa.Column("job_created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("job_updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("archived_jobs_archived_at_idx", "archived_jobs", ["archived_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("archived_jobs_archived_at_idx", table_name="archived_jobs")
+    op.drop_table("archived_jobs")
@@ -0,0 +1,43 @@
+"""Partial indexes on jobs for active counts and completion windows (GET /v1/jobs/stats)
+
+Revision ID: 20261019_0005
+Revises: 20261019_0004
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261019_0005"
+down_revision: str | None = "20261019_0004"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction; it avoids blocking job writes while building
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "jobs_active_idx",
+            "jobs",
+            ["status", "type", "created_at"],
+            postgresql_where=sa.text("status IN ('queued','running')"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "jobs_finished_idx",
+            "jobs",
+            ["updated_at"],
+            postgresql_where=sa.text("status IN ('succeeded','failed')"),
+            postgresql_include=["status", "type", "created_at"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("jobs_finished_idx", table_name="jobs", postgresql_concurrently=True)
+        op.drop_index("jobs_active_idx", table_name="jobs", postgresql_concurrently=True)
@@ -0,0 +1,28 @@
+"""Add jobs.priority (high|normal|low) selecting the broker queue
+
+Revision ID: 20261019_0006
+Revises: 20261019_0005
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261019_0006"
+down_revision: str | None = "20261019_0005"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade() -> None:
+    # A constant server default is a metadata-only change on Postgres 11+ (no table rewrite)
+    op.add_column("jobs", sa.Column("priority", sa.String(), nullable=False, server_default="normal"))
+    op.create_check_constraint("jobs_priority_check", "jobs", "priority in ('high','normal','low')")
+
+
+def downgrade() -> None:
+    op.drop_constraint("jobs_priority_check", "jobs", type_="check")
+    op.drop_column("jobs", "priority")
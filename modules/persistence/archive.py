@@ -0,0 +1,232 @@
+"""Cold archival of terminal jobs to object storage.
+
+Jobs that finished (``succeeded``/``failed``) more than N days ago are exported with
+their steps, artifact metadata and events as one gzip'd NDJSON object per job::
+
+    archive/jobs/<YYYY>/<MM>/<DD>/<job_id>.ndjson.gz    (date = job updated_at, UTC)
+
+Each line is ``{"table": "<name>", "row": {...}}``; the job line comes first. After the
+upload an ``archived_jobs`` index row is written and the live rows are deleted, one
+bounded batch per transaction. Artifact image objects are left in place.
+
+``get_job_detail`` reads an archived job back in the same shape as
+``repos.get_job_detail`` so ``GET /v1/jobs/{id}`` can fall back transparently.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import uuid as _uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import DateTime, delete, select
+
+from modules.storage import s3 as s3mod
+
+from . import repos
+from .db import get_read_session, get_session
+from .models import ArchivedJob, Artifact, Base, Event, Job, Step
+
+ARCHIVE_PREFIX = "archive/jobs"
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+# Keys are released on archival; the hash is binary and meaningless outside the DB
+_SKIP_COLUMNS = {"idempotency_key_hash"}
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass
+class ArchiveReport:
+    cutoff: str
+    dry_run: bool
+    archived: int = 0
+    batches: int = 0
+    keys: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ArchivedJobDoc:
+    job: dict[str, Any]
+    steps: list[dict[str, Any]]
+    artifacts: list[dict[str, Any]]
+    events: list[dict[str, Any]]
+
+
+def archive_key(job_id: str | _uuid.UUID, finished_at: datetime) -> str:
+    day = repos._as_utc(finished_at)
+    return f"{ARCHIVE_PREFIX}/{day:%Y/%m/%d}/{job_id}.ndjson.gz"
+
+
+def _row_dict(obj: Base) -> dict[str, Any]:
+    return {c.key: getattr(obj, c.key) for c in obj.__table__.columns if c.key not in _SKIP_COLUMNS}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return repos._as_utc(value).isoformat()
+    if isinstance(value, _uuid.UUID):
+        return str(value)
+    raise TypeError(f"not JSON serializable: {type(value).__name__}")
+
+
+def encode_job(job: Job, steps: Iterable[Step], artifacts: Iterable[Artifact], events: Iterable[Event]) -> bytes:
+    lines = [json.dumps({"table": "jobs", "row": _row_dict(job)}, default=_json_default)]
+    for table, rows in (("steps", steps), ("artifacts", artifacts), ("events", events)):
+        lines.extend(json.dumps({"table": table, "row": _row_dict(r)}, default=_json_default) for r in rows)
+    return gzip.compress(("\n".join(lines) + "\n").encode("utf-8"))
+
+
+def decode_job(data: bytes) -> ArchivedJobDoc:
+    tables: dict[str, list[dict[str, Any]]] = {"jobs": [], "steps": [], "artifacts": [], "events": []}
+    for line in gzip.decompress(data).decode("utf-8").splitlines():
+        if line.strip():
+            rec = json.loads(line)
+            tables.setdefault(rec["table"], []).append(rec["row"])
+    return ArchivedJobDoc(job=tables["jobs"][0], steps=tables["steps"], artifacts=tables["artifacts"], events=tables["events"])
+
+
+def _archive_batch(session, cfg: s3mod.S3Config, cutoff: datetime, batch_size: int, dry_run: bool) -> list[str]:
+    jobs = session.scalars(
+        select(Job)
+        .where(Job.status.in_(TERMINAL_STATUSES), Job.updated_at < cutoff)
+        .order_by(Job.updated_at.asc())
+        .limit(batch_size)
+    ).all()
+    if not jobs:
+        return []
+    ids = [j.id for j in jobs]
+    by_job: dict[str, dict[str, list]] = {str(i): {"steps": [], "artifacts": [], "events": []} for i in ids}
+    for table, model, order in (
+        ("steps", Step, Step.created_at),
+        ("artifacts", Artifact, Artifact.item_index),
+        ("events", Event, Event.ts),
+    ):
+        for row in session.scalars(select(model).where(model.job_id.in_(ids)).order_by(order.asc())):
+            by_job[str(row.job_id)][table].append(row)
+
+    keys = []
+    for job in jobs:
+        key = archive_key(job.id, job.updated_at)
+        keys.append(key)
+        if dry_run:
+            continue
+        rows = by_job[str(job.id)]
+        data = encode_job(job, rows["steps"], rows["artifacts"], rows["events"])
+        s3mod.upload_bytes(cfg, key, data, content_type="application/gzip")
+        session.merge(
+            ArchivedJob(
+                job_id=job.id,
+                type=job.type,
+                status=job.status,
+                s3_key=key,
+                job_created_at=job.created_at,
+                job_updated_at=job.updated_at,
+            )
+        )
+    if dry_run:
+        return keys
+
+    # Children first: SQLite does not enforce ON DELETE CASCADE without a pragma
+    session.flush()
+    session.execute(delete(Event).where(Event.job_id.in_(ids)))
+    session.execute(delete(Artifact).where(Artifact.job_id.in_(ids)))
+    session.execute(delete(Step).where(Step.job_id.in_(ids)))
+    session.execute(delete(Job).where(Job.id.in_(ids)))
+    return keys
+
+
+def run_archive(
+    *,
+    older_than_days: float,
+    batch_size: int = 100,
+    max_batches: int | None = None,
+    dry_run: bool = False,
+    now: datetime | None = None,
+) -> ArchiveReport:
+    """Archive terminal jobs last updated more than ``older_than_days`` ago.
+
+    Each batch (at most ``batch_size`` jobs) is exported and deleted in one transaction;
+    a failure leaves that batch's rows in place and the next run retries it (uploads
+    overwrite the same keys). ``dry_run`` only reports the first batch's would-be keys.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=older_than_days)
+    report = ArchiveReport(cutoff=cutoff.isoformat(), dry_run=dry_run)
+    cfg = s3mod.from_env()
+    batch_size = max(1, int(batch_size))
+    while max_batches is None or report.batches < max_batches:
+        with get_session() as session:
+            keys = _archive_batch(session, cfg, cutoff, batch_size, dry_run)
+        if not keys:
+            break
+        report.batches += 1
+        report.keys.extend(keys)
+        if dry_run:
+            break
+        report.archived += len(keys)
+        _log.info("archived %d jobs (batch %d)", len(keys), report.batches)
+        if len(keys) < batch_size:
+            break
+    return report
+
+
+def load_archived_job(job_id: str | _uuid.UUID) -> ArchivedJobDoc | None:
+    try:
+        jid = _uuid.UUID(str(job_id))
+    except ValueError:
+        return None
+    with get_read_session() as session:
+        entry = session.get(ArchivedJob, jid)
+        key = entry.s3_key if entry else None
+    if key is None:
+        return None
+    return decode_job(s3mod.download_bytes(s3mod.from_env(), key))
+
+
+def _rehydrate(model: type[Base], row: dict[str, Any]) -> Any:
+    values = {}
+    for col in model.__table__.columns:
+        if col.key not in row:
+            # Columns added after the document was written (e.g. jobs.priority) take
+            # their constant default, as the migration gave existing rows
+            if col.default is not None and col.default.is_scalar:
+                values[col.key] = col.default.arg
+            continue
+        v = row[col.key]
+        if v is not None and isinstance(col.type, DateTime):
+            v = datetime.fromisoformat(v)
+        values[col.key] = v
+    return model(**values)
+
+
+def get_job_detail(job_id: str | _uuid.UUID) -> repos.JobDetail | None:
+    """Archived counterpart of ``repos.get_job_detail`` (transient, session-less objects)."""
+    doc = load_archived_job(job_id)
+    if doc is None:
+        return None
+    counts: dict[tuple[str, str], int] = {}
+    for a in doc.artifacts:
+        counts[(a["job_id"], a["step_id"])] = counts.get((a["job_id"], a["step_id"]), 0) + 1
+    steps = [
+        repos.StepDetail(
+            id=_uuid.UUID(s["id"]),
+            name=s["name"],
+            status=s["status"],
+            artifact_count=counts.get((s["job_id"], s["id"]), 0),
+        )
+        for s in doc.steps
+    ]
+    return repos.JobDetail(job=_rehydrate(Job, doc.job), steps=steps)
+
+
+def archive_after_days() -> float:
+    """``DF_ARCHIVE_AFTER_DAYS``; 0 (default) disables the periodic task."""
+    try:
+        return max(0.0, float(os.getenv("DF_ARCHIVE_AFTER_DAYS", "0")))
+    except ValueError:
+        return 0.0
@@ -1,15 +1,93 @@
+"""SQLAlchemy engine and sessions for this process, with pools sized per role.
+
+``DF_DB_ROLE`` (``api``, ``worker``, ``cli``) selects pool defaults suited to that
+process; each setting can be overridden for all roles with ``DF_DB_<NAME>`` or for one
+role with ``DF_DB_<ROLE>_<NAME>``. The engine is built once, on first use, and shared
+by ``get_session``. Pool checkout wait, checked-out connections and utilization are
+exported per role on the default Prometheus registry.
+"""
+
 from __future__ import annotations
 
+import itertools
+import logging
 import os
+import threading
+import time
+import uuid as _uuid
 from contextlib import contextmanager
-from typing import Iterator
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Iterator
 
-from sqlalchemy import create_engine
+from prometheus_client import Gauge, Histogram
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
 
 from .models import Base
 
+# Pool metrics live on the default Prometheus registry so both the worker metrics
+# server and the API /metrics endpoint can export them.
+_POOL_CHECKOUT_S = Histogram(
+    "df_db_pool_checkout_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["role"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+_POOL_CHECKED_OUT = Gauge("df_db_pool_checked_out", "Connections currently checked out", ["role"])
+_POOL_UTILIZATION = Gauge(
+    "df_db_pool_utilization", "Checked-out connections / (pool_size + max_overflow)", ["role"]
+)
+
+# Per unit of work (API route or Celery task): statements issued, total and slowest DB time
+_UNIT_STATEMENTS = Histogram(
+    "df_db_statements_per_unit",
+    "SQL statements issued per API request or Celery task",
+    ["scope", "name"],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233),
+)
+_UNIT_DB_SECONDS = Histogram(
+    "df_db_time_per_unit_seconds",
+    "Total DB time per API request or Celery task",
+    ["scope", "name"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+_UNIT_SLOWEST_SECONDS = Histogram(
+    "df_db_slowest_statement_seconds",
+    "Slowest single statement per API request or Celery task",
+    ["scope", "name"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+_log = logging.getLogger(__name__)
+
+# Per-role defaults. API processes hold sessions in SSE/NDJSON loops and need the
+# largest pool; workers run one or two tasks at a time; the CLI is short-lived.
+_ROLE_DEFAULTS: dict[str, dict[str, Any]] = {
+    "api": {"pool_size": 20, "max_overflow": 20, "statement_timeout_ms": 15000},
+    "worker": {"pool_size": 4, "max_overflow": 4, "statement_timeout_ms": 0},
+    "cli": {"pool_size": 1, "max_overflow": 2, "statement_timeout_ms": 0},
+}
+_GENERIC_DEFAULTS: dict[str, Any] = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout_s": 30.0,
+    "pool_recycle_s": 1800,
+    "pool_pre_ping": True,
+    "statement_timeout_ms": 0,
+    "query_cache_size": 500,
+    "prepare_threshold": 5,
+}
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
 
 def _db_url() -> str:
     url = os.getenv("DF_DB_URL")
@@ -20,13 +98,172 @@ def _db_url() -> str:
     return "sqlite+pysqlite:///db/dev.sqlite3"
 
 
-_ENGINE: Engine = create_engine(_db_url(), future=True)
+def _db_role() -> str:
+    """Process role used to pick pool defaults: api|worker|cli (anything else = generic)."""
+    return (os.getenv("DF_DB_ROLE") or "default").strip().lower() or "default"
+
+
+def _setting(role: str, name: str) -> Any:
+    """Resolve a pool setting: DF_DB_<ROLE>_<NAME> > DF_DB_<NAME> > role default > generic."""
+    default = _ROLE_DEFAULTS.get(role, {}).get(name, _GENERIC_DEFAULTS[name])
+    raw = os.getenv(f"DF_DB_{role.upper()}_{name.upper()}") or os.getenv(f"DF_DB_{name.upper()}")
+    if raw is None or raw == "":
+        return default
+    try:
+        if isinstance(default, bool):
+            return raw.lower() in {"1", "true", "yes", "on"}
+        return type(default)(raw)
+    except ValueError:
+        return default
+
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool that records checkout wait time per process role."""
+
+    _df_role = "default"
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _POOL_CHECKOUT_S.labels(role=self._df_role).observe(time.perf_counter() - t0)
+
+
+def _engine_options(url: str, role: str) -> dict[str, Any]:
+    """Build create_engine() kwargs for the given URL and process role."""
+    opts: dict[str, Any] = {
+        "future": True,
+        # SQLAlchemy compiled-statement cache (0 disables)
+        "query_cache_size": int(_setting(role, "query_cache_size")),
+    }
+    if make_url(url).get_backend_name().startswith("sqlite"):
+        # SQLite keeps SQLAlchemy's default pool; sizing knobs do not apply.
+        return opts
 
-# For SQLite fallback in dev/tests, auto-create tables so tests can run without Alembic
-if _ENGINE.url.get_backend_name().startswith("sqlite"):
-    Base.metadata.create_all(_ENGINE)
+    pool_cls = type("TimedQueuePool", (_TimedQueuePool,), {"_df_role": role})
+    opts.update(
+        poolclass=pool_cls,
+        pool_size=int(_setting(role, "pool_size")),
+        max_overflow=int(_setting(role, "max_overflow")),
+        pool_timeout=float(_setting(role, "pool_timeout_s")),
+        pool_recycle=int(_setting(role, "pool_recycle_s")),
+        pool_pre_ping=bool(_setting(role, "pool_pre_ping")),
+    )
+    connect_args: dict[str, Any] = {}
+    stmt_timeout = int(_setting(role, "statement_timeout_ms"))
+    if stmt_timeout > 0:
+        connect_args["options"] = f"-c statement_timeout={stmt_timeout}"
+    if make_url(url).get_driver_name() == "psycopg":
+        # psycopg server-side prepared statements; negative disables (e.g., behind pgbouncer)
+        threshold = int(_setting(role, "prepare_threshold"))
+        connect_args["prepare_threshold"] = threshold if threshold >= 0 else None
+    if connect_args:
+        opts["connect_args"] = connect_args
+    return opts
+
+
+def _register_pool_gauges(engine: Engine, role: str) -> None:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    capacity = max(1, pool.size() + max(0, pool._max_overflow))
+    _POOL_CHECKED_OUT.labels(role=role).set_function(lambda: float(pool.checkedout()))
+    _POOL_UTILIZATION.labels(role=role).set_function(lambda: pool.checkedout() / float(capacity))
+
+
+# --- Query instrumentation ---
+
+
+@dataclass
+class QueryStats:
+    """Statement count and DB time attributed to one unit of work."""
+
+    scope: str
+    name: str
+    count: int = 0
+    total_s: float = 0.0
+    slowest_s: float = 0.0
+    slowest_sql: str | None = None
+
+
+# Stack of active units; nested trackers (e.g. a test budget around a route) all count
+_ACTIVE_STATS: ContextVar[tuple[QueryStats, ...]] = ContextVar("df_query_stats", default=())
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("df_query_t0", []).append(time.perf_counter())
+
+
+def _record_statement(conn: Any, statement: str) -> None:
+    starts = conn.info.get("df_query_t0")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    for stats in _ACTIVE_STATS.get():
+        stats.count += 1
+        stats.total_s += elapsed
+        if elapsed > stats.slowest_s:
+            stats.slowest_s = elapsed
+            stats.slowest_sql = statement[:200]
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_statement(conn, statement)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; count it (a timed-out
+    # query is often the slowest one) and keep the start stack balanced
+    conn = exception_context.connection
+    if conn is not None and exception_context.statement is not None:
+        _record_statement(conn, exception_context.statement)
+
+
+def begin_query_tracking(scope: str, name: str) -> tuple[QueryStats, Token]:
+    """Start attributing statements in the current context to ``scope``/``name``."""
+    stats = QueryStats(scope=scope, name=name)
+    token = _ACTIVE_STATS.set(_ACTIVE_STATS.get() + (stats,))
+    return stats, token
+
+
+def end_query_tracking(stats: QueryStats, token: Token, *, export: bool = True) -> None:
+    """Stop tracking and (optionally) export the unit's totals as Prometheus histograms."""
+    try:
+        _ACTIVE_STATS.reset(token)
+    except ValueError:
+        # Ended from a different context (e.g. Celery signal handlers); just detach this unit
+        _ACTIVE_STATS.set(tuple(s for s in _ACTIVE_STATS.get() if s is not stats))
+    if not export:
+        return
+    _UNIT_STATEMENTS.labels(scope=stats.scope, name=stats.name).observe(stats.count)
+    _UNIT_DB_SECONDS.labels(scope=stats.scope, name=stats.name).observe(stats.total_s)
+    _UNIT_SLOWEST_SECONDS.labels(scope=stats.scope, name=stats.name).observe(stats.slowest_s)
+    slow_ms = _float_env("DF_DB_SLOW_QUERY_MS", 500.0)
+    if slow_ms > 0 and stats.slowest_s * 1000.0 >= slow_ms:
+        _log.warning(
+            "slow statement in %s %s: %.1fms: %s", stats.scope, stats.name, stats.slowest_s * 1000.0, stats.slowest_sql
+        )
+
+
+@contextmanager
+def track_queries(scope: str, name: str, *, export: bool = True) -> Iterator[QueryStats]:
+    stats, token = begin_query_tracking(scope, name)
+    try:
+        yield stats
+    finally:
+        # Name may be refined inside the block (e.g. route template resolved after routing)
+        end_query_tracking(stats, token, export=export)
+
+
+# The engine is built on first use, not at import: entrypoints set DF_DB_ROLE (and
+# tests DF_DB_* overrides) before any session is opened, whatever the import order
+_ENGINE: Engine | None = None
+_ENGINE_LOCK = threading.Lock()
 SessionLocal = sessionmaker(
-    bind=_ENGINE,
     autoflush=False,
     autocommit=False,
     future=True,
@@ -35,8 +272,31 @@ SessionLocal = sessionmaker(
 )
 
 
+def build_engine(url: str, role: str) -> Engine:
+    """Engine for ``url`` with ``role``'s pool settings, read from the environment now."""
+    engine = create_engine(url, **_engine_options(url, role))
+    _register_pool_gauges(engine, role)
+    return engine
+
+
+def engine() -> Engine:
+    """The process's primary engine (built on first call)."""
+    global _ENGINE
+    if _ENGINE is None:
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                eng = build_engine(_db_url(), _db_role())
+                # For SQLite fallback in dev/tests, auto-create tables so tests can run without Alembic
+                if eng.url.get_backend_name().startswith("sqlite"):
+                    Base.metadata.create_all(eng)
+                SessionLocal.configure(bind=eng)
+                _ENGINE = eng
+    return _ENGINE
+
+
 @contextmanager
 def get_session() -> Iterator[Session]:
+    engine()
     session = SessionLocal()
     try:
         yield session
@@ -46,3 +306,134 @@ def get_session() -> Iterator[Session]:
         raise
     finally:
         session.close()
+
+
+# --- Read replicas ---
+#
+# Read-only API endpoints may be served from replicas (DF_DB_REPLICA_URLS). A replica
+# is used only while its replication lag is within DF_DB_REPLICA_MAX_LAG_S; otherwise
+# reads fall back to the primary. Keys passed to note_write() (job ids) are pinned to
+# the primary for DF_DB_READ_YOUR_WRITES_S so a client polling right after creating a
+# job always sees it.
+
+_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+@dataclass
+class _Replica:
+    url: str
+    engine: Engine
+    session_factory: sessionmaker
+    lag_s: float = 0.0
+    healthy: bool = True
+    checked_at: float = field(default=0.0)
+
+
+_REPLICAS: list[_Replica] = []
+_REPLICA_RR = itertools.count()
+_REPLICA_LOCK = threading.Lock()
+_RECENT_WRITES: dict[str, float] = {}
+
+
+def configure_replicas(urls: list[str]) -> None:
+    """(Re)build replica engines; an empty list routes every read to the primary."""
+    replicas: list[_Replica] = []
+    for url in urls:
+        eng = create_engine(url, **_engine_options(url, _db_role()))
+        if eng.url.get_backend_name().startswith("sqlite"):
+            Base.metadata.create_all(eng)
+        factory = sessionmaker(bind=eng, autoflush=False, future=True, expire_on_commit=False, class_=Session)
+        replicas.append(_Replica(url=url, engine=eng, session_factory=factory))
+    with _REPLICA_LOCK:
+        old = list(_REPLICAS)
+        _REPLICAS[:] = replicas
+    for r in old:
+        r.engine.dispose()
+
+
+def replicas_enabled() -> bool:
+    return bool(_REPLICAS)
+
+
+def note_write(key: str | _uuid.UUID) -> None:
+    """Pin reads for ``key`` (typically a job id) to the primary for the read-your-writes window."""
+    if not _REPLICAS:
+        return
+    now = time.monotonic()
+    _RECENT_WRITES[str(key)] = now + _float_env("DF_DB_READ_YOUR_WRITES_S", 5.0)
+    if len(_RECENT_WRITES) > 10000:
+        for k, deadline in list(_RECENT_WRITES.items()):
+            if deadline < now:
+                _RECENT_WRITES.pop(k, None)
+
+
+def _pinned_to_primary(key: str | _uuid.UUID | None) -> bool:
+    if key is None:
+        return False
+    deadline = _RECENT_WRITES.get(str(key))
+    return deadline is not None and deadline > time.monotonic()
+
+
+def _refresh_lag(replica: _Replica) -> None:
+    # Claim the check under the lock, query outside it (a slow replica must not block
+    # other checkouts), then publish the result under the lock again
+    now = time.monotonic()
+    with _REPLICA_LOCK:
+        if now - replica.checked_at < _float_env("DF_DB_REPLICA_LAG_CHECK_S", 5.0):
+            return
+        replica.checked_at = now
+    if not replica.engine.url.get_backend_name().startswith("postgresql"):
+        lag_s, healthy = 0.0, True
+    else:
+        try:
+            with replica.engine.connect() as conn:
+                lag_s, healthy = float(conn.execute(_LAG_SQL).scalar() or 0.0), True
+        except Exception:  # noqa: BLE001
+            lag_s, healthy = replica.lag_s, False
+    with _REPLICA_LOCK:
+        replica.lag_s, replica.healthy = lag_s, healthy
+
+
+def _pick_replica() -> _Replica | None:
+    replicas = list(_REPLICAS)
+    if not replicas:
+        return None
+    max_lag = _float_env("DF_DB_REPLICA_MAX_LAG_S", 5.0)
+    start = next(_REPLICA_RR)
+    for i in range(len(replicas)):
+        replica = replicas[(start + i) % len(replicas)]
+        _refresh_lag(replica)
+        if replica.healthy and replica.lag_s <= max_lag:
+            return replica
+    return None
+
+
+def on_replica(session: Session) -> bool:
+    return bool(session.info.get("df_replica"))
+
+
+@contextmanager
+def get_read_session(*, sticky_key: str | _uuid.UUID | None = None) -> Iterator[Session]:
+    """Session for read-only repository calls.
+
+    Served from a fresh-enough replica when configured, else from the primary. Reads
+    for ``sticky_key`` go to the primary while it is inside the read-your-writes window.
+    """
+    replica = None if _pinned_to_primary(sticky_key) else _pick_replica()
+    if replica is None:
+        with get_session() as session:
+            yield session
+        return
+    session = replica.session_factory()
+    session.info["df_replica"] = replica.url
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+configure_replicas([u.strip() for u in os.getenv("DF_DB_REPLICA_URLS", "").split(",") if u.strip()])
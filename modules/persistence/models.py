@@ -16,6 +16,7 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.types import CHAR, TypeDecorator
@@ -67,9 +68,13 @@ class Job(Base):
     id: Mapped[_uuid.UUID] = mapped_column(GUID(), primary_key=True, default=_uuid_pk)
     type: Mapped[str] = mapped_column(String, nullable=False)
     status: Mapped[str] = mapped_column(String, nullable=False)
+    # Scheduling class: selects the broker queue (high|normal|low)
+    priority: Mapped[str] = mapped_column(String, nullable=False, default="normal", server_default="normal")
     params_json: Mapped[dict] = mapped_column(JSON, nullable=False)
     schema_version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
     idempotency_key_hash: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    # sha256 hex of the canonical request params; detects key reuse with different params
+    idempotency_fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
     error_code: Mapped[str | None] = mapped_column(String, nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, nullable=False)
@@ -78,8 +83,23 @@ class Job(Base):
     __table_args__ = (
         CheckConstraint("status in ('queued','running','succeeded','failed')", name="jobs_status_check"),
         CheckConstraint("type in ('generate','model_download')", name="jobs_type_check"),
+        CheckConstraint("priority in ('high','normal','low')", name="jobs_priority_check"),
         Index("jobs_updated_idx", "updated_at"),
         Index("jobs_status_idx", "status"),
+        # Partial (Postgres): active jobs for admission/stats, finished jobs by completion time
+        Index(
+            "jobs_active_idx",
+            "status",
+            "type",
+            "created_at",
+            postgresql_where=text("status IN ('queued','running')"),
+        ),
+        Index(
+            "jobs_finished_idx",
+            "updated_at",
+            postgresql_where=text("status IN ('succeeded','failed')"),
+            postgresql_include=["status", "type", "created_at"],
+        ),
         # SQLite lacks partial indexes; we enforce uniqueness at app level there.
         Index("jobs_idempo_uniq", "idempotency_key_hash", unique=True),
     )
@@ -172,3 +192,29 @@ class Model(Base):
         Index("models_enabled_installed_idx", "enabled", "installed"),
         Index("models_source_uri_idx", "source_uri"),
     )
+
+
+class RegistryVersion(Base):
+    """Single-row counter bumped on every model registry change (cache invalidation)."""
+
+    __tablename__ = "registry_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, nullable=False)
+
+
+class ArchivedJob(Base):
+    """Index of jobs moved to cold storage (``archive/jobs/...ndjson.gz`` in the bucket)."""
+
+    __tablename__ = "archived_jobs"
+
+    job_id: Mapped[_uuid.UUID] = mapped_column(GUID(), primary_key=True)
+    type: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False)
+    s3_key: Mapped[str] = mapped_column(Text, nullable=False)
+    job_created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    job_updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, nullable=False)
+
+    __table_args__ = (Index("archived_jobs_archived_at_idx", "archived_at"),)
@@ -0,0 +1,199 @@
+"""Job change notifications: Postgres LISTEN/NOTIFY with an in-process fallback.
+
+Writers call ``job_changed(session, job_id)`` from repository functions. On commit the
+job id is published:
+
+- on Postgres via ``pg_notify`` (transactional, delivered only if the commit succeeds);
+- always to subscribers in the current process (covers SQLite, tests and eager mode).
+
+Readers (SSE streams) ``subscribe(job_id)`` and ``wait()`` on the subscription instead
+of sleeping. One listener thread per API process (``start_listener``) holds a single
+LISTEN connection and fans notifications out to local subscribers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid as _uuid
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+CHANNEL = "df_job_events"
+
+_log = logging.getLogger(__name__)
+_PENDING_KEY = "df_notify_jobs"
+_NOTIFY_SQL = text("SELECT pg_notify(:channel, :payload)")
+
+
+class Subscription:
+    """Wake-up handle for one stream watching one job."""
+
+    def __init__(self, hub: "_Hub", job_id: str) -> None:
+        self._hub = hub
+        self.job_id = job_id
+        self._event = threading.Event()
+        # Bound lazily by wait_async(); notifications may arrive from any thread
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._async_event: asyncio.Event | None = None
+
+    def _fire(self) -> None:
+        self._event.set()
+        loop, aevent = self._loop, self._async_event
+        if loop is not None and aevent is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(aevent.set)
+
+    def wait(self, timeout: float) -> bool:
+        """Block up to ``timeout`` seconds; True if the job changed meanwhile."""
+        fired = self._event.wait(max(0.0, timeout))
+        self._event.clear()
+        return fired
+
+    async def wait_async(self, timeout: float) -> bool:
+        """Event-loop counterpart of ``wait``: suspends the coroutine, not a thread."""
+        if self._async_event is None:
+            self._loop = asyncio.get_running_loop()
+            self._async_event = asyncio.Event()
+            if self._event.is_set():
+                self._async_event.set()
+        try:
+            await asyncio.wait_for(self._async_event.wait(), timeout=max(0.0, timeout))
+            fired = True
+        except asyncio.TimeoutError:
+            fired = False
+        self._async_event.clear()
+        self._event.clear()
+        return fired
+
+    def close(self) -> None:
+        self._hub.unsubscribe(self)
+
+
+class _Hub:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subs: dict[str, set[Subscription]] = {}
+
+    def subscribe(self, job_id: str) -> Subscription:
+        sub = Subscription(self, job_id)
+        with self._lock:
+            self._subs.setdefault(job_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.job_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    self._subs.pop(sub.job_id, None)
+
+    def publish(self, job_id: str) -> None:
+        with self._lock:
+            subs = list(self._subs.get(job_id, ()))
+        for sub in subs:
+            sub._fire()
+
+    def publish_all(self) -> None:
+        with self._lock:
+            subs = [s for group in self._subs.values() for s in group]
+        for sub in subs:
+            sub._fire()
+
+
+_HUB = _Hub()
+
+
+def subscribe(job_id: str | _uuid.UUID) -> Subscription:
+    return _HUB.subscribe(str(job_id))
+
+
+def publish_local(job_id: str | _uuid.UUID) -> None:
+    _HUB.publish(str(job_id))
+
+
+def job_changed(session: Session, job_id: str | _uuid.UUID) -> None:
+    """Mark ``job_id`` as changed; subscribers are notified when ``session`` commits."""
+    session.info.setdefault(_PENDING_KEY, set()).add(str(job_id))
+
+
+@event.listens_for(Session, "before_commit")
+def _emit_pg_notify(session: Session) -> None:
+    pending = session.info.get(_PENDING_KEY)
+    if not pending:
+        return
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    for job_id in sorted(pending):
+        session.execute(_NOTIFY_SQL, {"channel": CHANNEL, "payload": job_id})
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    for job_id in pending or ():
+        _HUB.publish(job_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+# --- Listener (one per API process) ---
+
+_listener_lock = threading.Lock()
+_listener_thread: threading.Thread | None = None
+_listener_connected = threading.Event()
+
+
+def push_enabled() -> bool:
+    """True while a LISTEN connection is live, i.e. streams may rely on wake-ups alone."""
+    return _listener_connected.is_set()
+
+
+def _listen_forever(conninfo: str) -> None:  # pragma: no cover - requires Postgres
+    import psycopg
+
+    backoff = 1.0
+    while True:
+        try:
+            with psycopg.connect(conninfo, autocommit=True) as conn:
+                conn.execute(f"LISTEN {CHANNEL}")
+                _listener_connected.set()
+                backoff = 1.0
+                # Wake everyone once: notifications may have been missed while disconnected
+                _HUB.publish_all()
+                for note in conn.notifies():
+                    _HUB.publish(note.payload)
+        except Exception as exc:  # noqa: BLE001
+            _log.warning("job notify listener disconnected: %s", exc)
+        _listener_connected.clear()
+        _HUB.publish_all()
+        time.sleep(backoff)
+        backoff = min(backoff * 2.0, 30.0)
+
+
+def start_listener(url: str | None = None) -> bool:
+    """Start the LISTEN thread for a Postgres primary; no-op (False) for other backends."""
+    global _listener_thread
+    url = url or os.getenv("DF_DB_URL") or ""
+    if not url or not make_url(url).get_backend_name().startswith("postgresql"):
+        return False
+    if os.getenv("DF_DB_NOTIFY", "1").lower() in {"0", "false", "no", "off"}:
+        return False
+    with _listener_lock:
+        if _listener_thread is not None and _listener_thread.is_alive():
+            return True
+        conninfo = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        _listener_thread = threading.Thread(
+            target=_listen_forever, args=(conninfo,), name="df-notify-listener", daemon=True
+        )
+        _listener_thread.start()
+    return True
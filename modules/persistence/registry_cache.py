@@ -0,0 +1,202 @@
+"""Read-through cache for model registry lookups (worker model resolution, API models routes).
+
+Entries are immutable snapshots (``CachedModel``, with JSON fields frozen), so callers
+never hold ORM objects outside a session. Misses are cached only for bounded keys (the
+default model per kind), never for ids taken from requests. Validity:
+
+- within ``DF_MODEL_CACHE_TTL_S`` of the last check, entries are served with no DB access;
+- after that, one ``registry_version`` read decides whether to keep or drop all entries;
+- a registry write committed in this process drops entries immediately.
+
+Set ``DF_MODEL_CACHE_TTL_S=0`` to check the version on every lookup.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid as _uuid
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Hashable
+
+from prometheus_client import Counter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import repos
+from .db import get_read_session
+from .models import Model
+
+_LOOKUPS = Counter("df_model_cache_lookups_total", "Model registry cache lookups", ["result"])
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class CachedModel:
+    id: str
+    name: str
+    kind: str
+    version: str | None
+    installed: bool
+    enabled: bool
+    source_uri: str | None
+    local_path: str | None
+    parameters_schema: Mapping[str, Any]
+    capabilities: tuple[str, ...]
+    files_json: tuple[Mapping[str, Any], ...]
+    # First .safetensors file under local_path, resolved once per snapshot
+    weights_path: str | None
+
+    @property
+    def available(self) -> bool:
+        return self.installed and self.enabled and bool(self.local_path)
+
+
+def _weights_path(m: Model) -> str | None:
+    if not m.local_path:
+        return None
+    for f in m.files_json or []:
+        p = f.get("path")
+        if isinstance(p, str) and p.endswith(".safetensors"):
+            return os.path.join(m.local_path, p)
+    return None
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only deep copy of a JSON value: dicts become mapping proxies, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable copy of a frozen JSON value (for response models and callers that edit it)."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def snapshot(m: Model) -> CachedModel:
+    return CachedModel(
+        id=str(m.id),
+        name=m.name,
+        kind=m.kind,
+        version=m.version,
+        installed=bool(m.installed),
+        enabled=bool(m.enabled),
+        source_uri=m.source_uri,
+        local_path=m.local_path,
+        parameters_schema=_freeze(m.parameters_schema or {}),
+        capabilities=_freeze(m.capabilities or ["generate"]),
+        files_json=_freeze(m.files_json or []),
+        weights_path=_weights_path(m),
+    )
+
+
+def _ttl_s() -> float:
+    try:
+        return max(0.0, float(os.getenv("DF_MODEL_CACHE_TTL_S", "30")))
+    except ValueError:
+        return 30.0
+
+
+class _RegistryCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[Hashable, Any] = {}
+        self._version: int | None = None
+        self._checked_at = 0.0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+            self._checked_at = 0.0
+
+    def _revalidate(self, session: Session) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._version is not None and now - self._checked_at < _ttl_s():
+                return
+        version = repos.get_registry_version(session)
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._checked_at = now
+
+    def _fresh(self) -> bool:
+        with self._lock:
+            return self._version is not None and time.monotonic() - self._checked_at < _ttl_s()
+
+    def lookup(self, key: Hashable, load: Callable[[Session], Any], *, cache_none: bool = True) -> Any:
+        if self._fresh():
+            with self._lock:
+                value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                _LOOKUPS.labels(result="hit").inc()
+                return value
+        with get_read_session() as session:
+            self._revalidate(session)
+            with self._lock:
+                value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                _LOOKUPS.labels(result="hit").inc()
+                return value
+            _LOOKUPS.labels(result="miss").inc()
+            value = load(session)
+        if value is None and not cache_none:
+            return value
+        with self._lock:
+            self._entries[key] = value
+        return value
+
+
+_CACHE = _RegistryCache()
+
+
+def invalidate() -> None:
+    _CACHE.invalidate()
+
+
+def get_model(model_id: str | _uuid.UUID) -> CachedModel | None:
+    def _load(session: Session) -> CachedModel | None:
+        m = repos.get_model(session, model_id)
+        return snapshot(m) if m else None
+
+    # Ids come from API paths: caching misses would let arbitrary ids grow the cache
+    return _CACHE.lookup(("id", str(model_id)), _load, cache_none=False)
+
+
+def get_default_model(*, kind: str = "sdxl-checkpoint") -> CachedModel | None:
+    def _load(session: Session) -> CachedModel | None:
+        m = repos.get_default_model(session, kind=kind)
+        return snapshot(m) if m else None
+
+    return _CACHE.lookup(("default", kind), _load)
+
+
+def list_models(*, enabled_only: bool = True) -> list[CachedModel]:
+    def _load(session: Session) -> tuple[CachedModel, ...]:
+        return tuple(snapshot(m) for m in repos.list_models(session, enabled_only=enabled_only))
+
+    return list(_CACHE.lookup(("list", enabled_only), _load))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_local_write(session: Session) -> None:
+    if session.info.pop(repos.REGISTRY_CHANGED_KEY, False):
+        _CACHE.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_change_flag(session: Session) -> None:
+    session.info.pop(repos.REGISTRY_CHANGED_KEY, None)
@@ -3,13 +3,16 @@ from __future__ import annotations
 import hashlib
 import json
 import uuid as _uuid
-from datetime import datetime, timezone
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, NamedTuple
 
-from sqlalchemy import select, update, String, cast
+from sqlalchemy import ColumnElement, Float, Row, and_, func, insert, or_, select, update, String, cast
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
-from .models import Artifact, Event, Job, Step, Model
+from . import notify
+from .models import Artifact, Event, Job, Step, Model, RegistryVersion
 UTC = timezone.utc
 
 
@@ -21,23 +24,113 @@ def _hash_idempotency(value: str) -> bytes:
     return hashlib.sha256(value.encode("utf-8")).digest()
 
 
-def create_job_with_step(
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; treat them as UTC
+    return value if value.tzinfo is not None else value.replace(tzinfo=UTC)
+
+
+class IdempotencyConflict(Exception):
+    """Raised when an insert loses the race for an Idempotency-Key to an existing job."""
+
+    def __init__(self, job: Job) -> None:
+        super().__init__(f"idempotency key already used by job {job.id}")
+        self.job = job
+
+
+def params_fingerprint(params: dict[str, Any]) -> str:
+    """Stable sha256 hex digest of request params (key order independent)."""
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def find_job_by_idempotency_key(session: Session, idempotency_key: str, *, ttl_s: int | None = None) -> Job | None:
+    """Return the job holding ``idempotency_key``.
+
+    Keys older than ``ttl_s`` are released (hash cleared on the old job) and None is
+    returned so the caller can create a fresh job under the same key.
+    """
+    key_hash = _hash_idempotency(idempotency_key)
+    job = session.scalars(select(Job).where(Job.idempotency_key_hash == key_hash)).first()
+    if job is None:
+        return None
+    if ttl_s and ttl_s > 0 and _as_utc(job.created_at) < _utcnow() - timedelta(seconds=int(ttl_s)):
+        session.execute(
+            update(Job)
+            .where(cast(Job.id, String) == str(job.id))
+            .values(idempotency_key_hash=None, idempotency_fingerprint=None)
+        )
+        return None
+    return job
+
+
+def _insert_job(
     session: Session,
     *,
     job_type: str,
     params: dict[str, Any],
     idempotency_key: str | None,
+    idempotency_fingerprint: str | None,
+    priority: str = "normal",
 ) -> Job:
+    """Insert a queued job row.
+
+    Keyed inserts use INSERT .. ON CONFLICT DO NOTHING on the idempotency index so
+    concurrent retries cannot create duplicates; the loser raises IdempotencyConflict
+    carrying the job that owns the key.
+    """
+    now = _utcnow()
     job = Job(
         id=_uuid.uuid4(),
         type=job_type,
         status="queued",
+        priority=priority,
         params_json=params,
+        schema_version=1,
         idempotency_key_hash=_hash_idempotency(idempotency_key) if idempotency_key else None,
-        created_at=_utcnow(),
-        updated_at=_utcnow(),
+        idempotency_fingerprint=idempotency_fingerprint if idempotency_key else None,
+        created_at=now,
+        updated_at=now,
+    )
+    dialect = session.get_bind().dialect.name
+    if not idempotency_key or dialect not in {"postgresql", "sqlite"}:
+        session.add(job)
+        return job
+
+    insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+    values = {c.key: getattr(job, c.key) for c in Job.__table__.columns}
+    stmt = (
+        insert_fn(Job)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=[Job.idempotency_key_hash])
+        .returning(Job.id)
+    )
+    if session.execute(stmt).scalar_one_or_none() is None:
+        existing = session.scalars(select(Job).where(Job.idempotency_key_hash == job.idempotency_key_hash)).first()
+        if existing is None:  # pragma: no cover - key released between insert and lookup
+            raise RuntimeError("idempotency conflict but owning job not found")
+        raise IdempotencyConflict(existing)
+    inserted = get_job(session, job.id)
+    assert inserted is not None
+    return inserted
+
+
+def create_job_with_step(
+    session: Session,
+    *,
+    job_type: str,
+    params: dict[str, Any],
+    idempotency_key: str | None,
+    idempotency_fingerprint: str | None = None,
+    priority: str = "normal",
+) -> Job:
+    job = _insert_job(
+        session,
+        job_type=job_type,
+        params=params,
+        idempotency_key=idempotency_key,
+        idempotency_fingerprint=idempotency_fingerprint,
+        priority=priority,
     )
-    session.add(job)
     step = Step(
         id=_uuid.uuid4(),
         job_id=job.id,
@@ -60,21 +153,21 @@ def create_job_with_chain(
     upscale_scale: int = 2,
     upscale_impl: str | None = None,
     upscale_strict_scale: bool | None = None,
+    idempotency_fingerprint: str | None = None,
+    priority: str = "normal",
 ) -> Job:
     """Create a job with two ordered steps: generate -> upscale.
 
     Stores minimal per-step metadata in Step.metadata_json for traceability.
     """
-    job = Job(
-        id=_uuid.uuid4(),
-        type=job_type,
-        status="queued",
-        params_json=params,
-        idempotency_key_hash=_hash_idempotency(idempotency_key) if idempotency_key else None,
-        created_at=_utcnow(),
-        updated_at=_utcnow(),
+    job = _insert_job(
+        session,
+        job_type=job_type,
+        params=params,
+        idempotency_key=idempotency_key,
+        idempotency_fingerprint=idempotency_fingerprint,
+        priority=priority,
     )
-    session.add(job)
 
     step_gen = Step(
         id=_uuid.uuid4(),
@@ -106,6 +199,105 @@ def create_job_with_chain(
     return job
 
 
+class JobSpec(NamedTuple):
+    job_type: str
+    params: dict[str, Any]
+    idempotency_key: str | None = None
+    idempotency_fingerprint: str | None = None
+    # Upscale step metadata for chained jobs (generate -> upscale); None = generate only
+    upscale: dict[str, Any] | None = None
+    priority: str = "normal"
+
+
+def find_jobs_by_idempotency_keys(session: Session, keys: list[str], *, ttl_s: int | None = None) -> dict[str, Job]:
+    """Bulk ``find_job_by_idempotency_key``: one SELECT for all keys, expired keys released."""
+    hashes = {_hash_idempotency(k): k for k in keys}
+    if not hashes:
+        return {}
+    out: dict[str, Job] = {}
+    expired: list[_uuid.UUID] = []
+    cutoff = _utcnow() - timedelta(seconds=int(ttl_s or 0))
+    for job in session.scalars(select(Job).where(Job.idempotency_key_hash.in_(list(hashes)))):
+        if ttl_s and ttl_s > 0 and _as_utc(job.created_at) < cutoff:
+            expired.append(job.id)
+            continue
+        assert job.idempotency_key_hash is not None  # selected by it
+        out[hashes[job.idempotency_key_hash]] = job
+    if expired:
+        session.execute(
+            update(Job).where(Job.id.in_(expired)).values(idempotency_key_hash=None, idempotency_fingerprint=None)
+        )
+    return out
+
+
+def create_jobs_bulk(session: Session, specs: list[JobSpec]) -> list[Job | IdempotencyConflict]:
+    """Insert queued jobs and their steps with one multi-row INSERT per table.
+
+    Keyed rows use ON CONFLICT DO NOTHING .. RETURNING on the idempotency index; a row
+    that lost to an existing key yields IdempotencyConflict (carrying the owner) in its
+    slot instead of a Job. Callers resolve replays up front with
+    ``find_jobs_by_idempotency_keys`` and must not repeat a key within ``specs``.
+    """
+    if not specs:
+        return []
+    now = _utcnow()
+    rows: list[dict[str, Any]] = [
+        {
+            "id": _uuid.uuid4(),
+            "type": spec.job_type,
+            "status": "queued",
+            "priority": spec.priority,
+            "params_json": spec.params,
+            "schema_version": 1,
+            "idempotency_key_hash": _hash_idempotency(spec.idempotency_key) if spec.idempotency_key else None,
+            "idempotency_fingerprint": spec.idempotency_fingerprint if spec.idempotency_key else None,
+            "error_code": None,
+            "error_message": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for spec in specs
+    ]
+    dialect = session.get_bind().dialect.name
+    if any(r["idempotency_key_hash"] for r in rows) and dialect in {"postgresql", "sqlite"}:
+        insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = insert_fn(Job).on_conflict_do_nothing(index_elements=[Job.idempotency_key_hash]).returning(Job.id)
+        inserted = set(session.scalars(stmt, rows).all())
+    else:
+        session.execute(insert(Job), rows)
+        inserted = {r["id"] for r in rows}
+
+    lost = [r["idempotency_key_hash"] for r in rows if r["id"] not in inserted]
+    owners: dict[bytes | None, Job] = {}
+    if lost:
+        owners = {j.idempotency_key_hash: j for j in session.scalars(select(Job).where(Job.idempotency_key_hash.in_(lost)))}
+
+    step_rows: list[dict[str, Any]] = []
+    out: list[Job | IdempotencyConflict] = []
+    for spec, row in zip(specs, rows):
+        if row["id"] not in inserted:
+            owner = owners.get(row["idempotency_key_hash"])
+            if owner is None:  # pragma: no cover - key released between insert and lookup
+                raise RuntimeError("idempotency conflict but owning job not found")
+            out.append(IdempotencyConflict(owner))
+            continue
+        out.append(Job(**row))
+        step_rows.append(
+            {"id": _uuid.uuid4(), "job_id": row["id"], "name": "generate", "status": "queued", "metadata_json": {},
+             "schema_version": 1, "created_at": now, "updated_at": now}
+        )
+        if spec.upscale is not None:
+            # Ordered after generate (steps are listed by created_at)
+            later = now + timedelta(microseconds=1)
+            step_rows.append(
+                {"id": _uuid.uuid4(), "job_id": row["id"], "name": "upscale", "status": "queued",
+                 "metadata_json": dict(spec.upscale), "schema_version": 1, "created_at": later, "updated_at": later}
+            )
+    if step_rows:
+        session.execute(insert(Step), step_rows)
+    return out
+
+
 def get_step_by_name(session: Session, *, job_id: str | _uuid.UUID, name: str) -> Step | None:
     jid = str(job_id)
     return session.scalars(
@@ -127,17 +319,126 @@ def get_job_with_steps(session: Session, job_id: str | _uuid.UUID) -> tuple[Job
     return job, list(steps)
 
 
-def list_jobs(session: Session, *, status: str | None = None, limit: int = 20) -> list[Job]:
-    """List recent jobs ordered by updated_at desc with optional status filter.
+class StepDetail(NamedTuple):
+    id: _uuid.UUID
+    name: str
+    status: str
+    artifact_count: int
 
-    Caps limit to 200 to avoid accidental large scans.
+
+class JobDetail(NamedTuple):
+    """Lightweight job status view: job columns as a Row plus per-step artifact counts."""
+
+    job: Row
+    steps: list[StepDetail]
+
+    @property
+    def artifact_count(self) -> int:
+        return sum(s.artifact_count for s in self.steps)
+
+
+def get_job_detail(session: Session, job_id: str | _uuid.UUID) -> JobDetail | None:
+    """Fetch a job, its steps and per-step artifact counts in a single query.
+
+    Returns column tuples rather than ORM entities; artifact rows (and their
+    metadata_json) are counted in the database, never materialized.
     """
-    lmt = max(1, min(int(limit), 200))
-    stmt = select(Job)
-    if status:
-        stmt = stmt.where(Job.status == status)
-    stmt = stmt.order_by(Job.updated_at.desc()).limit(lmt)
-    return list(session.scalars(stmt).all())
+    try:
+        jid = _uuid.UUID(str(job_id))
+    except ValueError:
+        return None
+    art_count = (
+        select(func.count(Artifact.id))
+        .where(Artifact.job_id == Job.id, Artifact.step_id == Step.id)
+        .correlate(Job, Step)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(
+            Job.id,
+            Job.type,
+            Job.status,
+            Job.priority,
+            Job.params_json,
+            Job.created_at,
+            Job.updated_at,
+            Job.error_code,
+            Job.error_message,
+            Step.id.label("step_id"),
+            Step.name.label("step_name"),
+            Step.status.label("step_status"),
+            art_count.label("step_artifacts"),
+        )
+        .outerjoin(Step, Step.job_id == Job.id)
+        .where(Job.id == jid)
+        .order_by(Step.created_at.asc())
+    )
+    rows = session.execute(stmt).all()
+    if not rows:
+        return None
+    steps = [
+        StepDetail(id=r.step_id, name=r.step_name, status=r.step_status, artifact_count=int(r.step_artifacts or 0))
+        for r in rows
+        if r.step_id is not None
+    ]
+    return JobDetail(job=rows[0], steps=steps)
+
+
+class JobVersion(NamedTuple):
+    """High-water marks of everything a job's read endpoints render (for ETags)."""
+
+    id: _uuid.UUID
+    status: str
+    updated_at: datetime
+    steps_updated_at: datetime | None
+    artifact_count: int
+    artifacts_at: datetime | None
+    event_count: int
+    events_at: datetime | None
+
+    def status_view(self) -> tuple[Any, ...]:
+        """The marks ``GET /v1/jobs/{id}`` renders: events (log lines) are not among them."""
+        return (self.id, self.status, self.updated_at, self.steps_updated_at, self.artifact_count)
+
+
+def get_job_version(session: Session, job_id: str | _uuid.UUID) -> JobVersion | None:
+    """One indexed aggregate query: job row plus step/artifact/event high-water marks.
+
+    Cheap enough to run on every conditional GET; the full response is only built when
+    this changed.
+    """
+    try:
+        jid = _uuid.UUID(str(job_id))
+    except ValueError:
+        return None
+
+    def _agg(*cols: Any, model: Any) -> Any:
+        return select(*cols).where(model.job_id == Job.id).correlate(Job).scalar_subquery()
+
+    stmt = select(
+        Job.id,
+        Job.status,
+        Job.updated_at,
+        _agg(func.max(Step.updated_at), model=Step).label("steps_updated_at"),
+        _agg(func.count(Artifact.id), model=Artifact).label("artifact_count"),
+        _agg(func.max(Artifact.created_at), model=Artifact).label("artifacts_at"),
+        _agg(func.count(Event.id), model=Event).label("event_count"),
+        _agg(func.max(Event.ts), model=Event).label("events_at"),
+    ).where(Job.id == jid)
+    row = session.execute(stmt).first()
+    if row is None:
+        return None
+    return JobVersion(
+        id=row.id,
+        status=row.status,
+        updated_at=row.updated_at,
+        steps_updated_at=row.steps_updated_at,
+        artifact_count=int(row.artifact_count or 0),
+        artifacts_at=row.artifacts_at,
+        event_count=int(row.event_count or 0),
+        events_at=row.events_at,
+    )
+
 
 def list_jobs(session: Session, *, status: str | None = None, limit: int = 20) -> list[Job]:
     """List recent jobs ordered by updated_at desc with optional status filter.
@@ -152,6 +453,25 @@ def list_jobs(session: Session, *, status: str | None = None, limit: int = 20) -
     return list(session.scalars(stmt).all())
 
 
+def get_artifact(session: Session, artifact_id: str | _uuid.UUID) -> Artifact | None:
+    aid = str(artifact_id)
+    return session.scalars(select(Artifact).where(cast(Artifact.id, String) == aid)).first()
+
+
+def set_artifact_preview(session: Session, artifact_id: str | _uuid.UUID, preview_key: str) -> None:
+    """Record a rendered preview's key in the artifact's metadata.
+
+    Also bumps the job's ``updated_at``: artifact listings change (``preview_url`` is
+    signed directly from now on), so their ETags must too.
+    """
+    art = get_artifact(session, artifact_id)
+    if art is not None and (art.metadata_json or {}).get("preview_key") != preview_key:
+        # JSON columns are not mutation-tracked: assign a new dict
+        art.metadata_json = {**(art.metadata_json or {}), "preview_key": preview_key}
+        session.execute(update(Job).where(Job.id == art.job_id).values(updated_at=_utcnow()))
+        session.flush()
+
+
 def list_artifacts_by_job(session: Session, job_id: str | _uuid.UUID) -> list[Artifact]:
     jid = str(job_id)
     rows = session.scalars(
@@ -185,6 +505,172 @@ def iter_events(
     return out
 
 
+class EventCursor(NamedTuple):
+    """Keyset position in a job's event log: events sort by (ts, id)."""
+
+    ts: datetime
+    id: _uuid.UUID
+
+
+def page_events(
+    session: Session,
+    job_id: str | _uuid.UUID,
+    *,
+    after: EventCursor | None = None,
+    since_ts: datetime | None = None,
+    limit: int = 500,
+) -> list[Event]:
+    """Next ``limit`` events after ``after`` (or from ``since_ts``) in (ts, id) order.
+
+    Keyset pagination: each page is one short indexed query, so a stream over many
+    thousands of events holds neither a connection nor more than one page of rows.
+    """
+    try:
+        job_filter = Event.job_id == _uuid.UUID(str(job_id))
+    except ValueError:
+        return []
+    stmt = select(Event).where(job_filter)
+    if after is not None:
+        stmt = stmt.where(or_(Event.ts > after.ts, and_(Event.ts == after.ts, Event.id > after.id)))
+    elif since_ts is not None:
+        stmt = stmt.where(Event.ts >= since_ts)
+    stmt = stmt.order_by(Event.ts.asc(), Event.id.asc()).limit(max(1, int(limit)))
+    return list(session.scalars(stmt).all())
+
+
+def tail_cursor(session: Session, job_id: str | _uuid.UUID, tail: int) -> EventCursor | None:
+    """Cursor just before the last ``tail`` events (None: start from the beginning)."""
+    try:
+        jid = _uuid.UUID(str(job_id))
+    except ValueError:
+        return None
+    row = session.execute(
+        select(Event.ts, Event.id)
+        .where(Event.job_id == jid)
+        .order_by(Event.ts.desc(), Event.id.desc())
+        .offset(max(1, int(tail)))
+        .limit(1)
+    ).first()
+    return EventCursor(ts=row.ts, id=row.id) if row else None
+
+
+class JobLoad(NamedTuple):
+    queued: int
+    running: int
+    # Jobs that reached a terminal status since the window start (throughput)
+    finished: int
+
+
+def get_job_load(session: Session, *, finished_since: datetime) -> JobLoad:
+    """Queued/running counts and recent completions in one statement (status/updated_at indexes)."""
+    def _count(*conds: Any) -> Any:
+        return select(func.count(Job.id)).where(*conds).scalar_subquery()
+
+    row = session.execute(
+        select(
+            _count(Job.status == "queued").label("queued"),
+            _count(Job.status == "running").label("running"),
+            _count(Job.status.in_(("succeeded", "failed")), Job.updated_at >= finished_since).label("finished"),
+        )
+    ).one()
+    return JobLoad(queued=int(row.queued or 0), running=int(row.running or 0), finished=int(row.finished or 0))
+
+
+class JobWindowStats(NamedTuple):
+    window_s: int
+    succeeded: int
+    failed: int
+    # Seconds from submission to the terminal status, over jobs that succeeded in the window
+    duration_p50_s: float | None
+    duration_p95_s: float | None
+
+
+class JobStats(NamedTuple):
+    counts: dict[tuple[str, str], int]
+    oldest_queued_at: datetime | None
+    windows: list[JobWindowStats]
+
+
+def _percentile_cont(values: list[float], q: float) -> float | None:
+    # Same interpolation as Postgres percentile_cont
+    if not values:
+        return None
+    pos = q * (len(values) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def get_job_stats(session: Session, *, now: datetime, windows: list[int]) -> JobStats:
+    """Counts by (status, type) plus completion windows, in two aggregate statements.
+
+    The GROUP BY covers the whole table; the window statement only reads jobs that
+    finished within the largest window (partial ``jobs_finished_idx`` on Postgres), and
+    the oldest queued job comes from the partial ``jobs_active_idx``.
+
+    Durations (``updated_at - created_at`` of succeeded jobs) are percentiles from
+    ``percentile_cont`` on Postgres. SQLite (the dev/test fallback) has no ordered-set
+    aggregates or interval arithmetic: durations are ``julianday`` differences in
+    seconds, returned as one JSON array and interpolated in Python the same way.
+    """
+    windows = sorted({int(w) for w in windows if int(w) > 0}) or [3600]
+    counts = {
+        (row.status, row.type): int(row.n)
+        for row in session.execute(select(Job.status, Job.type, func.count().label("n")).group_by(Job.status, Job.type))
+    }
+
+    since = {w: now - timedelta(seconds=w) for w in windows}
+    done = Job.status.in_(("succeeded", "failed"))
+    postgres = session.get_bind().dialect.name == "postgresql"
+    duration: ColumnElement[float]
+    if postgres:
+        # EXTRACT returns numeric on Postgres 14+; percentile_cont orders double precision
+        duration = cast(func.extract("epoch", Job.updated_at - Job.created_at), Float)
+    else:
+        duration = (func.julianday(Job.updated_at) - func.julianday(Job.created_at)) * 86400.0
+    cols: list[Any] = [
+        select(func.min(Job.created_at)).where(Job.status == "queued").scalar_subquery().label("oldest_queued_at")
+    ]
+    for w in windows:
+        recent = Job.updated_at >= since[w]
+        cols.append(func.count().filter(recent, Job.status == "succeeded").label(f"s_{w}"))
+        cols.append(func.count().filter(recent, Job.status == "failed").label(f"f_{w}"))
+        if postgres:
+            ok = and_(recent, Job.status == "succeeded")
+            cols.append(func.percentile_cont(0.5).within_group(duration).filter(ok).label(f"p50_{w}"))
+            cols.append(func.percentile_cont(0.95).within_group(duration).filter(ok).label(f"p95_{w}"))
+    if not postgres:
+        # No ordered-set aggregates: fetch the (bounded) succeeded durations alongside
+        cols.append(func.json_group_array(func.json_array(Job.updated_at, duration)).filter(Job.status == "succeeded").label("durations"))
+    row = session.execute(select(*cols).select_from(Job).where(done, Job.updated_at >= since[windows[-1]])).one()
+
+    samples: list[tuple[datetime, float]] = []
+    if not postgres and row.durations:
+        samples = [(_as_utc(datetime.fromisoformat(ts)), float(d)) for ts, d in json.loads(row.durations) if d is not None]
+    out: list[JobWindowStats] = []
+    for w in windows:
+        if postgres:
+            p50, p95 = getattr(row, f"p50_{w}"), getattr(row, f"p95_{w}")
+        else:
+            values = sorted(d for ts, d in samples if ts >= since[w])
+            p50, p95 = _percentile_cont(values, 0.5), _percentile_cont(values, 0.95)
+        out.append(
+            JobWindowStats(
+                window_s=w,
+                succeeded=int(getattr(row, f"s_{w}") or 0),
+                failed=int(getattr(row, f"f_{w}") or 0),
+                duration_p50_s=float(p50) if p50 is not None else None,
+                duration_p95_s=float(p95) if p95 is not None else None,
+            )
+        )
+    oldest = row.oldest_queued_at
+    return JobStats(counts=counts, oldest_queued_at=_as_utc(oldest) if oldest is not None else None, windows=out)
+
+
+def get_job_status(session: Session, job_id: str | _uuid.UUID) -> str | None:
+    return session.scalar(select(Job.status).where(cast(Job.id, String) == str(job_id)))
+
+
 def progress_for_job(session: Session, job_id: str | _uuid.UUID) -> float:
     job = get_job(session, job_id)
     if not job:
@@ -226,6 +712,7 @@ def mark_job_status(session: Session, job_id: _uuid.UUID, status: str, error: di
         values["error_code"] = error.get("code")
         values["error_message"] = json.dumps(error)
     session.execute(update(Job).where(cast(Job.id, String) == str(job_id)).values(**values))
+    notify.job_changed(session, job_id)
 
 
 def append_event(
@@ -248,6 +735,7 @@ def append_event(
     )
     session.add(evt)
     session.flush()
+    notify.job_changed(session, job_id)
     return evt
 
 
@@ -281,11 +769,90 @@ def insert_artifact(
     )
     session.add(art)
     session.flush()
+    notify.job_changed(session, job_id)
     return art
 
 
+def insert_artifacts_bulk(
+    session: Session,
+    *,
+    job_id: _uuid.UUID,
+    step_id: _uuid.UUID,
+    artifacts: list[dict[str, Any]],
+) -> int:
+    """Insert many artifacts and their ``artifact.written`` events, one INSERT per table.
+
+    Each item takes the insert_artifact() fields (format, width, height, seed, item_index,
+    s3_key, checksum, metadata_json) plus optional ``ts`` (defaults to now) and
+    ``event_payload`` (defaults to s3_key/seed/item_index).
+    """
+    if not artifacts:
+        return 0
+    art_rows: list[dict[str, Any]] = []
+    evt_rows: list[dict[str, Any]] = []
+    for a in artifacts:
+        ts = a.get("ts") or _utcnow()
+        art_rows.append(
+            {
+                "id": _uuid.uuid4(),
+                "job_id": job_id,
+                "step_id": step_id,
+                "created_at": ts,
+                "format": a["format"],
+                "width": a["width"],
+                "height": a["height"],
+                "seed": a.get("seed"),
+                "item_index": a["item_index"],
+                "s3_key": a["s3_key"],
+                "checksum": a.get("checksum"),
+                "metadata_json": a.get("metadata_json") or {},
+            }
+        )
+        payload = a.get("event_payload")
+        if payload is None:
+            payload = {"s3_key": a["s3_key"], "seed": a.get("seed"), "item_index": a["item_index"]}
+        evt_rows.append(
+            {
+                "id": _uuid.uuid4(),
+                "job_id": job_id,
+                "step_id": step_id,
+                "ts": ts,
+                "code": "artifact.written",
+                "level": "info",
+                "payload_json": payload,
+            }
+        )
+    session.execute(insert(Artifact), art_rows)
+    session.execute(insert(Event), evt_rows)
+    notify.job_changed(session, job_id)
+    return len(art_rows)
+
+
 # --- Models (Registry) ---
 
+REGISTRY_CHANGED_KEY = "df_registry_changed"
+
+
+def get_registry_version(session: Session) -> int:
+    version = session.scalar(select(RegistryVersion.version).where(RegistryVersion.id == 1))
+    return int(version or 0)
+
+
+def _bump_registry_version(session: Session) -> None:
+    # Every registry write bumps the counter so caches in other processes see the change
+    bumped = session.execute(
+        update(RegistryVersion)
+        .where(RegistryVersion.id == 1)
+        .values(version=RegistryVersion.version + 1, updated_at=_utcnow())
+        .returning(RegistryVersion.version)
+    ).scalar_one_or_none()
+    if bumped is None:
+        session.add(RegistryVersion(id=1, version=1, updated_at=_utcnow()))
+        session.flush()
+    # ... and caches in this process drop their entries as soon as the write commits
+    session.info[REGISTRY_CHANGED_KEY] = True
+
+
 def list_models(session: Session, *, enabled_only: bool = True) -> list[Model]:
     stmt = select(Model)
     if enabled_only:
@@ -331,6 +898,7 @@ def upsert_model(
             existing.capabilities = capabilities
         existing.updated_at = now
         session.flush()
+        _bump_registry_version(session)
         return existing
 
     m = Model(
@@ -349,6 +917,7 @@ def upsert_model(
     )
     session.add(m)
     session.flush()
+    _bump_registry_version(session)
     return m
 
 
@@ -365,6 +934,7 @@ def mark_model_installed(
         .where(cast(Model.id, String) == str(model_id))
         .values(local_path=local_path, files_json=files_json, installed=1 if installed else 0, updated_at=_utcnow())
     )
+    _bump_registry_version(session)
 
 
 def set_model_enabled(session: Session, *, model_id: _uuid.UUID, enabled: bool) -> None:
@@ -373,6 +943,7 @@ def set_model_enabled(session: Session, *, model_id: _uuid.UUID, enabled: bool)
         .where(cast(Model.id, String) == str(model_id))
         .values(enabled=1 if enabled else 0, updated_at=_utcnow())
     )
+    _bump_registry_version(session)
 
 
 def get_default_model(session: Session, *, kind: str = "sdxl-checkpoint") -> Model | None:
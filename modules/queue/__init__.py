@@ -0,0 +1 @@
+"""Task queue helpers shared by the API and workers."""
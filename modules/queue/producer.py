@@ -0,0 +1,145 @@
+"""Process-wide Celery producer for enqueuing tasks by name.
+
+The API (``POST /v1/jobs``) and chained worker steps publish through one lazily built
+Celery app per process. Its broker connections and producers come from Celery's
+pools (``DF_BROKER_POOL_LIMIT``) instead of a new app and connection per enqueue.
+Publishing retries transient broker errors with a short backoff, and each enqueue
+records latency and outcome.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any
+
+from celery import Celery
+from prometheus_client import Counter, Histogram
+
+DEFAULT_QUEUE = "gpu.default"
+# Job priority -> broker queue; workers drain them in this order (see services/worker/celery_app.py)
+PRIORITY_QUEUES = {"high": "gpu.high", "normal": DEFAULT_QUEUE, "low": "gpu.low"}
+
+_ENQUEUE_SECONDS = Histogram(
+    "df_enqueue_seconds",
+    "Time to publish a task to the broker",
+    ["task"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+_ENQUEUE_TOTAL = Counter("df_enqueue_total", "Task publish attempts", ["task", "result"])
+
+_lock = threading.Lock()
+_app: Celery | None = None
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _build() -> Celery:
+    app = Celery("df_producer", broker=os.getenv("DF_REDIS_URL", "redis://127.0.0.1:6379/0"), set_as_current=False)
+    app.conf.update(
+        broker_connection_retry_on_startup=True,
+        broker_pool_limit=_int_env("DF_BROKER_POOL_LIMIT", 10),
+        broker_connection_timeout=_float_env("DF_BROKER_CONNECT_TIMEOUT_S", 2.0),
+        # Publisher confirms on AMQP brokers; Redis acknowledges each LPUSH synchronously
+        broker_transport_options={
+            "confirm_publish": True,
+            "socket_connect_timeout": _float_env("DF_BROKER_CONNECT_TIMEOUT_S", 2.0),
+            "socket_timeout": _float_env("DF_BROKER_SOCKET_TIMEOUT_S", 5.0),
+            "health_check_interval": 30,
+        },
+        task_publish_retry=True,
+        task_publish_retry_policy={
+            "max_retries": _int_env("DF_ENQUEUE_MAX_RETRIES", 3),
+            "interval_start": 0.0,
+            "interval_step": _float_env("DF_ENQUEUE_RETRY_STEP_S", 0.2),
+            "interval_max": 1.0,
+        },
+    )
+    return app
+
+
+def producer_app() -> Celery:
+    global _app
+    if _app is None:
+        with _lock:
+            if _app is None:
+                _app = _build()
+    return _app
+
+
+def queue_for(priority: str | None) -> str:
+    """Broker queue for a job priority; unknown or missing priorities run as normal."""
+    return PRIORITY_QUEUES.get(priority or "normal", DEFAULT_QUEUE)
+
+
+def enqueue(task_name: str, *, kwargs: dict[str, Any], queue: str = DEFAULT_QUEUE) -> None:
+    """Publish ``task_name`` with ``kwargs``; raises after retries are exhausted."""
+    t0 = time.perf_counter()
+    try:
+        producer_app().send_task(task_name, kwargs=kwargs, queue=queue)
+    except Exception:
+        _ENQUEUE_TOTAL.labels(task=task_name, result="error").inc()
+        raise
+    finally:
+        _ENQUEUE_SECONDS.labels(task=task_name).observe(time.perf_counter() - t0)
+    _ENQUEUE_TOTAL.labels(task=task_name, result="ok").inc()
+
+
+def enqueue_many(task_name: str, kwargs_list: list[dict[str, Any]], *, queue: str = DEFAULT_QUEUE) -> list[Exception | None]:
+    """Publish a batch over one pooled producer (channel); per-message errors are returned."""
+    app = producer_app()
+    results: list[Exception | None] = []
+    try:
+        with app.producer_or_acquire() as prod:
+            for kwargs in kwargs_list:
+                t0 = time.perf_counter()
+                try:
+                    app.send_task(task_name, kwargs=kwargs, queue=queue, producer=prod)
+                    _ENQUEUE_TOTAL.labels(task=task_name, result="ok").inc()
+                    results.append(None)
+                except Exception as exc:  # noqa: BLE001
+                    _ENQUEUE_TOTAL.labels(task=task_name, result="error").inc()
+                    results.append(exc)
+                finally:
+                    _ENQUEUE_SECONDS.labels(task=task_name).observe(time.perf_counter() - t0)
+    except Exception as exc:  # noqa: BLE001 - could not acquire a producer at all
+        _ENQUEUE_TOTAL.labels(task=task_name, result="error").inc(len(kwargs_list) - len(results))
+        results.extend(exc for _ in range(len(kwargs_list) - len(results)))
+    return results
+
+
+def queue_depth(queue: str = DEFAULT_QUEUE) -> int | None:
+    """Messages waiting in ``queue`` on the broker; None if the broker cannot be asked.
+
+    A passive declare over a pooled connection: no queue is created, and a queue the
+    broker does not know (Redis deletes empty lists) counts as empty.
+    """
+    try:
+        with producer_app().connection_or_acquire() as conn:
+            return int(conn.default_channel.queue_declare(queue=queue, passive=True).message_count)
+    except Exception as exc:  # noqa: BLE001
+        if str(getattr(exc, "reply_code", getattr(exc, "code", ""))) == "404":
+            return 0
+        return None
+
+
+def reset() -> None:
+    """Drop the cached app and its pooled connections (tests, config reload)."""
+    global _app
+    with _lock:
+        app, _app = _app, None
+    if app is not None:
+        app.close()
@@ -0,0 +1,139 @@
+"""Small preview renditions of artifacts, stored next to the original in S3.
+
+A preview is the artifact scaled to fit ``DF_PREVIEW_SIZE`` pixels (longest side),
+encoded as WebP (JPEG when Pillow lacks WebP, or with ``DF_PREVIEW_FORMAT=jpeg``) at
+``DF_PREVIEW_QUALITY``. Its key is derived from the artifact key and the rendition
+parameters, so it is written once and never changes. Workers render previews while
+the output is still in memory; for older artifacts ``ensure_preview`` renders one from
+the stored original, in the ``maintenance.render_preview`` worker task.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+import threading
+
+from botocore.exceptions import ClientError
+from PIL import Image, features
+from prometheus_client import Counter, Histogram
+
+from . import s3 as s3mod
+
+_log = logging.getLogger(__name__)
+
+_RENDERED = Counter("df_preview_rendered_total", "Preview renditions rendered", ["source"])
+_RENDER_SECONDS = Histogram(
+    "df_preview_render_seconds",
+    "Time to decode, scale and encode one preview",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+_CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+def preview_size() -> int:
+    try:
+        return max(32, min(2048, int(os.getenv("DF_PREVIEW_SIZE", "512"))))
+    except ValueError:
+        return 512
+
+
+def preview_format() -> str:
+    fmt = os.getenv("DF_PREVIEW_FORMAT", "webp").strip().lower()
+    if fmt in {"jpg", "jpeg"} or not features.check("webp"):
+        return "jpeg"
+    return "webp"
+
+
+def _quality() -> int:
+    try:
+        return max(1, min(100, int(os.getenv("DF_PREVIEW_QUALITY", "80"))))
+    except ValueError:
+        return 80
+
+
+def eager_enabled() -> bool:
+    return os.getenv("DF_PREVIEW_EAGER", "1").strip().lower() in {"1", "true", "yes"}
+
+
+def preview_key(s3_key: str, size: int | None = None, fmt: str | None = None) -> str:
+    """Derived key: ``<artifact key without extension>.preview-<size>.<fmt>``."""
+    size = size or preview_size()
+    fmt = fmt or preview_format()
+    stem, dot, ext = s3_key.rpartition(".")
+    base = stem if dot and "/" not in ext else s3_key
+    return f"{base}.preview-{size}.{'jpg' if fmt == 'jpeg' else fmt}"
+
+
+def render(data: bytes, size: int | None = None, fmt: str | None = None) -> bytes:
+    """Scale an encoded image to fit ``size`` x ``size`` and encode it as ``fmt``."""
+    size = size or preview_size()
+    fmt = fmt or preview_format()
+    with _RENDER_SECONDS.time():
+        src = Image.open(io.BytesIO(data))
+        # JPEG sources decode at a reduced scale directly; others are reduced in one pass
+        src.draft("RGB", (size, size))
+        img = src.convert("RGBA" if fmt == "webp" and src.mode in {"RGBA", "LA", "P"} else "RGB")
+        img.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        out = io.BytesIO()
+        if fmt == "webp":
+            img.save(out, format="WEBP", quality=_quality(), method=4)
+        else:
+            img.save(out, format="JPEG", quality=_quality(), optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def store_preview(cfg: s3mod.S3Config, s3_key: str, data: bytes, *, source: str = "worker") -> str:
+    """Render ``data`` (the artifact bytes) and upload the preview; returns its key."""
+    size, fmt = preview_size(), preview_format()
+    key = preview_key(s3_key, size, fmt)
+    s3mod.upload_bytes(cfg, key, render(data, size, fmt), content_type=_CONTENT_TYPES[fmt])
+    _RENDERED.labels(source=source).inc()
+    return key
+
+
+def eager_preview(cfg: s3mod.S3Config, s3_key: str, data: bytes) -> str | None:
+    """Worker output stage: ``store_preview`` unless disabled; a failure never fails the job."""
+    if not eager_enabled():
+        return None
+    try:
+        return store_preview(cfg, s3_key, data)
+    except Exception:  # noqa: BLE001
+        _log.warning("preview rendition for %s failed; it will be rendered on request", s3_key, exc_info=True)
+        return None
+
+
+def _exists(cfg: s3mod.S3Config, key: str) -> bool:
+    try:
+        s3mod.client(cfg).head_object(Bucket=cfg.bucket, Key=key)
+        return True
+    except ClientError as exc:
+        if exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode") == 404:
+            return False
+        raise
+
+
+_LOCKS: dict[str, threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+def ensure_preview(cfg: s3mod.S3Config, s3_key: str) -> str:
+    """Key of the artifact's preview, rendering it from the original if S3 lacks it.
+
+    Concurrent callers in one process render a given preview once; across processes a
+    duplicate render only rewrites identical bytes.
+    """
+    key = preview_key(s3_key)
+    with _LOCKS_GUARD:
+        lock = _LOCKS.setdefault(key, threading.Lock())
+    try:
+        with lock:
+            if not _exists(cfg, key):
+                store_preview(cfg, s3_key, s3mod.download_bytes(cfg, s3_key), source="on_demand")
+    finally:
+        with _LOCKS_GUARD:
+            if not lock.locked():
+                _LOCKS.pop(key, None)
+    return key
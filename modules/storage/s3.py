@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import math
 import os
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from urllib.parse import urlparse
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
+from typing import Any
 
 import boto3
+from prometheus_client import Counter
+
+_PRESIGNS = Counter("df_presign_total", "Presigned GET URLs served", ["result"])
 
 
 @dataclass
@@ -28,15 +36,41 @@ def from_env() -> S3Config:
     return S3Config(endpoint=str(endpoint), access_key=str(access_key), secret_key=str(secret_key), bucket=str(bucket), region=region)
 
 
+# boto3 clients are thread-safe once built; building one costs milliseconds (endpoint
+# and credential resolution), so keep one per endpoint/credentials for the process.
+_CLIENTS: dict[tuple, Any] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _client_for(endpoint: str, cfg: S3Config):
+    key = (endpoint, cfg.access_key, cfg.secret_key, cfg.region)
+    c = _CLIENTS.get(key)
+    if c is None:
+        with _CLIENTS_LOCK:
+            c = _CLIENTS.get(key)
+            if c is None:
+                c = boto3.session.Session().client(
+                    "s3",
+                    endpoint_url=endpoint,
+                    aws_access_key_id=cfg.access_key,
+                    aws_secret_access_key=cfg.secret_key,
+                    region_name=cfg.region,
+                )
+                _CLIENTS[key] = c
+    return c
+
+
 def client(cfg: S3Config):
-    sess = boto3.session.Session()
-    return sess.client(
-        "s3",
-        endpoint_url=cfg.endpoint,
-        aws_access_key_id=cfg.access_key,
-        aws_secret_access_key=cfg.secret_key,
-        region_name=cfg.region,
-    )
+    return _client_for(cfg.endpoint, cfg)
+
+
+def _public_endpoint() -> str | None:
+    return os.getenv("DF_S3_PUBLIC_ENDPOINT") or os.getenv("DF_MINIO_PUBLIC_ENDPOINT")
+
+
+def signing_client(cfg: S3Config):
+    """Client used to sign GET URLs: the public endpoint when one is configured."""
+    return _client_for(_public_endpoint() or cfg.endpoint, cfg)
 
 
 def upload_bytes(cfg: S3Config, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
@@ -44,28 +78,95 @@ def upload_bytes(cfg: S3Config, key: str, data: bytes, content_type: str = "appl
     s3.put_object(Bucket=cfg.bucket, Key=key, Body=data, ContentType=content_type)
 
 
+def _presign_bucket_s() -> int:
+    try:
+        return max(1, int(os.getenv("DF_PRESIGN_BUCKET_S", "300")))
+    except ValueError:
+        return 300
+
+
+def _presign_cache_max() -> int:
+    try:
+        return max(0, int(os.getenv("DF_PRESIGN_CACHE_MAX", "10000")))
+    except ValueError:
+        return 10000
+
+
+def presign_expiry(expires: timedelta, now: float | None = None) -> datetime:
+    """Expiry of a URL presigned now for ``expires``: rounded up to a ``DF_PRESIGN_BUCKET_S`` boundary.
+
+    All presigns of a key within one bucket share this expiry, and therefore one URL.
+    """
+    now = time.time() if now is None else now
+    bucket = _presign_bucket_s()
+    return datetime.fromtimestamp(math.ceil((now + expires.total_seconds()) / bucket) * bucket, tz=timezone.utc)
+
+
+_URLS: OrderedDict[tuple, str] = OrderedDict()
+_URLS_LOCK = threading.Lock()
+
+
 def presign_get(cfg: S3Config, key: str, expires: timedelta = timedelta(hours=1)) -> str:
     """Generate a presigned URL for GET with optional public endpoint override.
 
     If DF_S3_PUBLIC_ENDPOINT or DF_MINIO_PUBLIC_ENDPOINT is set, we sign the URL
     against that endpoint so the returned URL is directly reachable by external clients.
     Internal SDK operations should continue to use the internal endpoint.
+
+    URLs are valid until ``presign_expiry(expires)`` (at least ``expires`` from now) and
+    are cached per (key, expiry bucket), so repeated listings reuse one signature until
+    the bucket rolls over (``DF_PRESIGN_CACHE_MAX`` entries, LRU; 0 disables).
     """
-    public_endpoint = os.getenv("DF_S3_PUBLIC_ENDPOINT") or os.getenv("DF_MINIO_PUBLIC_ENDPOINT")
-    if public_endpoint:
-        # Build a client targeting the public endpoint for signing only
-        sess = boto3.session.Session()
-        s3 = sess.client(
-            "s3",
-            endpoint_url=public_endpoint,
-            aws_access_key_id=cfg.access_key,
-            aws_secret_access_key=cfg.secret_key,
-            region_name=cfg.region,
-        )
-    else:
-        s3 = client(cfg)
-    return s3.generate_presigned_url(
+    now = time.time()
+    expiry = presign_expiry(expires, now)
+    endpoint = _public_endpoint() or cfg.endpoint
+    cache_key = (endpoint, cfg.access_key, cfg.bucket, key, int(expiry.timestamp()))
+    limit = _presign_cache_max()
+    if limit:
+        with _URLS_LOCK:
+            url = _URLS.get(cache_key)
+            if url is not None:
+                _URLS.move_to_end(cache_key)
+                _PRESIGNS.labels(result="hit").inc()
+                return url
+    url = signing_client(cfg).generate_presigned_url(
         ClientMethod="get_object",
         Params={"Bucket": cfg.bucket, "Key": key},
-        ExpiresIn=int(expires.total_seconds()),
+        ExpiresIn=max(1, math.ceil(expiry.timestamp() - now)),
     )
+    _PRESIGNS.labels(result="miss").inc()
+    if limit:
+        with _URLS_LOCK:
+            _URLS[cache_key] = url
+            while len(_URLS) > limit:
+                _URLS.popitem(last=False)
+    return url
+
+
+def clear_caches() -> None:
+    """Drop cached clients and presigned URLs (credential rotation, tests)."""
+    with _CLIENTS_LOCK:
+        _CLIENTS.clear()
+    with _URLS_LOCK:
+        _URLS.clear()
+
+
+def open_object(cfg: S3Config, key: str, *, byte_range: str | None = None, if_none_match: str | None = None) -> dict[str, Any]:
+    """``get_object`` response with an unread streaming ``Body``; the caller must close it.
+
+    ``byte_range`` and ``if_none_match`` are forwarded as the ``Range`` and
+    ``If-None-Match`` headers, so S3 answers partial content or not modified
+    itself (``ClientError`` with status 304/416).
+    """
+    params: dict[str, Any] = {"Bucket": cfg.bucket, "Key": key}
+    if byte_range:
+        params["Range"] = byte_range
+    if if_none_match:
+        params["IfNoneMatch"] = if_none_match
+    return client(cfg).get_object(**params)
+
+
+def download_bytes(cfg: S3Config, key: str) -> bytes:
+    s3 = client(cfg)
+    obj = s3.get_object(Bucket=cfg.bucket, Key=key)
+    return obj["Body"].read()
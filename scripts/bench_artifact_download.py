@@ -0,0 +1,168 @@
+"""Benchmark GET /v1/artifacts/{id}/content against a local S3 stand-in.
+
+Starts a minimal path-style S3 GetObject server (``Range`` aware) in a thread, points
+the API at it, runs the API under uvicorn, then downloads one large artifact:
+
+- ``direct``: straight from the stand-in (the ceiling a presigned URL would reach);
+- ``proxy``:  through the API endpoint, chunked relay;
+- ``range``:  1 MiB ranges through the API.
+
+Peak Python heap (tracemalloc) during a proxied download is compared with reading the
+object whole via ``s3.download_bytes``, as a buffering proxy would. The stand-in serves
+from a preallocated buffer, so the peak reflects the API side.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_artifact_download.py --mib 32 --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import re
+import socket
+import statistics
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("DF_DB_ROLE", "api")
+os.environ.setdefault("DF_MINIO_ACCESS_KEY", "bench")
+os.environ.setdefault("DF_MINIO_SECRET_KEY", "bench-secret")
+os.environ.setdefault("DF_MINIO_BUCKET", "dreamforge")
+os.environ.setdefault("DF_S3_REGION", "us-east-1")
+
+_KEY = "jobs/bench/upscaled.png"
+_OBJECTS: dict[str, memoryview] = {}
+
+
+class _S3Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:  # noqa: ANN002
+        pass
+
+    def do_GET(self) -> None:  # noqa: N802
+        key = self.path.split("?", 1)[0].split("/", 2)[-1]
+        data = _OBJECTS.get(key)
+        if data is None:
+            body = b"<Error><Code>NoSuchKey</Code></Error>"
+            self.send_response(404)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        first, last, status = 0, len(data) - 1, 200
+        m = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+        if m:
+            first = int(m.group(1))
+            last = min(int(m.group(2)) if m.group(2) else last, last)
+            status = 206
+        self.send_response(status)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(last - first + 1))
+        self.send_header("ETag", '"bench-etag"')
+        self.send_header("Last-Modified", "Thu, 01 Jan 2026 00:00:00 GMT")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {first}-{last}/{len(data)}")
+        self.end_headers()
+        step = 1 << 20
+        for off in range(first, last + 1, step):
+            self.wfile.write(data[off : min(off + step, last + 1)])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(port: int, path: str, headers: dict[str, str] | None = None) -> tuple[float, int]:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    start = time.perf_counter()
+    conn.request("GET", path, headers=headers or {})
+    resp = conn.getresponse()
+    assert resp.status in (200, 206), resp.status
+    n = 0
+    while True:
+        chunk = resp.read(1 << 20)
+        if not chunk:
+            break
+        n += len(chunk)
+    conn.close()
+    return time.perf_counter() - start, n
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--mib", type=int, default=32, help="artifact size in MiB")
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    _OBJECTS[_KEY] = memoryview(os.urandom(args.mib << 20))
+    s3_port = _free_port()
+    s3 = ThreadingHTTPServer(("127.0.0.1", s3_port), _S3Handler)
+    threading.Thread(target=s3.serve_forever, daemon=True).start()
+    os.environ["DF_MINIO_ENDPOINT"] = f"http://127.0.0.1:{s3_port}"
+
+    import uvicorn
+
+    import modules.storage.s3 as s3mod
+    from modules.persistence import repos
+    from modules.persistence.db import get_session
+    from services.api.app import app
+
+    with get_session() as session:
+        job = repos.create_job_with_step(session, job_type="generate", params={"prompt": "bench"}, idempotency_key=None)
+        step = repos.get_step_by_name(session, job_id=job.id, name="generate")
+        art = repos.insert_artifact(
+            session, job_id=job.id, step_id=step.id, format="png", width=4096, height=4096, seed=None, item_index=0, s3_key=_KEY, checksum=None
+        )
+        art_id = str(art.id)
+
+    api_port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=api_port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    size = args.mib << 20
+    path = f"/v1/artifacts/{art_id}/content"
+    results: dict[str, dict[str, float]] = {}
+    for name, port, p in (("direct", s3_port, f"/dreamforge/{_KEY}"), ("proxy", api_port, path)):
+        _get(port, p)  # warm-up
+        times = []
+        for _ in range(args.runs):
+            t, n = _get(port, p)
+            assert n == size
+            times.append(t)
+        med = statistics.median(times)
+        results[name] = {"median_s": round(med, 4), "mib_per_s": round(args.mib / med, 1)}
+
+    start = time.perf_counter()
+    for off in range(0, size, 1 << 20):
+        _, n = _get(api_port, path, {"Range": f"bytes={off}-{off + (1 << 20) - 1}"})
+        assert n == 1 << 20
+    elapsed = time.perf_counter() - start
+    results["range_1mib"] = {"total_s": round(elapsed, 4), "ms_per_request": round(1000 * elapsed / args.mib, 2)}
+
+    tracemalloc.start()
+    _get(api_port, path)
+    proxy_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    s3mod.download_bytes(s3mod.from_env(), _KEY)
+    buffered_peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    results["peak_heap_mib"] = {"proxy": round(proxy_peak / 2**20, 1), "buffered": round(buffered_peak / 2**20, 1)}
+
+    server.should_exit = True
+    s3.shutdown()
+    print(json.dumps({"artifact_mib": args.mib, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark GET /v1/jobs/{id}/artifacts for a job with many artifacts.
+
+Seeds one job with N artifacts in the configured database (DF_DB_URL or the SQLite
+dev fallback) and times the listing in-process with three presigners:
+
+- ``legacy``: a new boto3 session and client per URL (the previous behaviour);
+- ``cold``:   shared signing clients, URL cache cleared before every request;
+- ``warm``:   shared clients and cached URLs (repeat listings within a bucket).
+
+Presigning is local, so no S3 endpoint needs to be reachable.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_artifact_list.py --artifacts 200 --requests 50 --legacy-requests 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import timedelta
+
+os.environ.setdefault("DF_DB_ROLE", "api")
+os.environ.setdefault("DF_MINIO_ENDPOINT", "http://minio.internal:9000")
+os.environ.setdefault("DF_MINIO_ACCESS_KEY", "bench")
+os.environ.setdefault("DF_MINIO_SECRET_KEY", "bench-secret")
+os.environ.setdefault("DF_MINIO_BUCKET", "dreamforge")
+os.environ.setdefault("DF_S3_REGION", "us-east-1")
+
+import boto3  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import modules.storage.s3 as s3mod  # noqa: E402
+from modules.persistence import repos  # noqa: E402
+from modules.persistence.db import get_session  # noqa: E402
+from services.api.app import app  # noqa: E402
+
+
+def _legacy_presign(cfg: s3mod.S3Config, key: str, expires: timedelta = timedelta(hours=1)) -> str:
+    s3 = boto3.session.Session().client(
+        "s3",
+        endpoint_url=cfg.endpoint,
+        aws_access_key_id=cfg.access_key,
+        aws_secret_access_key=cfg.secret_key,
+        region_name=cfg.region,
+    )
+    return s3.generate_presigned_url(
+        ClientMethod="get_object", Params={"Bucket": cfg.bucket, "Key": key}, ExpiresIn=int(expires.total_seconds())
+    )
+
+
+def _seed(n: int) -> str:
+    with get_session() as session:
+        job = repos.create_job_with_step(session, job_type="generate", params={"prompt": "bench", "count": n}, idempotency_key=None)
+        step = repos.get_step_by_name(session, job_id=job.id, name="generate")
+        assert step is not None
+        repos.insert_artifacts_bulk(
+            session,
+            job_id=job.id,
+            step_id=step.id,
+            artifacts=[
+                {"format": "png", "width": 1024, "height": 1024, "seed": i, "item_index": i, "s3_key": f"dreamforge/default/jobs/{job.id}/generate/{i:03d}.png"}
+                for i in range(n)
+            ],
+        )
+        return str(job.id)
+
+
+def _measure(client: TestClient, job_id: str, n: int, before=None) -> dict[str, float]:
+    samples = []
+    for _ in range(n):
+        if before:
+            before()
+        t0 = time.perf_counter()
+        r = client.get(f"/v1/jobs/{job_id}/artifacts")
+        samples.append((time.perf_counter() - t0) * 1000.0)
+        assert r.status_code == 200, r.text
+    samples.sort()
+    return {"p50_ms": round(statistics.median(samples), 2), "p99_ms": round(samples[min(len(samples) - 1, int(0.99 * len(samples)))], 2)}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--artifacts", type=int, default=200)
+    ap.add_argument("--requests", type=int, default=50)
+    ap.add_argument("--legacy-requests", type=int, default=3, help="Requests for the (slow) legacy presigner")
+    args = ap.parse_args()
+
+    job_id = _seed(args.artifacts)
+    client = TestClient(app)
+    out: dict[str, object] = {"artifacts": args.artifacts, "requests": args.requests}
+
+    shared = s3mod.presign_get
+    s3mod.presign_get = _legacy_presign
+    try:
+        out["legacy"] = _measure(client, job_id, args.legacy_requests)
+    finally:
+        s3mod.presign_get = shared
+    out["cold"] = _measure(client, job_id, args.requests, before=lambda: s3mod._URLS.clear())
+    s3mod.clear_caches()
+    client.get(f"/v1/jobs/{job_id}/artifacts")
+    out["warm"] = _measure(client, job_id, args.requests)
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,58 @@
+"""Benchmark task publishing: Celery app per enqueue (legacy) vs the shared producer.
+
+Publishes N ``jobs.noop`` messages to DF_REDIS_URL (default ``memory://``; point it at
+the Compose Redis to include connection setup costs) and reports per-call latency.
+
+Usage:
+    PYTHONPATH=. DF_REDIS_URL=redis://127.0.0.1:6379/15 python scripts/bench_enqueue.py --n 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+from celery import Celery
+
+from modules.queue import producer
+
+
+def _legacy(broker: str) -> None:
+    app = Celery("df_api_producer", broker=broker)
+    app.conf.update(broker_connection_retry_on_startup=True)
+    app.send_task("jobs.noop", kwargs={}, queue="bench.noop")
+
+
+def _shared(broker: str) -> None:  # noqa: ARG001
+    producer.enqueue("jobs.noop", kwargs={}, queue="bench.noop")
+
+
+def _measure(fn, broker: str, n: int) -> dict[str, float]:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn(broker)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p99_ms": round(samples[int(0.99 * (len(samples) - 1))], 3),
+        "total_s": round(sum(samples) / 1000.0, 2),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=500)
+    args = ap.parse_args()
+    broker = os.environ.setdefault("DF_REDIS_URL", "memory://")
+    out = {"broker": broker, "n": args.n, "legacy": _measure(_legacy, broker, args.n), "shared": _measure(_shared, broker, args.n)}
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,105 @@
+"""Benchmark GET /v1/jobs/{id} loading: legacy ORM path vs repos.get_job_detail.
+
+Seeds one chained job with N artifacts per step into the configured database
+(DF_DB_URL or the SQLite dev fallback) and reports statements per call and latency.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_job_detail.py --artifacts 100 --iterations 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+import uuid
+
+from sqlalchemy import event
+
+from modules.persistence import repos
+from modules.persistence.db import engine, get_session
+
+
+def _seed(n: int) -> uuid.UUID:
+    with get_session() as session:
+        job = repos.create_job_with_chain(
+            session, job_type="generate", params={"prompt": "bench", "count": n}, idempotency_key=None
+        )
+        for step_name in ("generate", "upscale"):
+            step = repos.get_step_by_name(session, job_id=job.id, name=step_name)
+            assert step is not None
+            for i in range(n):
+                repos.insert_artifact(
+                    session,
+                    job_id=job.id,
+                    step_id=step.id,
+                    format="png",
+                    width=64,
+                    height=64,
+                    seed=i,
+                    item_index=i,
+                    s3_key=f"bench/{job.id}/{step_name}/{i}.png",
+                    checksum=None,
+                    metadata_json={"prompt": "bench " * 20, "seed": i},
+                )
+        return job.id
+
+
+def _legacy(job_id: uuid.UUID) -> int:
+    with get_session() as session:
+        job, steps = repos.get_job_with_steps(session, job_id)
+        assert job is not None
+        return len(repos.list_artifacts_by_job(session, job.id))
+
+
+def _detail(job_id: uuid.UUID) -> int:
+    with get_session() as session:
+        detail = repos.get_job_detail(session, job_id)
+        assert detail is not None
+        return detail.artifact_count
+
+
+def _measure(fn, job_id: uuid.UUID, iterations: int) -> dict[str, float]:  # type: ignore[no-untyped-def]
+    counter = {"n": 0}
+
+    def _count(*_a, **_k) -> None:  # type: ignore[no-untyped-def]
+        counter["n"] += 1
+
+    event.listen(engine(), "before_cursor_execute", _count)
+    try:
+        fn(job_id)  # warm caches
+        counter["n"] = 0
+        samples = []
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            fn(job_id)
+            samples.append((time.perf_counter() - t0) * 1000.0)
+    finally:
+        event.remove(engine(), "before_cursor_execute", _count)
+    samples.sort()
+    return {
+        "statements_per_call": counter["n"] / float(iterations),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(0.95 * (len(samples) - 1))], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--artifacts", type=int, default=100, help="Artifacts per step (2 steps)")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    job_id = _seed(args.artifacts)
+    out = {
+        "job_id": str(job_id),
+        "artifacts": 2 * args.artifacts,
+        "legacy": _measure(_legacy, job_id, args.iterations),
+        "get_job_detail": _measure(_detail, job_id, args.iterations),
+    }
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark JSON encoding of large log streams, SSE frames and artifact lists.
+
+Pure CPU, no database. Compares the hand-built payload encoders:
+
+- ``legacy``: per-line ``.isoformat().replace(...)`` and ``str(uuid)``, then ``json.dumps``;
+- ``stdlib``: ``services.api.utils.fastjson`` standard-library fallback;
+- ``orjson``: ``services.api.utils.fastjson`` with orjson (skipped if it is not installed).
+
+For artifact lists it compares FastAPI's response-model path (pydantic-core
+``model_dump_json``) with ``jsonable_encoder`` + ``json.dumps``.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_json_serialization.py --lines 50000 --artifacts 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import time
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+
+from services.api.schemas.artifacts import ArtifactListResponse, ArtifactOut
+from services.api.utils import fastjson
+
+
+def _loglines(n: int) -> list[dict]:
+    base = dt.datetime(2026, 1, 1, 12, 0, 0, 123456)
+    job_id, step_id = uuid.uuid4(), uuid.uuid4()
+    return [
+        {
+            "ts": base + dt.timedelta(milliseconds=i),
+            "level": "info",
+            "code": "artifact.written" if i % 10 == 0 else "step.progress",
+            "message": f"item {i % 8} step {i % 30}/30",
+            "job_id": job_id,
+            "step_id": step_id,
+            "item_index": i % 8,
+        }
+        for i in range(n)
+    ]
+
+
+def _legacy_line(obj: dict) -> bytes:
+    out = dict(obj)
+    out["ts"] = obj["ts"].replace(tzinfo=dt.timezone.utc).isoformat().replace("+00:00", "Z")
+    out["job_id"] = str(obj["job_id"])
+    out["step_id"] = str(obj["step_id"])
+    return (json.dumps(out, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _time(fn, items) -> float:
+    t0 = time.perf_counter()
+    for it in items:
+        fn(it)
+    return time.perf_counter() - t0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--lines", type=int, default=50000)
+    ap.add_argument("--artifacts", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=200, help="Artifact list encodes")
+    args = ap.parse_args()
+
+    lines = _loglines(args.lines)
+    encoders = {"legacy": _legacy_line, "stdlib": lambda o: fastjson._stdlib_dumps(o) + b"\n"}
+    if fastjson._orjson is not None:
+        opts = fastjson._orjson.OPT_NAIVE_UTC | fastjson._orjson.OPT_UTC_Z | fastjson._orjson.OPT_NON_STR_KEYS
+        encoders["orjson"] = lambda o: fastjson._orjson.dumps(o, option=opts, default=fastjson._default) + b"\n"
+    # All encoders must agree byte for byte on the log line shape
+    sample = {name: json.loads(fn(lines[1])) for name, fn in encoders.items()}
+    assert all(v == sample["legacy"] for v in sample.values()), sample
+    log_ms = {name: round(_time(fn, lines) * 1000.0, 1) for name, fn in encoders.items()}
+
+    arts = ArtifactListResponse(
+        artifacts=[
+            ArtifactOut(
+                id=str(uuid.uuid4()),
+                format="png",
+                width=1024,
+                height=1024,
+                seed=i,
+                item_index=i,
+                s3_key=f"dreamforge/default/jobs/{uuid.uuid4()}/generate/{i:03d}.png",
+                url=f"https://cdn.example.com/dreamforge/{i:03d}.png?X-Amz-Signature={'a' * 64}",
+                expires_at="2026-01-01T13:00:00Z",
+            )
+            for i in range(args.artifacts)
+        ]
+    )
+    art_ms = {
+        "jsonable_encoder+json": round(_time(lambda a: json.dumps(jsonable_encoder(a)).encode(), [arts] * args.repeat) * 1000.0 / args.repeat, 3),
+        "pydantic_dump_json": round(_time(lambda a: a.model_dump_json().encode(), [arts] * args.repeat) * 1000.0 / args.repeat, 3),
+    }
+    print(
+        json.dumps(
+            {
+                "backend": fastjson.BACKEND,
+                "log_lines": args.lines,
+                "log_stream_total_ms": log_ms,
+                "artifacts": args.artifacts,
+                "artifact_list_ms_per_response": art_ms,
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+"""Benchmark NDJSON log streaming for a job with many events.
+
+Seeds one job with N events in the configured database (DF_DB_URL or the SQLite dev
+fallback), starts uvicorn on a local port and reads ``GET /v1/jobs/{id}/logs?since_ts=...``
+over HTTP. It reports time to first line, total time and peak Python heap of the
+process (tracemalloc) for:
+
+- ``legacy``: the previous handler shape (every row loaded before the first line);
+- ``paged``:  the keyset-paged stream (``DF_LOGS_PAGE_SIZE`` rows at a time).
+
+Usage:
+    PYTHONPATH=. python scripts/bench_logs_stream.py --events 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("DF_DB_ROLE", "api")
+
+import uvicorn  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from modules.persistence import repos  # noqa: E402
+from modules.persistence.db import get_read_session, get_session  # noqa: E402
+from modules.persistence.models import Event  # noqa: E402
+from services.api.app import app  # noqa: E402
+from services.api.routes.logs import _event_to_logline  # noqa: E402
+from services.api.utils.streaming import ndjson_line  # noqa: E402
+
+SINCE = "2020-01-01T00:00:00Z"
+
+
+def _seed(n: int) -> str:
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with get_session() as session:
+        job = repos.create_job_with_step(session, job_type="generate", params={"prompt": "bench"}, idempotency_key=None)
+        step = repos.get_step_by_name(session, job_id=job.id, name="generate")
+        assert step is not None
+        for start in range(0, n, 5000):
+            session.execute(
+                insert(Event),
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "job_id": job.id,
+                        "step_id": step.id,
+                        "ts": base + timedelta(milliseconds=i),
+                        "code": "bench.line",
+                        "level": "info",
+                        "payload_json": {"message": f"line {i}", "item_index": i % 8},
+                    }
+                    for i in range(start, min(n, start + 5000))
+                ],
+            )
+        repos.mark_job_status(session, job.id, "succeeded")
+        return str(job.id)
+
+
+def _legacy(job_id: str):
+    since = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    with get_read_session() as session:
+        events = repos.iter_events(session, job_id, since_ts=since, tail=None)
+    for e in events:
+        yield ndjson_line(_event_to_logline(e))
+
+
+def _paged(job_id: str, port: int):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=300)
+    conn.request("GET", f"/v1/jobs/{job_id}/logs?since_ts={SINCE}")
+    resp = conn.getresponse()
+    while chunk := resp.read1(65536):
+        yield chunk
+    conn.close()
+
+
+def _measure(gen) -> dict[str, float]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    first = None
+    size = 0
+    for chunk in gen:
+        if first is None:
+            first = time.perf_counter() - t0
+        size += len(chunk)
+    total = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"first_line_ms": round((first or 0.0) * 1000.0, 1), "total_s": round(total, 2), "peak_mib": round(peak / 2**20, 1), "bytes": size}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--events", type=int, default=50000)
+    ap.add_argument("--port", type=int, default=8766)
+    args = ap.parse_args()
+    job_id = _seed(args.events)
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        out = {"events": args.events, "legacy": _measure(_legacy(job_id)), "paged": _measure(_paged(job_id, args.port))}
+    finally:
+        server.should_exit = True
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+"""Benchmark gallery payloads: full-resolution PNGs vs preview renditions.
+
+Synthesizes N detailed images (gradients plus noise, closer to real output than solid
+colours) at --size, renders each preview with ``modules.storage.renditions.render``
+and reports total bytes a gallery page would download either way, plus render time.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_renditions.py --items 100 --size 1024
+    PYTHONPATH=. python scripts/bench_renditions.py --items 10 --size 4096   # 4x upscales
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import statistics
+import time
+
+from PIL import Image, ImageChops, ImageFilter
+
+from modules.storage import renditions
+
+
+def _image(size: int, seed: int) -> bytes:
+    noise = Image.effect_noise((size, size), 40 + seed % 20).filter(ImageFilter.GaussianBlur(1))
+    grad = Image.linear_gradient("L").resize((size, size)).rotate(seed * 37 % 360)
+    rgb = Image.merge("RGB", (ImageChops.add(grad, noise, 2.0), noise, grad))
+    out = io.BytesIO()
+    rgb.save(out, format="PNG")
+    return out.getvalue()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--items", type=int, default=100)
+    ap.add_argument("--size", type=int, default=1024, help="source image edge in pixels")
+    ap.add_argument("--preview", type=int, default=renditions.preview_size())
+    ap.add_argument("--format", default=renditions.preview_format(), choices=["webp", "jpeg"])
+    args = ap.parse_args()
+
+    # A few distinct sources, reused: encoding the sources is not what is measured
+    sources = [_image(args.size, i) for i in range(min(args.items, 8))]
+    full = previews = 0
+    times = []
+    for i in range(args.items):
+        data = sources[i % len(sources)]
+        start = time.perf_counter()
+        out = renditions.render(data, args.preview, args.format)
+        times.append(time.perf_counter() - start)
+        full += len(data)
+        previews += len(out)
+    print(json.dumps({
+        "items": args.items,
+        "source_px": args.size,
+        "preview_px": args.preview,
+        "format": args.format,
+        "gallery_full_mib": round(full / 2**20, 2),
+        "gallery_preview_mib": round(previews / 2**20, 3),
+        "reduction_x": round(full / max(1, previews), 1),
+        "render_ms_median": round(1000 * statistics.median(times), 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
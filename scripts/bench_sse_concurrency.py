@@ -0,0 +1,127 @@
+"""Benchmark concurrent SSE progress streams against one in-process API server.
+
+Starts uvicorn on a local port (configured database: DF_DB_URL or the SQLite dev
+fallback), seeds one running job, opens N raw HTTP connections to
+/v1/jobs/{id}/progress/stream and waits for each to receive its first ``progress``
+event. It then appends events and finishes the job, and checks every stream sees the
+terminal update and closes. It reports connect/close latency and the process thread
+count, which stays flat because idle streams wait on the event loop.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_sse_concurrency.py --clients 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import threading
+import time
+
+os.environ.setdefault("DF_DB_ROLE", "api")
+os.environ.setdefault("DF_SSE_HEARTBEAT_S", "15")
+
+import uvicorn  # noqa: E402
+
+from modules.persistence import repos  # noqa: E402
+from modules.persistence.db import get_session  # noqa: E402
+from services.api.app import app  # noqa: E402
+
+
+def _seed() -> str:
+    with get_session() as session:
+        job = repos.create_job_with_step(session, job_type="generate", params={"prompt": "bench", "count": 1}, idempotency_key=None)
+        step = repos.get_step_by_name(session, job_id=job.id, name="generate")
+        assert step is not None
+        repos.mark_job_status(session, job.id, "running")
+        return str(job.id)
+
+
+def _finish(job_id: str) -> None:
+    with get_session() as session:
+        step = repos.get_step_by_name(session, job_id=job_id, name="generate")
+        assert step is not None
+        repos.append_event(session, job_id=job_id, step_id=step.id, code="bench.tick", payload={})
+        repos.mark_job_status(session, job_id, "succeeded")
+
+
+async def _client(port: int, job_id: str, connected: list[float], closed: list[float], t0: float) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET /v1/jobs/{job_id}/progress/stream HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+    first = True
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        if first and line.startswith(b"event: progress"):
+            connected.append(time.perf_counter() - t0)
+            first = False
+        if line.startswith(b"0\r\n"):  # end of chunked body
+            break
+    closed.append(time.perf_counter())
+    writer.close()
+
+
+def _pct(values: list[float], q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))] * 1000.0 if values else float("nan")
+
+
+async def _run(clients: int, port: int) -> dict:
+    job_id = await asyncio.to_thread(_seed)
+    connected: list[float] = []
+    closed: list[float] = []
+    t0 = time.perf_counter()
+    tasks = [asyncio.create_task(_client(port, job_id, connected, closed, t0)) for _ in range(clients)]
+    while len(connected) < clients and time.perf_counter() - t0 < 120:
+        await asyncio.sleep(0.05)
+    t_connected = time.perf_counter() - t0
+    threads_idle = threading.active_count()
+
+    t1 = time.perf_counter()
+    await asyncio.to_thread(_finish, job_id)
+    await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=120)
+    close_lat = [c - t1 for c in closed]
+    return {
+        "clients": clients,
+        "streams_connected": len(connected),
+        "all_connected_s": round(t_connected, 2),
+        "first_event_ms": {"p50": round(_pct(connected, 0.5), 1), "p99": round(_pct(connected, 0.99), 1)},
+        "streams_closed": len(closed),
+        "terminal_fanout_ms": {
+            "p50": round(_pct(close_lat, 0.5), 1),
+            "p99": round(_pct(close_lat, 0.99), 1),
+            "mean": round(statistics.mean(close_lat) * 1000.0, 1) if close_lat else None,
+        },
+        "threads_while_idle": threads_idle,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--clients", type=int, default=2000)
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, min(hard, args.clients * 2 + 256)), hard))
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning", backlog=4096))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        print(json.dumps(asyncio.run(_run(args.clients, args.port)), indent=2))
+    finally:
+        server.should_exit = True
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
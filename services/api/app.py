@@ -2,17 +2,29 @@ from __future__ import annotations
 
 import os
 import time
-from typing import Any
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 
-import boto3
-import psycopg
-from sqlalchemy.engine import make_url
 from fastapi import FastAPI, Response, status
-from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, generate_latest
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    generate_latest,
+)
+from sqlalchemy.engine import make_url
+
+# Select API pool defaults before the persistence engine is created (routes import it).
+os.environ.setdefault("DF_DB_ROLE", "api")
 
-from .config import get_settings
-from .routes import router as v1_router
+from modules.persistence import notify  # noqa: E402
 
+from .config import get_settings  # noqa: E402
+from .middleware import QueryStatsMiddleware, RequestMetricsMiddleware  # noqa: E402
+from .routes import router as v1_router  # noqa: E402
+from .utils import readiness  # noqa: E402
 
 _REGISTRY = CollectorRegistry()
 _HEALTH_HITS = Counter("df_api_healthz_hits", "Health endpoint hits", registry=_REGISTRY)
@@ -30,29 +42,16 @@ def _normalize_conninfo(url: str) -> str:
     return url
 
 
-def _check_db(url: str, timeout_s: int = 1) -> None:
-    url = _normalize_conninfo(url)
-    with psycopg.connect(url, connect_timeout=timeout_s) as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT 1")
-            cur.fetchone()
-
-
-def _check_s3(endpoint: str, access_key: str, secret_key: str, bucket: str, region: str | None) -> None:
-    session = boto3.session.Session()
-    client = session.client(
-        "s3",
-        endpoint_url=endpoint,
-        aws_access_key_id=access_key,
-        aws_secret_access_key=secret_key,
-        region_name=region,
-    )
-    client.head_bucket(Bucket=bucket)
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # One LISTEN connection per API process wakes SSE streams on job changes (Postgres only)
+    notify.start_listener()
+    yield
 
 
 def create_app() -> FastAPI:
     # Version aligned to M4 completion
-    app = FastAPI(title="Dream Forge API", version="0.4.0-mvp", docs_url=None, redoc_url=None)
+    app = FastAPI(title="Dream Forge API", version="0.4.0-mvp", docs_url=None, redoc_url=None, lifespan=_lifespan)
 
     @app.get("/healthz")
     def healthz() -> dict[str, Any]:
@@ -60,40 +59,33 @@ def create_app() -> FastAPI:
         return {"status": "ok", "ts": int(time.time())}
 
     @app.get("/readyz")
-    def readyz() -> Any:
+    async def readyz() -> Any:
         settings = get_settings()
         checks = {c.strip() for c in os.getenv("DF_READY_CHECKS", settings.ready_checks).split(",") if c.strip()}
-        try:
-            if "db" in checks:
-                url = os.getenv("DF_DB_URL") or settings.db_url
-                if not url:
-                    raise RuntimeError("DB readiness requested but DF_DB_URL not set")
-                _check_db(url)
-
-            if "s3" in checks:
-                endpoint = os.getenv("DF_MINIO_ENDPOINT") or os.getenv("DF_S3_ENDPOINT") or settings.s3_endpoint
-                access_key = os.getenv("DF_MINIO_ACCESS_KEY") or os.getenv("DF_S3_ACCESS_KEY") or settings.s3_access_key
-                secret_key = os.getenv("DF_MINIO_SECRET_KEY") or os.getenv("DF_S3_SECRET_KEY") or settings.s3_secret_key
-                bucket = os.getenv("DF_MINIO_BUCKET") or os.getenv("DF_S3_BUCKET") or settings.s3_bucket
-                region = os.getenv("DF_S3_REGION") or settings.s3_region
-                if not all([endpoint, access_key, secret_key, bucket]):
-                    raise RuntimeError("S3 readiness requested but one or more S3 env vars are missing")
-                _check_s3(endpoint=str(endpoint), access_key=str(access_key), secret_key=str(secret_key), bucket=str(bucket), region=region)
-
-            _READY_GAUGE.set(1)
-            return {"status": "ready"}
-        except Exception as exc:  # noqa: BLE001
+        # Cached per dependency and refreshed in the background; see utils/readiness.py
+        results = await readiness.check(checks)
+        failed = {name: r.error for name, r in results.items() if not r.ok}
+        if failed:
             _READY_GAUGE.set(0)
-            return Response(content=f"not ready: {exc}", status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+            reason = "; ".join(f"{name}: {error}" for name, error in failed.items())
+            return Response(content=f"not ready: {reason}", status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+        _READY_GAUGE.set(1)
+        return {"status": "ready"}
 
     @app.get("/metrics")
     def metrics() -> Response:
-        output = generate_latest(_REGISTRY)
+        # API-local metrics plus shared module metrics (DB pool, etc.) on the default registry
+        output = generate_latest(_REGISTRY) + generate_latest(REGISTRY)
         return Response(output, media_type=CONTENT_TYPE_LATEST)
 
     # Mount placeholder /v1 router so OpenAPI contains a versioned root
     app.include_router(v1_router)
 
+    # Per-route SQL statement counts / DB time (exported on /metrics)
+    app.add_middleware(QueryStatsMiddleware)
+    # Outermost: per-route latency / size / status and open stream gauges
+    app.add_middleware(RequestMetricsMiddleware)
+
     return app
 
 
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Awaitable, Callable, MutableMapping
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from modules.persistence.db import begin_query_tracking, end_query_tracking
+
+Scope = MutableMapping[str, Any]
+ASGIApp = Callable[[Scope, Callable[..., Awaitable[Any]], Callable[..., Awaitable[Any]]], Awaitable[None]]
+
+
+def route_label(scope: Scope) -> str:
+    """Low-cardinality label for a request: method + route template (not the raw path)."""
+    # Newer FastAPI resolves included routers lazily; the effective context carries the
+    # full template (with router prefixes), while ``route.path`` is router-relative.
+    fastapi_scope = scope.get("fastapi") or {}
+    path = getattr(fastapi_scope.get("effective_route_context"), "path", None)
+    if not path:
+        path = getattr(scope.get("route"), "path", None)
+    if not path:
+        endpoint = scope.get("endpoint")
+        path = getattr(endpoint, "__name__", None) or "unmatched"
+    return f"{scope.get('method', 'GET')} {path}"
+
+
+class QueryStatsMiddleware:
+    """Attribute SQL statements issued while serving a request to its route.
+
+    Covers the whole response, including streamed SSE/NDJSON bodies, and exports
+    per-route statement count / DB time histograms via modules.persistence.db.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Callable[..., Awaitable[Any]], send: Callable[..., Awaitable[Any]]) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats, token = begin_query_tracking("route", "unmatched")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            stats.name = route_label(scope)
+            end_query_tracking(stats, token)
+
+
+_REQUESTS = Counter("df_api_requests_total", "HTTP requests served", ["route", "status"])
+_REQUEST_SECONDS = Histogram(
+    "df_api_request_seconds",
+    "Time from request start to the last response byte (whole stream for SSE/NDJSON)",
+    ["route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+_RESPONSE_BYTES = Histogram(
+    "df_api_response_bytes",
+    "Response body size",
+    ["route"],
+    buckets=(128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608),
+)
+_IN_FLIGHT = Gauge("df_api_requests_in_flight", "HTTP requests being served")
+_STREAMS = Gauge("df_api_streams_active", "Open streaming responses", ["kind"])
+
+_STREAM_KINDS = {b"text/event-stream": "sse", b"application/x-ndjson": "ndjson"}
+
+
+def _stream_kind(headers: Any) -> str | None:
+    for name, value in headers or ():
+        if name.lower() == b"content-type":
+            return _STREAM_KINDS.get(value.split(b";", 1)[0].strip().lower())
+    return None
+
+
+class RequestMetricsMiddleware:
+    """Per-route latency, response size and status counts, plus open SSE/NDJSON streams."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Callable[..., Awaitable[Any]], send: Callable[..., Awaitable[Any]]) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+        size = 0
+        stream: str | None = None
+
+        async def _send(message: MutableMapping[str, Any]) -> None:
+            nonlocal status, size, stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                stream = _stream_kind(message.get("headers"))
+                if stream:
+                    _STREAMS.labels(kind=stream).inc()
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        _IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _IN_FLIGHT.dec()
+            if stream:
+                _STREAMS.labels(kind=stream).dec()
+            route = route_label(scope)
+            _REQUESTS.labels(route=route, status=str(status)).inc()
+            _REQUEST_SECONDS.labels(route=route).observe(time.perf_counter() - start)
+            _RESPONSE_BYTES.labels(route=route).observe(size)
@@ -1,20 +1,31 @@
 from __future__ import annotations
 
 import os
-from datetime import datetime, timedelta, timezone
-from typing import Any
+import threading
+import time
+from datetime import timedelta
+from typing import Any, AsyncIterator
 
-from fastapi import APIRouter, HTTPException
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 
-from modules.persistence.db import get_session
 from modules.persistence import repos
+from modules.queue import producer
 from modules.storage import s3 as s3mod
 from services.api.schemas.artifacts import ArtifactListResponse, ArtifactOut
 from services.api.schemas.jobs import ErrorResponse
+from services.api.utils.concurrency import offload, read
+from services.api.utils.conditional import job_etag, matches, not_modified, set_etag
+from services.api.utils.reads import find_artifact, find_job
 
 
 router = APIRouter(prefix="", tags=["artifacts"])
 
+_CONTENT_TYPES = {"png": "image/png", "jpg": "image/jpeg"}
+# Artifact keys are written once and never overwritten
+_IMMUTABLE = "public, max-age=31536000, immutable"
+
 
 def _presign_expires_s() -> int:
     try:
@@ -27,25 +38,47 @@ def _presign_expires_s() -> int:
 @router.get(
     "/jobs/{job_id}/artifacts",
     response_model=ArtifactListResponse,
-    responses={404: {"model": ErrorResponse}},
+    responses={304: {"description": "Not modified: If-None-Match matches the current ETag"}, 404: {"model": ErrorResponse}},
 )
-def list_artifacts(job_id: str) -> ArtifactListResponse:
-    with get_session() as session:
-        job = repos.get_job(session, job_id)
-        if not job:
-            raise HTTPException(status_code=404, detail={"code": "not_found", "message": "job not found"})
-
-        arts = repos.list_artifacts_by_job(session, job_id)
+async def list_artifacts(
+    job_id: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+) -> Any:
+    ttl = timedelta(seconds=_presign_expires_s())
+    # URLs share a bucketed expiry (cached signatures); a bucket rolling over mid-list only extends it
+    expires_at = s3mod.presign_expiry(ttl)
+    version = await read(lambda s: repos.get_job_version(s, job_id), sticky_key=job_id)
+    if version is not None:
+        # URLs change with the expiry bucket, so it is part of the representation
+        etag = job_etag("artifacts", version, int(expires_at.timestamp()))
+        if matches(if_none_match, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+    elif not await offload(find_job, job_id):
+        # Not on the read session: only a 404 if the primary has no such job either (replica lag)
+        raise HTTPException(status_code=404, detail={"code": "not_found", "message": "job not found"})
+    arts = await read(lambda s: repos.list_artifacts_by_job(s, job_id), sticky_key=job_id)
 
     if not arts:
         return ArtifactListResponse(artifacts=[])
 
     cfg = s3mod.from_env()
-    ttl = _presign_expires_s()
-    expires_at = datetime.now(tz=timezone.utc) + timedelta(seconds=ttl)
+
+    def _sign() -> list[tuple[str, str]]:
+        signed = []
+        for a in arts:
+            preview = (a.metadata_json or {}).get("preview_key")
+            signed.append((
+                s3mod.presign_get(cfg, a.s3_key, expires=ttl),
+                s3mod.presign_get(cfg, preview, expires=ttl) if preview else f"/v1/artifacts/{a.id}/preview",
+            ))
+        return signed
+
+    # Signing is local CPU work, but a cold cache may be hundreds of signatures; keep it off the event loop
+    urls = await offload(_sign)
     out: list[ArtifactOut] = []
-    for a in arts:
-        url = s3mod.presign_get(cfg, a.s3_key, expires=timedelta(seconds=ttl))
+    for a, (url, preview_url) in zip(arts, urls):
         out.append(
             ArtifactOut(
                 id=str(a.id),
@@ -56,8 +89,180 @@ def list_artifacts(job_id: str) -> ArtifactListResponse:
                 item_index=a.item_index,
                 s3_key=a.s3_key,
                 url=url,
+                preview_url=preview_url,
                 expires_at=expires_at.isoformat().replace("+00:00", "Z"),
             )
         )
     return ArtifactListResponse(artifacts=out)
 
+
+def _chunk_bytes() -> int:
+    try:
+        return max(16 * 1024, int(os.getenv("DF_ARTIFACT_CHUNK_BYTES", str(256 * 1024))))
+    except ValueError:
+        return 256 * 1024
+
+
+async def _iter_body(body: Any, chunk: int) -> AsyncIterator[bytes]:
+    # One blocking read per chunk on a worker thread: memory per download is one chunk
+    try:
+        while True:
+            data = await offload(body.read, chunk)
+            if not data:
+                return
+            yield data
+    finally:
+        await offload(body.close)
+
+
+@router.get(
+    "/artifacts/{artifact_id}/content",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"image/png": {}, "image/jpeg": {}}, "description": "Artifact bytes"},
+        206: {"description": "Partial content for a satisfiable Range request"},
+        304: {"description": "Not modified: If-None-Match matches the object ETag"},
+        404: {"model": ErrorResponse},
+        416: {"model": ErrorResponse},
+    },
+)
+async def get_artifact_content(
+    artifact_id: str,
+    range_header: str | None = Header(default=None, alias="Range"),
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+) -> Any:
+    """Stream an artifact through the API, for clients that cannot reach S3 directly.
+
+    ``Range`` (a single ``bytes=`` range) and ``If-None-Match`` are answered by S3;
+    the body is relayed in ``DF_ARTIFACT_CHUNK_BYTES`` chunks, never buffered whole.
+    """
+    art = await offload(find_artifact, artifact_id)
+    if art is None:
+        raise HTTPException(status_code=404, detail={"code": "not_found", "message": "artifact not found"})
+    # Multi-range requests are served whole, which RFC 9110 allows
+    byte_range = range_header if range_header and range_header.startswith("bytes=") and "," not in range_header else None
+    cfg = s3mod.from_env()
+    try:
+        obj = await offload(s3mod.open_object, cfg, art.s3_key, byte_range=byte_range, if_none_match=if_none_match)
+    except ClientError as exc:
+        status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        err = exc.response.get("Error", {})
+        if status == 304 or err.get("Code") in {"304", "NotModified"}:
+            etag = exc.response.get("ResponseMetadata", {}).get("HTTPHeaders", {}).get("etag") or if_none_match or ""
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _IMMUTABLE})
+        if status == 416 or err.get("Code") == "InvalidRange":
+            size = err.get("ActualObjectSize")
+            raise HTTPException(
+                status_code=416,
+                detail={"code": "range_not_satisfiable", "message": "requested range is outside the object"},
+                headers={"Content-Range": f"bytes */{size}"} if size else None,
+            ) from None
+        if status == 404 or err.get("Code") in {"NoSuchKey", "404"}:
+            raise HTTPException(status_code=404, detail={"code": "not_found", "message": "artifact object missing from storage"}) from None
+        raise
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": _IMMUTABLE,
+        "Content-Disposition": f'inline; filename="{art.id}.{art.format}"',
+    }
+    if obj.get("ETag"):
+        headers["ETag"] = obj["ETag"]
+    if obj.get("ContentLength") is not None:
+        headers["Content-Length"] = str(obj["ContentLength"])
+    if obj.get("ContentRange"):
+        headers["Content-Range"] = obj["ContentRange"]
+    if obj.get("LastModified") is not None:
+        headers["Last-Modified"] = obj["LastModified"].strftime("%a, %d %b %Y %H:%M:%S GMT")
+    status_code = 206 if obj.get("ContentRange") else 200
+    return StreamingResponse(
+        _iter_body(obj["Body"], _chunk_bytes()),
+        status_code=status_code,
+        media_type=_CONTENT_TYPES.get(art.format, "application/octet-stream"),
+        headers=headers,
+    )
+
+
+def _eager() -> bool:
+    return os.getenv("DF_CELERY_EAGER", "false").lower() in {"1", "true", "yes"}
+
+
+# Artifact id -> monotonic deadline before this process asks a worker for its preview again
+_PREVIEW_REQUESTS: dict[str, float] = {}
+_PREVIEW_REQUESTS_LOCK = threading.Lock()
+_PREVIEW_REQUEST_TTL_S = 60.0
+_PREVIEW_RETRY_AFTER_S = 2
+
+
+def _request_preview(artifact_id: str) -> None:
+    """Enqueue the worker task that renders the preview, at most once per TTL per process."""
+    now = time.monotonic()
+    with _PREVIEW_REQUESTS_LOCK:
+        if _PREVIEW_REQUESTS.get(artifact_id, 0.0) > now:
+            return
+        _PREVIEW_REQUESTS[artifact_id] = now + _PREVIEW_REQUEST_TTL_S
+        if len(_PREVIEW_REQUESTS) > 10000:
+            for k, deadline in list(_PREVIEW_REQUESTS.items()):
+                if deadline < now:
+                    _PREVIEW_REQUESTS.pop(k, None)
+    try:
+        # Background work: the low-priority queue, behind interactive generations
+        producer.enqueue(
+            "maintenance.render_preview", kwargs={"artifact_id": artifact_id}, queue=producer.queue_for("low")
+        )
+    except Exception:
+        with _PREVIEW_REQUESTS_LOCK:
+            _PREVIEW_REQUESTS.pop(artifact_id, None)
+        raise
+
+
+@router.get(
+    "/artifacts/{artifact_id}/preview",
+    response_class=RedirectResponse,
+    status_code=302,
+    responses={
+        202: {"model": ErrorResponse, "description": "Preview is being rendered by a worker; retry after Retry-After"},
+        302: {"description": "Redirect to a presigned URL of the preview rendition"},
+        404: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
+)
+async def get_artifact_preview(artifact_id: str) -> Any:
+    """Redirect to the artifact's preview.
+
+    Workers render previews when they write the artifact. For artifacts without one
+    (older jobs, a failed render) the first request hands rendering to a worker and
+    answers ``202`` with ``Retry-After``; the API never decodes images itself.
+    """
+    art = await offload(find_artifact, artifact_id)
+    if art is None:
+        raise HTTPException(status_code=404, detail={"code": "not_found", "message": "artifact not found"})
+    key = (art.metadata_json or {}).get("preview_key")
+    if not key:
+        if _eager():
+            # Dev/tests (DF_CELERY_EAGER): run the worker task in-process, as job submission
+            # does; imported here to keep worker modules out of the API import graph
+            from services.worker.tasks.maintenance import render_preview
+
+            key = (await offload(render_preview, str(art.id))).get("preview_key")
+            if not key:
+                raise HTTPException(
+                    status_code=404, detail={"code": "not_found", "message": "artifact object missing from storage"}
+                )
+        else:
+            try:
+                await offload(_request_preview, str(art.id))
+            except Exception:  # noqa: BLE001
+                raise HTTPException(
+                    status_code=503, detail={"code": "infra_unavailable", "message": "Failed to enqueue preview rendering"}
+                ) from None
+            return JSONResponse(
+                status_code=202,
+                content={"code": "preview_pending", "message": "preview is being rendered; retry shortly"},
+                headers={"Retry-After": str(_PREVIEW_RETRY_AFTER_S)},
+            )
+    ttl = timedelta(seconds=_presign_expires_s())
+    cfg = s3mod.from_env()
+    url = await offload(s3mod.presign_get, cfg, key, expires=ttl)
+    # The signed URL stays valid for at least ttl, so the redirect may be reused that long
+    return RedirectResponse(url, status_code=302, headers={"Cache-Control": f"private, max-age={int(ttl.total_seconds())}"})
@@ -1,48 +1,117 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
+import uuid as _uuid
 from datetime import datetime, timezone
 from typing import Any
 
-from celery import Celery
-from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Body
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status, Body
+from pydantic import ValidationError
 
-from modules.persistence.db import get_session
-from modules.persistence import repos
+from modules.persistence.db import get_read_session, get_session, note_write, on_replica
+from modules.persistence import archive, notify, repos
+from modules.queue import producer
 from services.api.schemas.jobs import (
     ErrorResponse,
+    JobBatchItem,
+    JobBatchRequest,
+    JobBatchResponse,
+    JobBatchResult,
     JobCreated,
     JobCreatedResponse,
     JobCreateRequest,
     JobStatusResponse,
     JobListItem,
     JobListResponse,
+    JobStatsResponse,
+    JobStatsWindow,
     StepSummary,
 )
+from services.api.utils import admission
+from services.api.utils.concurrency import offload, read
+from services.api.utils.conditional import job_status_etag, matches, not_modified, set_etag
+from services.api.utils.streaming import STREAM_DB_POLLS
 
 
 router = APIRouter(prefix="", tags=["jobs"])
 
 
-def _celery() -> Celery:
-    broker = os.getenv("DF_REDIS_URL", "redis://127.0.0.1:6379/0")
-    app = Celery("df_api_producer", broker=broker)
-    app.conf.update(
-        broker_connection_retry_on_startup=True,
-        task_always_eager=os.getenv("DF_CELERY_EAGER", "false").lower() in {"1", "true", "yes"},
-    )
-    return app
+def _idempotency_ttl_s() -> int:
+    """How long an Idempotency-Key stays bound to its job (seconds; 0 = forever)."""
+    try:
+        return max(0, int(os.getenv("DF_IDEMPOTENCY_TTL_S", "86400")))
+    except Exception:
+        return 86400
+
+
+def _jobs_batch_max() -> int:
+    try:
+        return max(1, int(os.getenv("DF_JOBS_BATCH_MAX", "500")))
+    except Exception:
+        return 500
+
+
+def _eager() -> bool:
+    return os.getenv("DF_CELERY_EAGER", "false").lower() in {"1", "true", "yes"}
+
+
+def _chain_options(req: JobCreateRequest) -> dict[str, Any] | None:
+    """Validated upscale step options for a chained request (None = no chain).
+
+    Raises ValueError with a client-facing message for invalid combinations.
+    """
+    if not (getattr(req, "chain", None) and getattr(req.chain, "upscale", None)):
+        return None
+    scale = int(getattr(req.chain.upscale, "scale", 2))  # type: ignore[union-attr]
+    if scale not in (2, 4):
+        raise ValueError("scale must be 2 or 4")
+    impl = getattr(req.chain.upscale, "impl", "auto")  # type: ignore[union-attr]
+    strict_scale = bool(getattr(req.chain.upscale, "strict_scale", False))  # type: ignore[union-attr]
+    if impl not in ("auto", "diffusion", "gan"):
+        raise ValueError("impl must be one of: auto,diffusion,gan")
+    # Strict policy: reject impl that cannot natively match the requested scale
+    if strict_scale and impl == "diffusion" and scale == 2:
+        raise ValueError("diffusion upscaler natively supports 4x; set strict_scale=false to allow 4x then downsample to 2x")
+    return {"scale": scale, "impl": impl, "strict_scale": strict_scale}
+
+
+def _job_params(req: JobCreateRequest) -> tuple[dict[str, Any], dict[str, Any]]:
+    """``(params, fingerprinted)``: priority lives on the job row, not in params_json.
+
+    It only enters the idempotency fingerprint when not ``normal``, so fingerprints of
+    requests that predate priorities are unchanged.
+    """
+    params = req.model_dump(exclude={"priority", "idempotency_key"})
+    return params, params if req.priority == "normal" else {**params, "priority": req.priority}
+
+
+def _run_inline(job_id: _uuid.UUID) -> bool:
+    """DF_CELERY_EAGER: execute generate in-process; marks the job failed on error."""
+    try:
+        from services.worker.tasks.generate import generate as task_generate  # local import to avoid cyclic issues
+
+        task_generate(job_id=str(job_id))
+        return True
+    except Exception as exc:  # noqa: BLE001
+        with get_session() as session:
+            repos.mark_job_status(session, job_id, "failed", error={"code": "internal", "message": str(exc)})
+        return False
 
 
 @router.post(
     "/jobs",
     response_model=JobCreatedResponse,
     responses={
+        409: {"model": ErrorResponse},
         422: {"model": ErrorResponse},
+        429: {"model": ErrorResponse, "description": "Backlog over capacity; see Retry-After"},
         503: {"model": ErrorResponse},
     },
 )
 def create_job(
+    response: Response,
     req: JobCreateRequest = Body(
         examples={
             "single": {
@@ -74,55 +143,85 @@ def create_job(
     if req.type != "generate":
         raise HTTPException(status_code=422, detail={"code": "invalid_input", "message": "Unsupported type", "details": {"type": req.type}})
 
-    # Persist Job (+ chain if requested)
-    has_chain = bool(getattr(req, "chain", None) and getattr(req.chain, "upscale", None))
-    with get_session() as session:
-        if has_chain:
-            scale = int(getattr(req.chain.upscale, "scale", 2))  # type: ignore[union-attr]
-            if scale not in (2, 4):
-                raise HTTPException(status_code=422, detail={"code": "invalid_input", "message": "scale must be 2 or 4"})
-            impl = getattr(req.chain.upscale, "impl", "auto")  # type: ignore[union-attr]
-            strict_scale = bool(getattr(req.chain.upscale, "strict_scale", False))  # type: ignore[union-attr]
-            if impl not in ("auto", "diffusion", "gan"):
-                raise HTTPException(status_code=422, detail={"code": "invalid_input", "message": "impl must be one of: auto,diffusion,gan"})
-            # Strict policy: reject impl that cannot natively match the requested scale
-            if strict_scale and impl == "diffusion" and scale == 2:
-                raise HTTPException(
-                    status_code=422,
-                    detail={
-                        "code": "invalid_input",
-                        "message": "diffusion upscaler natively supports 4x; set strict_scale=false to allow 4x then downsample to 2x",
-                    },
-                )
-            job = repos.create_job_with_chain(
-                session,
-                job_type=req.type,
-                params=req.model_dump(),
-                idempotency_key=idempotency_key,
-                upscale_scale=scale,
-                upscale_impl=impl,
-                upscale_strict_scale=strict_scale,
+    # Validate chain parameters up front (before any idempotency replay/insert)
+    try:
+        upscale = _chain_options(req)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail={"code": "invalid_input", "message": str(exc)})
+    has_chain = upscale is not None
+    if upscale is not None:
+        scale, impl, strict_scale = upscale["scale"], upscale["impl"], upscale["strict_scale"]
+
+    params, fingerprinted = _job_params(req)
+    fingerprint = repos.params_fingerprint(fingerprinted) if idempotency_key else None
+    queue = producer.queue_for(req.priority)
+
+    # An Idempotency-Key replay returns the existing job
+    existing = None
+    if idempotency_key:
+        with get_session() as session:
+            existing = repos.find_job_by_idempotency_key(session, idempotency_key, ttl_s=_idempotency_ttl_s())
+    if existing is None:
+        # Replays are always answered; only new work is subject to backpressure. Admission
+        # may query the DB and the broker, so it runs before the write transaction opens.
+        admission.admit(queue)
+        # Persist Job (+ chain if requested)
+        with get_session() as session:
+            try:
+                if has_chain:
+                    job = repos.create_job_with_chain(
+                        session,
+                        job_type=req.type,
+                        params=params,
+                        idempotency_key=idempotency_key,
+                        upscale_scale=scale,
+                        upscale_impl=impl,
+                        upscale_strict_scale=strict_scale,
+                        idempotency_fingerprint=fingerprint,
+                        priority=req.priority,
+                    )
+                else:
+                    job = repos.create_job_with_step(
+                        session,
+                        job_type=req.type,
+                        params=params,
+                        idempotency_key=idempotency_key,
+                        idempotency_fingerprint=fingerprint,
+                        priority=req.priority,
+                    )
+            except repos.IdempotencyConflict as conflict:
+                # Lost the insert race to a concurrent retry with the same key
+                existing = conflict.job
+
+    if existing is not None:
+        if existing.idempotency_fingerprint and existing.idempotency_fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "code": "idempotency_conflict",
+                    "message": "Idempotency-Key was already used with different parameters",
+                    "details": {"job_id": str(existing.id)},
+                },
             )
-        else:
-            job = repos.create_job_with_step(session, job_type=req.type, params=req.model_dump(), idempotency_key=idempotency_key)
+        response.headers["Idempotent-Replayed"] = "true"
+        replayed = JobCreated(
+            id=str(existing.id),
+            status=existing.status,
+            type=existing.type,
+            created_at=existing.created_at.isoformat(),
+        )
+        return JobCreatedResponse(job=replayed)
 
-    # Enqueue task (or inline if DF_CELERY_EAGER)
-    if os.getenv("DF_CELERY_EAGER", "false").lower() in {"1", "true", "yes"}:
-        try:
-            from services.worker.tasks.generate import generate as task_generate  # local import to avoid cyclic issues
+    # Read-your-writes: keep follow-up polls for this job on the primary briefly
+    note_write(job.id)
 
-            task_generate(job_id=str(job.id))
-        except Exception as exc:  # noqa: BLE001
-            with get_session() as session:
-                repos.mark_job_status(session, job.id, "failed", error={"code": "internal", "message": str(exc)})
+    # Enqueue task (or inline if DF_CELERY_EAGER)
+    if _eager():
+        if not _run_inline(job.id):
             raise HTTPException(status_code=500, detail={"code": "internal", "message": "Inline execute failed"})
     else:
         try:
-            _celery().send_task(
-                "jobs.generate",
-                kwargs={"job_id": str(job.id)},
-                queue="gpu.default",
-            )
+            producer.enqueue("jobs.generate", kwargs={"job_id": str(job.id)}, queue=queue)
         except Exception as exc:  # noqa: BLE001
             # Mark job as failed due to infra unavailability
             with get_session() as session:
@@ -133,34 +232,383 @@ def create_job(
     return JobCreatedResponse(job=created)
 
 
-@router.get("/jobs/{job_id}", response_model=JobStatusResponse, responses={404: {"model": ErrorResponse}})
-def get_job(job_id: str) -> JobStatusResponse:
-    with get_session() as session:
-        job, steps = repos.get_job_with_steps(session, job_id)
-        if not job:
-            raise HTTPException(status_code=404, detail={"code": "not_found", "message": "job not found"})
+def _created(job: Any) -> JobCreated:
+    return JobCreated(id=str(job.id), status=job.status, type=job.type, created_at=job.created_at.isoformat())
+
+
+def _error(code: str, message: str, details: dict[str, Any] | None = None) -> ErrorResponse:
+    return ErrorResponse(code=code, message=message, details=details)
+
+
+def _replay_or_conflict(index: int, existing: Any, fingerprint: str | None) -> JobBatchResult:
+    if existing.idempotency_fingerprint and existing.idempotency_fingerprint != fingerprint:
+        return JobBatchResult(
+            index=index,
+            error=_error(
+                "idempotency_conflict",
+                "Idempotency-Key was already used with different parameters",
+                {"job_id": str(existing.id)},
+            ),
+        )
+    return JobBatchResult(index=index, job=_created(existing), replayed=True)
+
 
-        # Batch-aware summary
+@router.post(
+    "/jobs:batch",
+    response_model=JobBatchResponse,
+    responses={
+        422: {"model": ErrorResponse},
+        429: {"model": ErrorResponse, "description": "Backlog over capacity; see Retry-After"},
+    },
+)
+def create_jobs_batch(
+    req: JobBatchRequest = Body(
+        examples={
+            "two": {
+                "summary": "Two jobs, one with an idempotency key",
+                "value": {
+                    "jobs": [
+                        {"type": "generate", "prompt": "a red fox", "width": 1024, "height": 1024, "steps": 30},
+                        {"type": "generate", "prompt": "a blue bird", "count": 2, "idempotency_key": "client-42"},
+                    ]
+                },
+            }
+        }
+    ),
+) -> JobBatchResponse:
+    """Create many jobs in one transaction; results are positional with per-entry errors.
+
+    Each entry is a JobCreateRequest plus an optional `idempotency_key` (same replay and
+    conflict rules as the `Idempotency-Key` header). Invalid entries get an error and do
+    not affect the others; tasks for created jobs are published over one producer.
+    """
+    max_items = _jobs_batch_max()
+    if len(req.jobs) > max_items:
+        raise HTTPException(status_code=422, detail={"code": "invalid_input", "message": f"at most {max_items} jobs per batch"})
+
+    results: list[JobBatchResult | None] = [None] * len(req.jobs)
+    specs: list[tuple[int, repos.JobSpec]] = []
+    first_by_key: dict[str, tuple[int, str | None]] = {}
+    repeats: list[tuple[int, str, str | None]] = []
+    for i, entry in enumerate(req.jobs):
         try:
-            count = int(job.params_json.get("count", 1)) if isinstance(job.params_json, dict) else 1
-        except Exception:
-            count = 1
-        count = max(1, min(count, 100))
-        arts = repos.list_artifacts_by_job(session, job.id)
-        completed = len(arts)
-
-        return JobStatusResponse(
-            id=str(job.id),
-            type=job.type,
-            status=job.status,
-            created_at=job.created_at.isoformat(),
-            updated_at=job.updated_at.isoformat(),
-            steps=[StepSummary(name=s.name, status=s.status) for s in steps],
-            summary={"count": count, "completed": completed},
-            error_code=job.error_code,
-            error_message=job.error_message,
+            # Entries that failed schema validation are re-validated for their errors
+            item = entry if isinstance(entry, JobBatchItem) else JobBatchItem.model_validate(entry)
+            upscale = _chain_options(item)
+        except ValidationError as exc:
+            results[i] = JobBatchResult(
+                index=i,
+                error=_error("invalid_input", "invalid job request", {"errors": exc.errors(include_url=False, include_input=False)}),
+            )
+            continue
+        except ValueError as exc:
+            results[i] = JobBatchResult(index=i, error=_error("invalid_input", str(exc)))
+            continue
+        key = item.idempotency_key
+        params, fingerprinted = _job_params(item)
+        fingerprint = repos.params_fingerprint(fingerprinted) if key else None
+        if key and key in first_by_key:
+            # Same key twice in one batch: resolved against the first occurrence below
+            repeats.append((i, key, fingerprint))
+            continue
+        if key:
+            first_by_key[key] = (i, fingerprint)
+        specs.append(
+            (
+                i,
+                repos.JobSpec(
+                    job_type=item.type,
+                    params=params,
+                    idempotency_key=key,
+                    idempotency_fingerprint=fingerprint,
+                    upscale=upscale,
+                    priority=item.priority,
+                ),
+            )
         )
 
+    created_ids: list[_uuid.UUID] = []
+    queues: dict[_uuid.UUID, str] = {}
+    keys = [s.idempotency_key for _, s in specs if s.idempotency_key]
+    existing: dict[str, Any] = {}
+    if keys:
+        with get_session() as session:
+            existing = repos.find_jobs_by_idempotency_keys(session, keys, ttl_s=_idempotency_ttl_s())
+    to_create: list[tuple[int, repos.JobSpec]] = []
+    for i, spec in specs:
+        owner = existing.get(spec.idempotency_key) if spec.idempotency_key else None
+        if owner is not None:
+            results[i] = _replay_or_conflict(i, owner, spec.idempotency_fingerprint)
+        else:
+            to_create.append((i, spec))
+    # All-or-nothing, and before the write transaction opens (admission may query the DB
+    # and the broker): a retried batch replays whatever was admitted before
+    per_queue: dict[str, int] = {}
+    for _, spec in to_create:
+        q = producer.queue_for(spec.priority)
+        per_queue[q] = per_queue.get(q, 0) + 1
+    for q, n in per_queue.items():
+        admission.admit(q, n)
+    with get_session() as session:
+        created = repos.create_jobs_bulk(session, [s for _, s in to_create])
+        for (i, spec), res in zip(to_create, created):
+            if isinstance(res, repos.IdempotencyConflict):
+                # Lost the insert race to a concurrent request with the same key
+                results[i] = _replay_or_conflict(i, res.job, spec.idempotency_fingerprint)
+            else:
+                results[i] = JobBatchResult(index=i, job=_created(res))
+                created_ids.append(res.id)
+                queues[res.id] = producer.queue_for(spec.priority)
+
+    for i, key, fingerprint in repeats:
+        first_i, first_fp = first_by_key[key]
+        first = results[first_i]
+        if first_fp != fingerprint:
+            details = {"job_id": first.job.id} if first is not None and first.job is not None else None
+            results[i] = JobBatchResult(
+                index=i, error=_error("idempotency_conflict", "Idempotency-Key repeated in batch with different parameters", details)
+            )
+        elif first is not None and first.job is not None:
+            results[i] = JobBatchResult(index=i, job=first.job, replayed=True)
+        else:
+            # Same request as an entry that failed: report its error, not a conflict
+            err = first.error if first is not None and first.error is not None else _error("internal", "Job not created")
+            results[i] = JobBatchResult(
+                index=i,
+                error=_error(err.code, f"duplicate of failed item {first_i}: {err.message}", {**(err.details or {}), "index": first_i}),
+            )
+
+    for job_id in created_ids:
+        note_write(job_id)
+
+    # Dispatch created jobs (inline if DF_CELERY_EAGER, else one pipelined publish batch)
+    failed: dict[str, ErrorResponse] = {}
+    if _eager():
+        for job_id in created_ids:
+            if not _run_inline(job_id):
+                failed[str(job_id)] = _error("internal", "Inline execute failed", {"job_id": str(job_id)})
+    elif created_ids:
+        errors: dict[_uuid.UUID, Exception] = {}
+        by_queue: dict[str, list[_uuid.UUID]] = {}
+        for job_id in created_ids:
+            by_queue.setdefault(queues[job_id], []).append(job_id)
+        for q, ids in by_queue.items():
+            outcomes = producer.enqueue_many("jobs.generate", [{"job_id": str(j)} for j in ids], queue=q)
+            errors.update({j: exc for j, exc in zip(ids, outcomes) if exc is not None})
+        if errors:
+            with get_session() as session:
+                for job_id, enqueue_exc in errors.items():
+                    repos.mark_job_status(session, job_id, "failed", error={"code": "infra_unavailable", "message": str(enqueue_exc)})
+            failed = {str(j): _error("infra_unavailable", "Failed to enqueue job", {"job_id": str(j)}) for j in errors}
+    if failed:
+        for r in results:
+            # In-batch repeats replay a job created here, so they fail with it
+            if r is not None and r.job is not None and r.job.id in failed:
+                r.error = failed[r.job.id]
+                r.job = None
+
+    return JobBatchResponse(results=[r for r in results if r is not None])
+
+
+_WAIT_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0}
+_TERMINAL = {"succeeded", "failed"}
+
+
+def _wait_max_s() -> float:
+    try:
+        return max(0.0, float(os.getenv("DF_JOBS_WAIT_MAX_S", "60")))
+    except Exception:
+        return 60.0
+
+
+def _parse_wait(value: str | None) -> float:
+    """``wait`` as seconds: ``30``, ``30s``, ``500ms`` or ``2m``; capped at ``DF_JOBS_WAIT_MAX_S``."""
+    if not value:
+        return 0.0
+    v = value.strip().lower()
+    unit = next((u for u in ("ms", "s", "m") if v.endswith(u)), "")
+    try:
+        seconds = float(v[: len(v) - len(unit)]) * _WAIT_UNITS.get(unit, 1.0)
+    except ValueError:
+        raise HTTPException(status_code=422, detail={"code": "invalid_input", "message": "wait must look like 30s, 500ms or 2m"})
+    if seconds < 0:
+        raise HTTPException(status_code=422, detail={"code": "invalid_input", "message": "wait must be >= 0"})
+    return min(seconds, _wait_max_s())
+
+
+async def _wait_for_job(job_id: str, wait_s: float, until: str, if_none_match: str | None) -> None:
+    """Block until the job is terminal (``until=terminal``) or its status view changes.
+
+    ``until=change`` compares against the client's ``If-None-Match`` when given, else
+    against the state at arrival. Wake-ups come from the job change signal (NOTIFY or
+    in-process); the version is re-read only then, or every poll interval as a safety net.
+    """
+    poll_s = float(os.getenv("DF_SSE_FALLBACK_POLL_S", "30")) if notify.push_enabled() else int(os.getenv("DF_SSE_POLL_MS", "500")) / 1000.0
+    deadline = time.monotonic() + wait_s
+    # Subscribe before the first read so a change in between still wakes us
+    sub = notify.subscribe(job_id)
+    try:
+        arrival: tuple[Any, ...] | None = None
+        while True:
+            version = await read(lambda s: repos.get_job_version(s, job_id), sticky_key=job_id)
+            STREAM_DB_POLLS.labels(stream="long_poll").inc()
+            if version is None or version.status in _TERMINAL:
+                return
+            # Only what the status body renders counts as a change; log events wake us but do not end the wait
+            if until == "change":
+                if if_none_match is not None:
+                    if not matches(if_none_match, job_status_etag(version)):
+                        return
+                elif arrival is None:
+                    arrival = version.status_view()
+                elif version.status_view() != arrival:
+                    return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await sub.wait_async(min(remaining, poll_s))
+    finally:
+        sub.close()
+
+
+_STATUSES = ("queued", "running", "succeeded", "failed")
+_STATS_LOCK = threading.Lock()
+_STATS_CACHE: tuple[float, JobStatsResponse] | None = None
+
+
+def _stats_windows() -> list[int]:
+    out = []
+    for part in os.getenv("DF_JOBS_STATS_WINDOWS_S", "60,300,900,3600").split(","):
+        try:
+            out.append(int(part))
+        except ValueError:
+            continue
+    return [w for w in out if w > 0] or [3600]
+
+
+def _compute_stats() -> JobStatsResponse:
+    now = datetime.now(timezone.utc)
+    with get_read_session() as session:
+        stats = repos.get_job_stats(session, now=now, windows=_stats_windows())
+    by_status = dict.fromkeys(_STATUSES, 0)
+    by_type: dict[str, dict[str, int]] = {}
+    for (status_, type_), n in stats.counts.items():
+        by_status[status_] = by_status.get(status_, 0) + n
+        by_type.setdefault(type_, dict.fromkeys(_STATUSES, 0))[status_] = n
+    return JobStatsResponse(
+        generated_at=now.isoformat().replace("+00:00", "Z"),
+        by_status=by_status,
+        by_type=by_type,
+        oldest_queued_age_s=(now - stats.oldest_queued_at).total_seconds() if stats.oldest_queued_at else None,
+        windows=[
+            JobStatsWindow(
+                window_s=w.window_s,
+                succeeded=w.succeeded,
+                failed=w.failed,
+                completed_per_min=round((w.succeeded + w.failed) * 60.0 / w.window_s, 3),
+                duration_p50_s=w.duration_p50_s,
+                duration_p95_s=w.duration_p95_s,
+            )
+            for w in stats.windows
+        ],
+    )
+
+
+# Declared before /jobs/{job_id} so "stats" is not taken for a job id
+@router.get("/jobs/stats", response_model=JobStatsResponse)
+def job_stats() -> JobStatsResponse:
+    """Job counts by status and type, plus completion rate and durations over recent windows.
+
+    Served from a per-process cache refreshed at most every ``DF_JOBS_STATS_CACHE_S``
+    seconds; concurrent requests for a stale snapshot wait for one recomputation.
+    """
+    global _STATS_CACHE
+    ttl = float(os.getenv("DF_JOBS_STATS_CACHE_S", "5"))
+    cached = _STATS_CACHE
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    with _STATS_LOCK:
+        cached = _STATS_CACHE
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        result = _compute_stats()
+        _STATS_CACHE = (time.monotonic(), result)
+        return result
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobStatusResponse,
+    responses={
+        304: {"description": "Not modified: If-None-Match matches the current ETag"},
+        404: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    },
+)
+async def get_job(
+    job_id: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+    wait: str | None = Query(default=None, description="Long-poll: hold the request up to this long (e.g. 30s, 500ms; max DF_JOBS_WAIT_MAX_S)"),
+    until: str = Query(default="change", description="With wait: `terminal` returns once the job finished; `change` on any status change"),
+) -> Any:
+    if until not in {"terminal", "change"}:
+        raise HTTPException(status_code=422, detail={"code": "invalid_input", "message": "until must be terminal or change"})
+    wait_s = _parse_wait(wait)
+    if wait_s > 0:
+        await _wait_for_job(job_id, wait_s, until, if_none_match)
+    return await offload(_job_status, job_id, response, if_none_match)
+
+
+def _job_status(job_id: str, response: Response, if_none_match: str | None) -> Any:
+    etag: str | None = None
+    with get_read_session(sticky_key=job_id) as session:
+        # Pollers mostly see no change: answer from the version query alone when the tag matches
+        version = repos.get_job_version(session, job_id)
+        if version is not None:
+            etag = job_status_etag(version)
+            if matches(if_none_match, etag):
+                return not_modified(etag)
+        detail = repos.get_job_detail(session, job_id)
+        replica_miss = detail is None and on_replica(session)
+    if replica_miss:
+        # Replica may lag behind a job created through another API process
+        with get_session() as session:
+            detail = repos.get_job_detail(session, job_id)
+        if detail:
+            note_write(job_id)
+    if not detail:
+        # Terminal jobs past retention live in cold storage
+        try:
+            detail = archive.get_job_detail(job_id)
+        except Exception:  # noqa: BLE001
+            raise HTTPException(status_code=503, detail={"code": "archive_unavailable", "message": "archived job could not be read"})
+    if not detail:
+        raise HTTPException(status_code=404, detail={"code": "not_found", "message": "job not found"})
+    job = detail.job
+
+    # Batch-aware summary
+    try:
+        count = int(job.params_json.get("count", 1)) if isinstance(job.params_json, dict) else 1
+    except Exception:
+        count = 1
+    count = max(1, min(count, 100))
+
+    if etag:
+        set_etag(response, etag)
+    return JobStatusResponse(
+        id=str(job.id),
+        type=job.type,
+        status=job.status,
+        priority=job.priority,
+        created_at=job.created_at.isoformat(),
+        updated_at=job.updated_at.isoformat(),
+        steps=[StepSummary(name=s.name, status=s.status) for s in detail.steps],
+        summary={"count": count, "completed": detail.artifact_count},
+        error_code=job.error_code,
+        error_message=job.error_message,
+    )
+
 
 @router.get("/jobs", response_model=JobListResponse)
 def list_jobs(status: str | None = None, limit: int = 20) -> JobListResponse:
@@ -173,7 +621,7 @@ def list_jobs(status: str | None = None, limit: int = 20) -> JobListResponse:
         raise HTTPException(status_code=422, detail={"code": "invalid_input", "message": "invalid limit"})
     limit_i = max(1, min(limit_i, 200))
 
-    with get_session() as session:
+    with get_read_session() as session:
         rows = repos.list_jobs(session, status=status, limit=limit_i)
     out = [
         JobListItem(
@@ -2,19 +2,23 @@ from __future__ import annotations
 
 import datetime as dt
 import json
-from typing import Any, Iterable
+import time
+from typing import Any, AsyncIterator
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 
-from modules.persistence.db import get_session
-from modules.persistence import repos
+from modules.persistence import notify, repos
 from services.api.schemas.jobs import ErrorResponse
-from services.api.utils.streaming import ndjson_line
+from services.api.utils.concurrency import offload, read
+from services.api.utils.reads import find_job
+from services.api.utils.streaming import STREAM_DB_POLLS, ndjson_line
 
 
 router = APIRouter(prefix="", tags=["logs"])
 
+_TERMINAL = {"succeeded", "failed"}
+
 
 def _parse_since_ts(value: str | None) -> dt.datetime | None:
     if not value:
@@ -31,15 +35,16 @@ def _parse_since_ts(value: str | None) -> dt.datetime | None:
 
 def _event_to_logline(evt) -> dict[str, Any]:  # type: ignore[no-untyped-def]
     msg = evt.payload_json.get("message") if isinstance(evt.payload_json, dict) else None
+    # ts and ids stay native; the NDJSON encoder renders them (UTC "Z" timestamps)
     out: dict[str, Any] = {
-        "ts": evt.ts.replace(tzinfo=dt.timezone.utc).isoformat().replace("+00:00", "Z"),
+        "ts": evt.ts,
         "level": evt.level,
         "code": evt.code,
         "message": msg or evt.code,
-        "job_id": str(evt.job_id),
+        "job_id": evt.job_id,
     }
     if evt.step_id:
-        out["step_id"] = str(evt.step_id)
+        out["step_id"] = evt.step_id
     if isinstance(evt.payload_json, dict) and "item_index" in evt.payload_json:
         out["item_index"] = evt.payload_json.get("item_index")
     return out
@@ -64,12 +69,15 @@ def _event_to_logline(evt) -> dict[str, Any]:  # type: ignore[no-untyped-def]
         422: {"model": ErrorResponse}
     },
 )
-def get_logs(job_id: str, tail: int | None = None, since_ts: str | None = None) -> StreamingResponse:
+async def get_logs(
+    job_id: str,
+    tail: int | None = None,
+    since_ts: str | None = None,
+    follow: bool = Query(default=False, description="Keep the stream open and append new events until the job is terminal"),
+) -> StreamingResponse:
     # Validate job existence
-    with get_session() as session:
-        job = repos.get_job(session, job_id)
-        if not job:
-            raise HTTPException(status_code=404, detail={"code": "not_found", "message": "job not found"})
+    if not await offload(find_job, job_id):
+        raise HTTPException(status_code=404, detail={"code": "not_found", "message": "job not found"})
 
     # Validate tail bounds
     import os as _os
@@ -81,12 +89,47 @@ def get_logs(job_id: str, tail: int | None = None, since_ts: str | None = None)
             raise HTTPException(status_code=422, detail={"code": "invalid_input", "message": f"tail must be 1..{tail_max}"})
 
     since_dt = _parse_since_ts(since_ts)
+    page_size = max(1, int(_os.getenv("DF_LOGS_PAGE_SIZE", "500")))
+    keepalive_s = float(_os.getenv("DF_LOGS_FOLLOW_KEEPALIVE_S", "15"))
+    poll_s = float(_os.getenv("DF_SSE_FALLBACK_POLL_S", "30")) if notify.push_enabled() else int(_os.getenv("DF_SSE_POLL_MS", "500")) / 1000.0
+
+    def _page(session, cursor: repos.EventCursor | None, first: bool) -> tuple[list[bytes], repos.EventCursor | None, str | None]:
+        # Status before events: anything committed with a terminal status is then in this page
+        status = repos.get_job_status(session, job_id) if follow else None
+        if first and since_dt is None:
+            cursor = repos.tail_cursor(session, job_id, tail)
+        events = repos.page_events(session, job_id, after=cursor, since_ts=since_dt, limit=page_size)
+        if events:
+            cursor = repos.EventCursor(ts=events[-1].ts, id=events[-1].id)
+        return [ndjson_line(_event_to_logline(e)) for e in events], cursor, status
 
-    def _gen() -> Iterable[bytes]:
-        with get_session() as session:
-            events = repos.iter_events(session, job_id, since_ts=since_dt, tail=tail)
-        for e in events:
-            yield ndjson_line(_event_to_logline(e))
+    async def _gen() -> AsyncIterator[bytes]:
+        # Subscribe before the first page so events written while we read still wake us
+        sub = notify.subscribe(job_id) if follow else None
+        cursor: repos.EventCursor | None = None
+        first = True
+        last_write = time.monotonic()
+        try:
+            while True:
+                lines, cursor, status = await read(lambda s: _page(s, cursor, first), sticky_key=job_id)
+                STREAM_DB_POLLS.labels(stream="ndjson").inc()
+                first = False
+                for line in lines:
+                    yield line
+                if lines:
+                    last_write = time.monotonic()
+                if len(lines) == page_size:
+                    continue  # backlog: next page right away
+                if sub is None or status is None or status in _TERMINAL:
+                    return
+                await sub.wait_async(min(poll_s, keepalive_s))
+                if time.monotonic() - last_write >= keepalive_s:
+                    # Blank line keeps idle proxies from closing the stream; NDJSON readers skip it
+                    yield b"\n"
+                    last_write = time.monotonic()
+        finally:
+            if sub is not None:
+                sub.close()
 
     return StreamingResponse(_gen(), media_type="application/x-ndjson", headers={
         "Cache-Control": "no-store",
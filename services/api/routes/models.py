@@ -2,8 +2,7 @@ from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException
 
-from modules.persistence.db import get_session
-from modules.persistence import repos
+from modules.persistence import registry_cache
 from services.api.schemas.models import ModelDescriptor, ModelListResponse, ModelSummary
 
 
@@ -13,17 +12,16 @@ router = APIRouter(prefix="", tags=["models"])
 @router.get("/models", response_model=ModelListResponse)
 def list_models() -> ModelListResponse:
     # Lean surface: returns installed+enabled models only
-    with get_session() as session:
-        rows = repos.list_models(session, enabled_only=True)
+    rows = registry_cache.list_models(enabled_only=True)
     models = [
         ModelSummary(
             id=str(m.id),
             name=m.name,
             kind=m.kind,
             version=m.version,
-            installed=bool(m.installed),
-            enabled=bool(m.enabled),
-            parameters_schema=m.parameters_schema or {},
+            installed=m.installed,
+            enabled=m.enabled,
+            parameters_schema=registry_cache.thaw(m.parameters_schema),
         )
         for m in rows
     ]
@@ -32,21 +30,20 @@ def list_models() -> ModelListResponse:
 
 @router.get("/models/{model_id}", response_model=ModelDescriptor)
 def get_model(model_id: str) -> ModelDescriptor:
-    with get_session() as session:
-        m = repos.get_model(session, model_id)
-        if not m:
-            raise HTTPException(status_code=404, detail={"code": "not_found", "message": "model not found"})
+    m = registry_cache.get_model(model_id)
+    if not m:
+        raise HTTPException(status_code=404, detail={"code": "not_found", "message": "model not found"})
     return ModelDescriptor(
         id=str(m.id),
         name=m.name,
         kind=m.kind,
         version=m.version,
-        installed=bool(m.installed),
-        enabled=bool(m.enabled),
-        parameters_schema=m.parameters_schema or {},
-        capabilities=m.capabilities or ["generate"],
+        installed=m.installed,
+        enabled=m.enabled,
+        parameters_schema=registry_cache.thaw(m.parameters_schema),
+        capabilities=registry_cache.thaw(m.capabilities),
         source_uri=m.source_uri,
         local_path=m.local_path,
-        files_json=m.files_json or [],
+        files_json=registry_cache.thaw(m.files_json),
     )
 
@@ -1,18 +1,20 @@
 from __future__ import annotations
 
-import os
-import time
 import datetime as dt
-from typing import Any, Iterable
+from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response
 from fastapi.responses import JSONResponse, StreamingResponse
 
-from modules.persistence.db import get_session
+from modules.persistence.db import get_read_session
 from modules.persistence import repos
 from services.api.schemas.progress import ProgressResponse
 from services.api.schemas.jobs import ErrorResponse
-from services.api.utils.streaming import sse_event, sse_heartbeat
+from services.api.utils.concurrency import offload, read
+from services.api.utils.conditional import job_etag, matches, not_modified, set_etag
+from services.api.utils.progress_hub import FeedEvent, ProgressHub, Snapshot
+from services.api.utils.reads import find_job
+from services.api.utils.streaming import sse_event
 
 
 router = APIRouter(prefix="", tags=["progress"])
@@ -27,15 +29,17 @@ def _static_stages() -> list[dict[str, Any]]:
     ]
 
 
-def _combined_progress_for_job(job) -> tuple[float, list[dict[str, Any]], list[dict[str, Any]]]:  # type: ignore[no-untyped-def]
+def _combined_progress_for_job(job_id: str) -> tuple[float, list[dict[str, Any]], list[dict[str, Any]]]:
     """Compute combined progress across steps if upscale step exists.
 
     Returns (aggregate_progress, items_for_terminal_step, stages_list)
     """
-    with get_session() as session:
+    with get_read_session(sticky_key=str(job_id)) as session:
+        job, steps = repos.get_job_with_steps(session, job_id)
+        if job is None:
+            return 0.0, [], _static_stages()
         # Count artifacts per step
         arts = repos.list_artifacts_by_job(session, job.id)
-        steps = repos.get_job_with_steps(session, job.id)[1]
         step_names = [s.name for s in steps]
         has_upscale = "upscale" in step_names
         try:
@@ -68,6 +72,36 @@ def _combined_progress_for_job(job) -> tuple[float, list[dict[str, Any]], list[d
             return agg, items, _static_stages()
 
 
+def _event_frame(e) -> bytes:  # type: ignore[no-untyped-def]
+    etype = "log"
+    if e.code == "artifact.written":
+        etype = "artifact"
+    elif e.code in {"error"}:
+        etype = "error"
+    return sse_event(etype, {
+        "ts": e.ts,
+        "code": e.code,
+        "level": e.level,
+        "payload": e.payload_json,
+    })
+
+
+def _feed_snapshot(job_id: str, cursor: dt.datetime | None) -> Snapshot:
+    # One blocking unit per feed wake-up: job status, events since cursor and aggregate progress
+    with get_read_session(sticky_key=job_id) as session:
+        status_job = repos.get_job(session, job_id)
+        events = repos.iter_events(session, job_id, since_ts=cursor, tail=None)
+    agg, items, stages = _combined_progress_for_job(job_id) if status_job else (0.0, [], _static_stages())
+    return Snapshot(
+        events=[FeedEvent(id=str(e.id), ts=e.ts, frame=_event_frame(e)) for e in events],
+        progress={"progress": agg, "items": items, "stages": stages},
+        terminal=bool(status_job and status_job.status in {"succeeded", "failed"}),
+    )
+
+
+_HUB = ProgressHub(_feed_snapshot)
+
+
 @router.get(
     "/jobs/{job_id}/progress",
     response_model=ProgressResponse,
@@ -96,15 +130,29 @@ def _combined_progress_for_job(job) -> tuple[float, list[dict[str, Any]], list[d
                 }
             }
         },
+        304: {"description": "Not modified: If-None-Match matches the current ETag"},
         404: {"model": ErrorResponse},
     },
 )
-def get_progress(job_id: str) -> ProgressResponse:
-    with get_session() as session:
-        job = repos.get_job(session, job_id)
+async def get_progress(
+    job_id: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+) -> Any:
+    version = await read(lambda s: repos.get_job_version(s, job_id), sticky_key=job_id)
+    if version is not None:
+        etag = job_etag("progress", version)
+        if matches(if_none_match, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+    # The version row already proves the job exists; otherwise check the primary too (replica lag)
+    job_ref = str(version.id) if version is not None else None
+    if job_ref is None:
+        job = await offload(find_job, job_id)
         if not job:
             raise HTTPException(status_code=404, detail={"code": "not_found", "message": "job not found"})
-    agg, items, stages = _combined_progress_for_job(job)
+        job_ref = str(job.id)
+    agg, items, stages = await offload(_combined_progress_for_job, job_ref)
     return ProgressResponse(progress=agg, items=items, stages=stages)
 
 
@@ -127,15 +175,11 @@ def get_progress(job_id: str) -> ProgressResponse:
         404: {"model": ErrorResponse}
     },
 )
-def stream_progress(job_id: str, since_ts: str | None = None) -> StreamingResponse:
+async def stream_progress(job_id: str, since_ts: str | None = None) -> StreamingResponse:
     # Validate job
-    with get_session() as session:
-        job = repos.get_job(session, job_id)
-        if not job:
-            raise HTTPException(status_code=404, detail={"code": "not_found", "message": "job not found"})
-
-    poll_ms = int(os.getenv("DF_SSE_POLL_MS", "500"))
-    heartbeat_s = int(os.getenv("DF_SSE_HEARTBEAT_S", "15"))
+    job = await offload(find_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail={"code": "not_found", "message": "job not found"})
 
     def _parse_ts(v: str | None) -> dt.datetime | None:
         if not v:
@@ -147,48 +191,7 @@ def stream_progress(job_id: str, since_ts: str | None = None) -> StreamingRespon
         except Exception:
             return None
 
-    since_dt = _parse_ts(since_ts)
-
-    def _gen() -> Iterable[bytes]:
-        last_hb = time.time()
-        cursor = since_dt
-        # Emit snapshot events first then optionally poll until terminal
-        while True:
-            with get_session() as session:
-                status_job = repos.get_job(session, job_id)
-                events = repos.iter_events(session, job_id, since_ts=cursor, tail=None)
-                agg, items, stages = _combined_progress_for_job(status_job) if status_job else (0.0, [], _static_stages())
-
-            # Emit any events since cursor
-            for e in events:
-                etype = "log"
-                if e.code == "artifact.written":
-                    etype = "artifact"
-                elif e.code in {"error"}:
-                    etype = "error"
-                yield sse_event(etype, {
-                    "ts": e.ts.replace(tzinfo=dt.timezone.utc).isoformat().replace("+00:00", "Z"),
-                    "code": e.code,
-                    "level": e.level,
-                    "payload": e.payload_json,
-                })
-                cursor = e.ts
-
-            # Emit progress (aggregate + minimal items)
-            yield sse_event("progress", {"progress": agg, "items": items, "stages": stages})
-
-            # Heartbeat
-            now = time.time()
-            if now - last_hb >= heartbeat_s:
-                yield sse_heartbeat()
-                last_hb = now
-
-            # Terminal -> close
-            if status_job and status_job.status in {"succeeded", "failed"}:
-                break
-
-            time.sleep(poll_ms / 1000.0)
-
-    return StreamingResponse(_gen(), media_type="text/event-stream", headers={
+    # All streams for a job share one feed; see services/api/utils/progress_hub.py
+    return StreamingResponse(_HUB.stream(job_id, _parse_ts(since_ts)), media_type="text/event-stream", headers={
         "Cache-Control": "no-store",
     })
@@ -12,6 +12,10 @@ class ArtifactOut(BaseModel):
     item_index: int
     s3_key: str
     url: str
+    preview_url: str | None = Field(
+        default=None,
+        description="Small WebP/JPEG preview: a presigned URL once rendered, else the API path that has a worker render it",
+    )
     expires_at: str
 
 
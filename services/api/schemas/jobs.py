@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, Field
-from typing import Literal
+from typing import Annotated, Literal
 
 
 class ChainUpscale(BaseModel):
@@ -40,6 +40,24 @@ class JobCreateRequest(BaseModel):
     engine: Literal["sdxl", "flux-srpo"] | None = Field(default=None, description="Generation engine selector")
     # M5: optional fixed chain (generate -> upscale)
     chain: Chain | None = None
+    priority: Literal["high", "normal", "low"] = Field(
+        default="normal",
+        description="Scheduling class: high for interactive requests, low for bulk work; selects the worker queue",
+    )
+
+
+class JobBatchItem(JobCreateRequest):
+    idempotency_key: str | None = Field(
+        default=None,
+        min_length=1,
+        description="Same replay and conflict rules as the Idempotency-Key header of POST /v1/jobs",
+    )
+
+
+class JobBatchRequest(BaseModel):
+    # An entry that does not validate is kept as a plain object and reported in its own
+    # result, so one bad entry does not reject the whole batch
+    jobs: list[Annotated[JobBatchItem | dict, Field(union_mode="left_to_right")]] = Field(min_length=1)
 
 
 class JobCreated(BaseModel):
@@ -53,6 +71,24 @@ class JobCreatedResponse(BaseModel):
     job: JobCreated
 
 
+class ErrorResponse(BaseModel):
+    code: str
+    message: str
+    details: dict | None = None
+    correlation_id: str | None = None
+
+
+class JobBatchResult(BaseModel):
+    index: int
+    job: JobCreated | None = None
+    replayed: bool = False
+    error: ErrorResponse | None = None
+
+
+class JobBatchResponse(BaseModel):
+    results: list[JobBatchResult]
+
+
 class StepSummary(BaseModel):
     name: str
     status: str
@@ -62,6 +98,7 @@ class JobStatusResponse(BaseModel):
     id: str
     type: str
     status: str
+    priority: str = "normal"
     created_at: str
     updated_at: str
     steps: list[StepSummary] = []
@@ -70,13 +107,6 @@ class JobStatusResponse(BaseModel):
     error_message: str | None = None
 
 
-class ErrorResponse(BaseModel):
-    code: str
-    message: str
-    details: dict | None = None
-    correlation_id: str | None = None
-
-
 class JobListItem(BaseModel):
     id: str
     type: str
@@ -87,3 +117,20 @@ class JobListItem(BaseModel):
 
 class JobListResponse(BaseModel):
     jobs: list[JobListItem]
+
+
+class JobStatsWindow(BaseModel):
+    window_s: int
+    succeeded: int
+    failed: int
+    completed_per_min: float
+    duration_p50_s: float | None = Field(default=None, description="Submission to success, median over the window")
+    duration_p95_s: float | None = None
+
+
+class JobStatsResponse(BaseModel):
+    generated_at: str
+    by_status: dict[str, int]
+    by_type: dict[str, dict[str, int]] = Field(description="Counts per job type, then per status")
+    oldest_queued_age_s: float | None = None
+    windows: list[JobStatsWindow]
@@ -0,0 +1,184 @@
+"""Admission control for job submission: shed load with 429 before the backlog explodes.
+
+Two independent limits, both off (0) by default:
+
+- ``DF_ADMISSION_MAX_ACTIVE_JOBS``: queued + running jobs in the database;
+- ``DF_ADMISSION_MAX_QUEUE_DEPTH``: messages waiting in the target broker queue, with
+  per-queue overrides in ``DF_ADMISSION_QUEUE_LIMITS`` (``gpu.low=5000,gpu.high=200``).
+
+Load figures are cached for ``DF_ADMISSION_CACHE_S`` so a submission burst costs one
+count query and one broker round trip per interval, not per request; jobs admitted in
+the meantime are added to the cached figures. ``Retry-After``
+is the time the workers need to drain the excess at the throughput observed over the
+last ``DF_ADMISSION_WINDOW_S`` (jobs finished per second), clamped to
+``DF_ADMISSION_RETRY_MAX_S``.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi import HTTPException
+from prometheus_client import Counter, Gauge
+
+from modules.persistence import repos
+from modules.persistence.db import get_read_session
+from modules.queue import producer
+
+_REJECTED = Counter("df_admission_rejected_total", "Job submissions rejected by admission control", ["queue", "reason"])
+_BACKLOG = Gauge("df_admission_backlog", "Backlog seen by admission control", ["source"])
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def queue_depth_limit(queue: str) -> int:
+    """Broker depth limit for ``queue``: a ``DF_ADMISSION_QUEUE_LIMITS`` entry, else the global one."""
+    for entry in os.getenv("DF_ADMISSION_QUEUE_LIMITS", "").split(","):
+        name, _, value = entry.partition("=")
+        if name.strip() == queue and value.strip():
+            try:
+                return max(0, int(value))
+            except ValueError:
+                break
+    return _int_env("DF_ADMISSION_MAX_QUEUE_DEPTH", 0)
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    reason: str | None = None
+    retry_after_s: int = 0
+    details: dict[str, Any] | None = None
+
+
+class _Cached:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: dict[str, tuple[float, Any]] = {}
+
+    def get(self, key: str, load: Any) -> Any:
+        ttl = _float_env("DF_ADMISSION_CACHE_S", 2.0)
+        now = time.monotonic()
+        with self._lock:
+            hit = self._values.get(key)
+        if hit is not None and now - hit[0] < ttl:
+            return hit[1]
+        value = load()
+        with self._lock:
+            self._values[key] = (now, value)
+        return value
+
+    def bump(self, key: str, update: Any) -> None:
+        """Apply ``update`` to a cached value in place, keeping its load time."""
+        with self._lock:
+            hit = self._values.get(key)
+            if hit is not None and hit[1] is not None:
+                self._values[key] = (hit[0], update(hit[1]))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+_CACHE = _Cached()
+
+
+def _job_load() -> repos.JobLoad:
+    since = datetime.now(timezone.utc) - timedelta(seconds=_window_s())
+    with get_read_session() as session:
+        load = repos.get_job_load(session, finished_since=since)
+    _BACKLOG.labels(source="jobs").set(load.queued + load.running)
+    return load
+
+
+def _queue_depth(queue: str) -> int | None:
+    depth = producer.queue_depth(queue)
+    if depth is not None:
+        _BACKLOG.labels(source=queue).set(depth)
+    return depth
+
+
+def _window_s() -> float:
+    return max(1.0, _float_env("DF_ADMISSION_WINDOW_S", 300.0))
+
+
+def _retry_after(excess: int, load: repos.JobLoad | None) -> int:
+    retry_max = max(1, _int_env("DF_ADMISSION_RETRY_MAX_S", 300))
+    if load is None:
+        load = _CACHE.get("jobs", _job_load)
+    rate = load.finished / _window_s()
+    if rate <= 0:
+        return retry_max
+    return max(1, min(retry_max, math.ceil(max(1, excess) / rate)))
+
+
+def check(queue: str, n: int = 1) -> Decision:
+    """Whether ``n`` more jobs may be enqueued onto ``queue`` right now."""
+    max_active = _int_env("DF_ADMISSION_MAX_ACTIVE_JOBS", 0)
+    max_depth = queue_depth_limit(queue)
+    load: repos.JobLoad | None = None
+    if max_active:
+        load = _CACHE.get("jobs", _job_load)
+        active = load.queued + load.running
+        if active + n > max_active:
+            return Decision(
+                allowed=False,
+                reason="active_jobs",
+                retry_after_s=_retry_after(active + n - max_active, load),
+                details={"active_jobs": active, "limit": max_active},
+            )
+    if max_depth:
+        depth = _CACHE.get(f"queue:{queue}", lambda: _queue_depth(queue))
+        # An unreachable broker is not a reason to shed load; enqueue reports that itself
+        if depth is not None and depth + n > max_depth:
+            return Decision(
+                allowed=False,
+                reason="queue_depth",
+                retry_after_s=_retry_after(depth + n - max_depth, load),
+                details={"queue": queue, "depth": depth, "limit": max_depth},
+            )
+    return Decision(allowed=True)
+
+
+def admit(queue: str, n: int = 1) -> None:
+    """Raise 429 (``overloaded``, with ``Retry-After``) if ``n`` jobs may not be admitted."""
+    decision = check(queue, n)
+    if decision.allowed:
+        # Count admitted jobs against the cached figures, so a burst inside one cache
+        # interval cannot overshoot the limits
+        _CACHE.bump("jobs", lambda load: load._replace(queued=load.queued + n))
+        _CACHE.bump(f"queue:{queue}", lambda depth: depth + n)
+        return
+    _REJECTED.labels(queue=queue, reason=decision.reason or "").inc()
+    raise HTTPException(
+        status_code=429,
+        detail={
+            "code": "overloaded",
+            "message": "job backlog is over capacity; retry later",
+            "details": {**(decision.details or {}), "retry_after_s": decision.retry_after_s},
+        },
+        headers={"Retry-After": str(decision.retry_after_s)},
+    )
+
+
+def reset() -> None:
+    """Drop cached load figures (tests)."""
+    _CACHE.clear()
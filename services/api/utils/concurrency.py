@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import os
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+import anyio
+from sqlalchemy.orm import Session
+
+from modules.persistence.db import get_read_session
+
+T = TypeVar("T")
+
+_LIMITER: anyio.CapacityLimiter | None = None
+
+
+def _limiter() -> anyio.CapacityLimiter:
+    # Created lazily: anyio limiters bind to the running event loop
+    global _LIMITER
+    if _LIMITER is None:
+        _LIMITER = anyio.CapacityLimiter(int(os.getenv("DF_API_BLOCKING_THREADS", "40")))
+    return _LIMITER
+
+
+async def offload(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a short blocking call (DB query, S3 presign/head) off the event loop.
+
+    Async handlers and stream generators hold a thread only for the duration of the
+    call, never while waiting between events.
+    """
+    return await anyio.to_thread.run_sync(partial(fn, *args, **kwargs), limiter=_limiter())
+
+
+def _with_read_session(fn: Callable[[Session], T], sticky_key: str | None) -> T:
+    with get_read_session(sticky_key=sticky_key) as session:
+        return fn(session)
+
+
+async def read(fn: Callable[[Session], T], *, sticky_key: str | None = None) -> T:
+    """``fn(session)`` in a read session (replica when configured) on a worker thread."""
+    return await offload(_with_read_session, fn, sticky_key)
@@ -0,0 +1,62 @@
+"""ETags and ``If-None-Match`` handling for polled job read endpoints.
+
+The tag is derived from ``repos.get_job_version`` (one aggregate query), so a poll that
+matches is answered with ``304`` before the full response is built.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from typing import Any
+
+from fastapi import Response
+
+from modules.persistence import repos
+from modules.persistence.repos import JobVersion
+
+
+def _part(value: Any) -> str:
+    if isinstance(value, datetime):
+        return repos._as_utc(value).isoformat()
+    return "" if value is None else str(value)
+
+
+def _etag(*parts: Any) -> str:
+    raw = "|".join(_part(v) for v in parts)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+
+def job_etag(kind: str, version: JobVersion, *extra: Any) -> str:
+    """Strong ETag for one representation (``kind``) of a job at ``version``."""
+    return _etag(kind, *version, *extra)
+
+
+def job_status_etag(version: JobVersion) -> str:
+    """ETag of the job status body, from the fields it renders only.
+
+    New log events leave it unchanged, so status pollers keep getting ``304``.
+    """
+    return _etag("job", *version.status_view())
+
+
+def matches(if_none_match: str | None, etag: str) -> bool:
+    """``If-None-Match`` comparison (weak, per RFC 9110 13.1.2); ``*`` matches any."""
+    if not if_none_match:
+        return False
+    tag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        c = candidate.strip()
+        if c == "*" or c.removeprefix("W/") == tag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    # Clients may store the body but must revalidate before reuse
+    response.headers["Cache-Control"] = "no-cache"
@@ -0,0 +1,61 @@
+"""JSON encoding for hand-built payloads (NDJSON lines, SSE frames).
+
+Uses orjson (``DF_JSON_BACKEND=auto``, the default); ``DF_JSON_BACKEND=stdlib``
+switches to the standard library. Both emit the same compact bytes. Datetimes go
+through ``_default`` on either backend: they are converted to UTC and rendered as
+ISO 8601 with a ``Z`` suffix, and naive values are taken as UTC, as SQLite returns
+them. UUIDs render as strings.
+
+Response-model routes are not routed through here: FastAPI already serializes those
+to bytes in pydantic-core, which is faster than any custom response class.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import uuid
+from typing import Any
+
+import orjson as _orjson
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, dt.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=dt.timezone.utc)
+        return value.astimezone(dt.timezone.utc).isoformat().replace("+00:00", "Z")
+    if isinstance(value, (dt.date, dt.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def _select_backend() -> str:
+    choice = os.getenv("DF_JSON_BACKEND", "auto").strip().lower()
+    if choice in {"stdlib", "json"}:
+        return "stdlib"
+    return "orjson"
+
+
+BACKEND = _select_backend()
+
+if BACKEND == "orjson":
+    # orjson would keep non-UTC offsets as given: hand datetimes to _default instead
+    _OPTS = _orjson.OPT_PASSTHROUGH_DATETIME | _orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        """Compact JSON as UTF-8 bytes."""
+        return _orjson.dumps(obj, option=_OPTS, default=_default)
+
+else:
+
+    def dumps(obj: Any) -> bytes:
+        """Compact JSON as UTF-8 bytes."""
+        return _stdlib_dumps(obj)
@@ -0,0 +1,235 @@
+"""Per-job fan-out of SSE progress streams.
+
+Every stream watching a job joins one ``_Feed`` for that job (per event loop). The
+feed computes the snapshot once per wake-up, on a notification or on a poll tick.
+It then broadcasts new events, plus the progress frame when that changed, to each
+subscriber's bounded queue. DB load scales with watched jobs, not open connections.
+
+A new subscriber is first served from the feed's in-memory history, filtered by its
+``since_ts``, and the current progress. Joining happens on the event loop with no
+await between the history copy and queue registration, so nothing is missed or
+duplicated. The history keeps the last ``DF_SSE_HISTORY_MAX`` events; a subscriber
+asking for older ones gets them from one extra snapshot. A subscriber whose queue fills up (``DF_SSE_QUEUE_MAX``) is detached.
+It receives an ``error`` event (``slow_consumer``) after draining what it already has,
+and can reconnect with ``since_ts``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, NamedTuple
+
+from prometheus_client import Counter, Gauge
+
+from modules.persistence import notify
+from modules.persistence.repos import _as_utc
+from services.api.utils.concurrency import offload
+from services.api.utils.streaming import SSE_FRAMES, STREAM_DB_POLLS, sse_event, sse_heartbeat
+
+_log = logging.getLogger(__name__)
+
+_FEEDS = Gauge("df_sse_feeds", "Jobs with an active progress feed")
+_SUBSCRIBERS = Gauge("df_sse_subscribers", "Open SSE progress subscribers")
+_SNAPSHOTS = Counter("df_sse_snapshots_total", "Progress snapshots computed by feeds")
+_DROPPED = Counter("df_sse_slow_consumers_total", "Subscribers detached because their queue was full")
+
+
+class FeedEvent(NamedTuple):
+    id: str
+    ts: dt.datetime
+    frame: bytes
+
+
+class Snapshot(NamedTuple):
+    events: list[FeedEvent]
+    progress: dict
+    terminal: bool
+
+
+SnapshotFn = Callable[[str, "dt.datetime | None"], Snapshot]
+
+
+@dataclass(eq=False)
+class _Subscriber:
+    queue: asyncio.Queue[bytes | None]
+    overflowed: bool = False
+
+
+@dataclass(eq=False)
+class _Feed:
+    job_id: str
+    history: list[FeedEvent] = field(default_factory=list)
+    seen: set[str] = field(default_factory=set)
+    progress: dict | None = None
+    progress_frame: bytes = b""
+    terminal: bool = False
+    trimmed: bool = False
+    subscribers: set[_Subscriber] = field(default_factory=set)
+    waiters: int = 0
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    task: asyncio.Task | None = None
+
+    def broadcast(self, frame: bytes | None) -> None:
+        for sub in list(self.subscribers):
+            try:
+                sub.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                sub.overflowed = True
+                self.subscribers.discard(sub)
+                _DROPPED.inc()
+
+
+class ProgressHub:
+    def __init__(self, snapshot_fn: SnapshotFn) -> None:
+        self._snapshot_fn = snapshot_fn
+        self._feeds: dict[tuple[asyncio.AbstractEventLoop, str], _Feed] = {}
+
+    def _feed(self, job_id: str) -> _Feed:
+        key = (asyncio.get_running_loop(), job_id)
+        feed = self._feeds.get(key)
+        if feed is None:
+            feed = _Feed(job_id=job_id)
+            self._feeds[key] = feed
+            _FEEDS.inc()
+            feed.task = asyncio.create_task(self._run(key, feed))
+        return feed
+
+    def _detach(self, key: tuple[asyncio.AbstractEventLoop, str], feed: _Feed) -> None:
+        if self._feeds.get(key) is feed:
+            del self._feeds[key]
+            _FEEDS.dec()
+
+    def _apply(self, feed: _Feed, snap: Snapshot) -> tuple[list[FeedEvent], bool]:
+        new = [e for e in snap.events if e.id not in feed.seen]
+        for e in new:
+            feed.seen.add(e.id)
+            feed.history.append(e)
+        excess = len(feed.history) - max(1, int(os.getenv("DF_SSE_HISTORY_MAX", "1000")))
+        if excess > 0:
+            # Snapshots only return events from the cursor on, so ids older than the
+            # retained history can no longer come back and need not be remembered
+            for e in feed.history[:excess]:
+                feed.seen.discard(e.id)
+            del feed.history[:excess]
+            feed.trimmed = True
+        changed = snap.progress != feed.progress
+        if changed:
+            feed.progress = snap.progress
+            feed.progress_frame = sse_event("progress", snap.progress)
+        feed.terminal = snap.terminal
+        return new, changed
+
+    async def _run(self, key: tuple[asyncio.AbstractEventLoop, str], feed: _Feed) -> None:
+        poll_s = int(os.getenv("DF_SSE_POLL_MS", "500")) / 1000.0
+        # With LISTEN/NOTIFY active, idle feeds only re-query as a safety net
+        fallback_poll_s = float(os.getenv("DF_SSE_FALLBACK_POLL_S", "30"))
+        sub = notify.subscribe(feed.job_id)
+        cursor: dt.datetime | None = None
+        try:
+            while True:
+                snap = await offload(self._snapshot_fn, feed.job_id, cursor)
+                _SNAPSHOTS.inc()
+                STREAM_DB_POLLS.labels(stream="sse").inc()
+                first = not feed.ready.is_set()
+                new, changed = self._apply(feed, snap)
+                if feed.history:
+                    cursor = feed.history[-1].ts
+                if first:
+                    feed.ready.set()
+                else:
+                    for e in new:
+                        feed.broadcast(e.frame)
+                    if changed:
+                        feed.broadcast(feed.progress_frame)
+                if feed.terminal:
+                    feed.broadcast(None)
+                    return
+                if not feed.subscribers and not feed.waiters:
+                    return
+                if notify.push_enabled():
+                    await sub.wait_async(fallback_poll_s)
+                else:
+                    # No LISTEN connection: poll, but still wake early on in-process signals
+                    await sub.wait_async(poll_s)
+        except asyncio.CancelledError:
+            # Normally nobody is left; never leave a subscriber waiting on a dead feed
+            feed.broadcast(None)
+        except Exception:  # noqa: BLE001
+            _log.exception("progress feed for job %s failed", feed.job_id)
+            feed.terminal = True
+            feed.broadcast(None)
+        finally:
+            sub.close()
+            feed.ready.set()
+            self._detach(key, feed)
+
+    async def stream(self, job_id: str, since: dt.datetime | None) -> AsyncIterator[bytes]:
+        heartbeat_s = int(os.getenv("DF_SSE_HEARTBEAT_S", "15"))
+        queue_max = int(os.getenv("DF_SSE_QUEUE_MAX", "256"))
+        since_utc = _as_utc(since) if since else None
+
+        key = (asyncio.get_running_loop(), job_id)
+        feed = self._feed(job_id)
+        feed.waiters += 1
+        try:
+            await feed.ready.wait()
+        finally:
+            feed.waiters -= 1
+        # Join atomically: history copy and queue registration without an await in between
+        retained = [e for e in feed.history if since_utc is None or _as_utc(e.ts) >= since_utc]
+        # Events older than the retained history are fetched once, after joining
+        oldest = feed.history[0] if feed.trimmed and feed.history else None
+        gap = oldest if oldest is not None and (since_utc is None or since_utc < _as_utc(oldest.ts)) else None
+        initial = [e.frame for e in retained]
+        if feed.progress_frame:
+            initial.append(feed.progress_frame)
+        sub = _Subscriber(queue=asyncio.Queue(maxsize=max(1, queue_max)))
+        done = feed.terminal
+        if not done:
+            feed.subscribers.add(sub)
+        _SUBSCRIBERS.inc()
+        frames = SSE_FRAMES.labels(kind="data")
+        heartbeats = SSE_FRAMES.labels(kind="heartbeat")
+        try:
+            if gap is not None:
+                snap = await offload(self._snapshot_fn, job_id, since)
+                STREAM_DB_POLLS.labels(stream="sse").inc()
+                kept = {e.id for e in retained}
+                gap_ts = _as_utc(gap.ts)
+                initial = [e.frame for e in snap.events if e.id not in kept and _as_utc(e.ts) <= gap_ts] + initial
+            for frame in initial:
+                frames.inc()
+                yield frame
+            if done:
+                return
+            last_hb = time.monotonic()
+            while True:
+                if sub.overflowed and sub.queue.empty():
+                    frames.inc()
+                    yield sse_event("error", {"code": "slow_consumer", "message": "stream fell behind; reconnect with since_ts"})
+                    return
+                timeout = max(0.0, heartbeat_s - (time.monotonic() - last_hb))
+                try:
+                    queued = await asyncio.wait_for(sub.queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    heartbeats.inc()
+                    yield sse_heartbeat()
+                    last_hb = time.monotonic()
+                    continue
+                if queued is None:
+                    return
+                frames.inc()
+                yield queued
+        finally:
+            _SUBSCRIBERS.dec()
+            feed.subscribers.discard(sub)
+            if not feed.subscribers and not feed.waiters and feed.task is not None and not feed.task.done():
+                # Detach before cancelling: a stream opened before the task unwinds must
+                # start a new feed rather than join one that is shutting down
+                self._detach(key, feed)
+                feed.task.cancel()
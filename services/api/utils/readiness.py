@@ -0,0 +1,182 @@
+"""Cached dependency checks behind ``/readyz``.
+
+The DB check runs ``SELECT 1`` through a one-connection probe engine kept per URL,
+bounded by ``DF_READY_DB_TIMEOUT_S`` (connect, pool wait and statement), so it fails
+fast rather than queueing behind a saturated application pool. The S3 check reuses
+the shared client. ``settings.db_url`` and the ``settings.s3_*`` fields are used when
+the env vars are unset. Each dependency's result is cached for ``DF_READY_CACHE_S``. Once stale, the cached result keeps being served while one
+background thread refreshes it, for up to ``DF_READY_STALE_S`` more. Past that, or on
+the first probe, callers wait for a fresh check. At most one check per dependency runs
+at a time, however many replicas' probes arrive.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+
+from modules.storage import s3 as s3mod
+
+from ..config import get_settings
+from .concurrency import offload
+
+_log = logging.getLogger(__name__)
+
+_CHECK_SECONDS = Histogram(
+    "df_api_ready_check_seconds",
+    "Readiness check latency per dependency",
+    ["dependency"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+_CHECK_UP = Gauge("df_api_ready_check_up", "Last readiness check result per dependency (1=ok)", ["dependency"])
+_CHECK_FAILURES = Counter("df_api_ready_check_failures_total", "Failed readiness checks", ["dependency"])
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class Result:
+    ok: bool
+    error: str | None
+    checked_at: float
+    latency_s: float
+
+
+class _Check:
+    def __init__(self, name: str, fn: Callable[[], None]) -> None:
+        self.name = name
+        self._fn = fn
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.result: Result | None = None
+
+    def _run(self) -> Result:
+        start = time.monotonic()
+        try:
+            self._fn()
+            error = None
+        except Exception as exc:  # noqa: BLE001
+            error = str(exc) or type(exc).__name__
+        latency = time.monotonic() - start
+        _CHECK_SECONDS.labels(dependency=self.name).observe(latency)
+        _CHECK_UP.labels(dependency=self.name).set(0 if error else 1)
+        if error:
+            _CHECK_FAILURES.labels(dependency=self.name).inc()
+        return Result(ok=error is None, error=error, checked_at=time.monotonic(), latency_s=latency)
+
+    def refresh(self, newer_than: float) -> Result:
+        # Single flight: callers queued behind a running check reuse its result
+        with self._lock:
+            current = self.result
+            if current is not None and current.checked_at >= newer_than:
+                return current
+            self.result = self._run()
+            return self.result
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh(time.monotonic())
+        except Exception:  # noqa: BLE001
+            _log.exception("readiness refresh for %s failed", self.name)
+        finally:
+            self._refreshing = False
+
+    async def get(self) -> Result:
+        ttl = _float_env("DF_READY_CACHE_S", 5.0)
+        stale = _float_env("DF_READY_STALE_S", 30.0)
+        now = time.monotonic()
+        current = self.result
+        if current is not None:
+            age = now - current.checked_at
+            if age < ttl:
+                return current
+            if age < ttl + stale:
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(target=self._refresh_in_background, name=f"readyz-{self.name}", daemon=True).start()
+                return current
+        return await offload(self.refresh, now)
+
+
+_PROBE_ENGINES: dict[str, Engine] = {}
+_PROBE_ENGINES_LOCK = threading.Lock()
+
+
+def _probe_engine(url: str) -> Engine:
+    with _PROBE_ENGINES_LOCK:
+        engine = _PROBE_ENGINES.get(url)
+        if engine is None:
+            timeout_s = _float_env("DF_READY_DB_TIMEOUT_S", 1.0)
+            connect_args: dict[str, object] = {}
+            if make_url(url).get_backend_name() == "postgresql":
+                connect_args = {
+                    "connect_timeout": max(1, math.ceil(timeout_s)),
+                    "options": f"-c statement_timeout={int(timeout_s * 1000)}",
+                }
+            engine = _PROBE_ENGINES[url] = create_engine(
+                url,
+                pool_size=1,
+                max_overflow=0,
+                pool_timeout=timeout_s,
+                pool_pre_ping=True,
+                connect_args=connect_args,
+            )
+    return engine
+
+
+def _ping_db(url: str) -> None:
+    with _probe_engine(url).connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+def _check_db() -> None:
+    url = os.getenv("DF_DB_URL") or get_settings().db_url
+    if not url:
+        raise RuntimeError("DB readiness requested but DF_DB_URL not set")
+    _ping_db(url)
+
+
+def _s3_config() -> s3mod.S3Config:
+    settings = get_settings()
+    endpoint = os.getenv("DF_MINIO_ENDPOINT") or os.getenv("DF_S3_ENDPOINT") or settings.s3_endpoint
+    access_key = os.getenv("DF_MINIO_ACCESS_KEY") or os.getenv("DF_S3_ACCESS_KEY") or settings.s3_access_key
+    secret_key = os.getenv("DF_MINIO_SECRET_KEY") or os.getenv("DF_S3_SECRET_KEY") or settings.s3_secret_key
+    bucket = os.getenv("DF_MINIO_BUCKET") or os.getenv("DF_S3_BUCKET") or settings.s3_bucket
+    region = os.getenv("DF_S3_REGION") or settings.s3_region
+    if not all([endpoint, access_key, secret_key, bucket]):
+        raise RuntimeError("S3 readiness requested but one or more S3 env vars are missing")
+    return s3mod.S3Config(endpoint=str(endpoint), access_key=str(access_key), secret_key=str(secret_key), bucket=str(bucket), region=region)
+
+
+def _check_s3() -> None:
+    cfg = _s3_config()
+    s3mod.client(cfg).head_bucket(Bucket=cfg.bucket)
+
+
+_CHECKS: dict[str, _Check] = {"db": _Check("db", _check_db), "s3": _Check("s3", _check_s3)}
+
+
+async def check(names: set[str]) -> dict[str, Result]:
+    """Results for the requested dependencies (unknown names are ignored)."""
+    return {name: await _CHECKS[name].get() for name in sorted(names) if name in _CHECKS}
+
+
+def reset() -> None:
+    """Forget cached results (tests)."""
+    for c in _CHECKS.values():
+        with c._lock:
+            c.result = None
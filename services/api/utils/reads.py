@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from modules.persistence import repos
+from modules.persistence.db import get_read_session, get_session, note_write, on_replica
+from modules.persistence.models import Artifact, Job
+
+
+def find_job(job_id: str) -> Job | None:
+    """Load a job for a read endpoint.
+
+    Tries the read session (replica when configured) first. A miss on a replica may
+    just be replication lag for a job created through another API process, so the
+    job is re-read from the primary and, if found, pinned there for follow-up reads.
+    """
+    with get_read_session(sticky_key=job_id) as session:
+        job = repos.get_job(session, job_id)
+        if job is not None or not on_replica(session):
+            return job
+    with get_session() as session:
+        job = repos.get_job(session, job_id)
+    if job is not None:
+        note_write(job_id)
+    return job
+
+
+def find_artifact(artifact_id: str) -> Artifact | None:
+    """Load an artifact for a read endpoint, falling back to the primary like ``find_job``."""
+    with get_read_session(sticky_key=artifact_id) as session:
+        art = repos.get_artifact(session, artifact_id)
+        if art is not None or not on_replica(session):
+            return art
+    with get_session() as session:
+        return repos.get_artifact(session, artifact_id)
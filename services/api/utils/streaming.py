@@ -1,18 +1,22 @@
 from __future__ import annotations
 
-import json
+from prometheus_client import Counter
+
+from .fastjson import dumps
+
+# Written per client, so fan-out shows up here but not in the feed snapshot counters
+SSE_FRAMES = Counter("df_api_sse_frames_total", "SSE frames written to clients", ["kind"])
+STREAM_DB_POLLS = Counter("df_api_stream_db_polls_total", "DB reads performed for streaming responses", ["stream"])
 
 
 def ndjson_line(obj: dict) -> bytes:
-    return (json.dumps(obj, separators=(",", ":")) + "\n").encode("utf-8")
+    return dumps(obj) + b"\n"
 
 
 def sse_event(event: str, data: dict) -> bytes:
     # Minimal SSE formatter
-    payload = json.dumps(data, separators=(",", ":"))
-    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
 
 
 def sse_heartbeat() -> bytes:
     return b":\n\n"
-
@@ -4,9 +4,13 @@ import os
 from typing import Any
 
 from celery import Celery
+from celery.signals import task_postrun, task_prerun
 from kombu import Exchange, Queue
 from prometheus_client import Counter, Gauge, start_http_server
 
+# Select worker pool defaults before task modules create the persistence engine.
+os.environ.setdefault("DF_DB_ROLE", "worker")
+
 
 def _new_app() -> Celery:
     broker_url = os.getenv("DF_REDIS_URL", "redis://127.0.0.1:6379/0")
@@ -20,14 +24,26 @@ def _new_app() -> Celery:
         task_always_eager=os.getenv("DF_CELERY_EAGER", "false").lower() in {"1", "true", "yes"},
         worker_concurrency=int(os.getenv("DF_WORKER_CONCURRENCY", "2")),
         broker_connection_retry_on_startup=True,
-        imports=("services.worker.tasks.generate", "services.worker.tasks.upscale"),
+        imports=("services.worker.tasks.generate", "services.worker.tasks.upscale", "services.worker.tasks.maintenance"),
     )
 
-    # Declare GPU queue with direct exchange and matching routing key
+    # Periodic cold archival of terminal jobs (requires `celery beat`); off unless DF_ARCHIVE_AFTER_DAYS > 0
+    if float(os.getenv("DF_ARCHIVE_AFTER_DAYS", "0") or 0) > 0:
+        app.conf.beat_schedule = {
+            "archive-terminal-jobs": {
+                "task": "maintenance.archive_jobs",
+                "schedule": float(os.getenv("DF_ARCHIVE_INTERVAL_S", "3600")),
+            }
+        }
+
+    # Declare GPU queues (one per job priority) on a direct exchange with matching routing keys
     gpu_exchange = Exchange("gpu.default", type="direct")
-    app.conf.task_queues = (
-        Queue("gpu.default", exchange=gpu_exchange, routing_key="gpu.default"),
+    app.conf.task_queues = tuple(
+        Queue(name, exchange=gpu_exchange, routing_key=name) for name in ("gpu.high", "gpu.default", "gpu.low")
     )
+    # A worker consuming several queues (-Q gpu.high,gpu.default,gpu.low) drains them in
+    # that order on Redis ("priority"); "round_robin" shares fairly instead
+    app.conf.broker_transport_options = {"queue_order_strategy": os.getenv("DF_WORKER_QUEUE_ORDER", "priority")}
     app.conf.task_default_queue = "gpu.default"
     app.conf.task_default_exchange = "gpu.default"
     app.conf.task_default_exchange_type = "direct"
@@ -65,9 +81,31 @@ def _start_metrics_server() -> None:
 
 _start_metrics_server()
 
+
+# Attribute SQL statements to the running task (df_db_statements_per_unit{scope="task"})
+_TASK_QUERY_TRACKING: dict[str, Any] = {}
+
+
+@task_prerun.connect
+def _track_task_queries(task_id: str | None = None, task: Any = None, **_: Any) -> None:
+    from modules.persistence.db import begin_query_tracking
+
+    if task_id:
+        _TASK_QUERY_TRACKING[task_id] = begin_query_tracking("task", getattr(task, "name", "unknown"))
+
+
+@task_postrun.connect
+def _export_task_queries(task_id: str | None = None, **_: Any) -> None:
+    from modules.persistence.db import end_query_tracking
+
+    tracked = _TASK_QUERY_TRACKING.pop(task_id or "", None)
+    if tracked is not None:
+        end_query_tracking(*tracked)
+
 # Ensure task modules are imported so Celery registers them
 try:  # pragma: no cover
     import services.worker.tasks.generate  # noqa: F401
+    import services.worker.tasks.maintenance  # noqa: F401
     import services.worker.tasks.upscale  # noqa: F401
 except Exception:
     pass
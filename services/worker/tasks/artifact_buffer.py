@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import os
+import time
+import uuid as _uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from modules.persistence import repos
+from modules.persistence.db import get_session
+
+
+def _flush_every() -> int:
+    try:
+        return max(1, int(os.getenv("DF_ARTIFACT_FLUSH_EVERY", "8")))
+    except Exception:
+        return 8
+
+
+def _flush_s() -> float:
+    try:
+        return max(0.0, float(os.getenv("DF_ARTIFACT_FLUSH_S", "2.0")))
+    except Exception:
+        return 2.0
+
+
+class ArtifactBuffer:
+    """Collects a step's artifacts and persists them with repos.insert_artifacts_bulk.
+
+    Pending items are flushed (one transaction, one INSERT per table) once
+    DF_ARTIFACT_FLUSH_EVERY items are pending or DF_ARTIFACT_FLUSH_S seconds have
+    passed since the last flush, so progress stays visible during long batches while
+    fast batches avoid a transaction per item. Callers must flush() before marking
+    the step finished or failed.
+    """
+
+    def __init__(
+        self,
+        *,
+        job_id: _uuid.UUID,
+        step_id: _uuid.UUID,
+        flush_every: int | None = None,
+        flush_s: float | None = None,
+    ) -> None:
+        self.job_id = job_id
+        self.step_id = step_id
+        self.flush_every = flush_every if flush_every is not None else _flush_every()
+        self.flush_s = flush_s if flush_s is not None else _flush_s()
+        self._pending: list[dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+        self.written = 0
+
+    def add(self, **fields: Any) -> None:
+        fields.setdefault("ts", datetime.now(timezone.utc))
+        self._pending.append(fields)
+        if len(self._pending) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_s:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        with get_session() as session:
+            self.written += repos.insert_artifacts_bulk(
+                session, job_id=self.job_id, step_id=self.step_id, artifacts=pending
+            )
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import io
+import logging
 import os
 import random
 import time
@@ -13,13 +14,17 @@ from PIL import Image
 
 from modules.persistence.db import get_session
 from modules.persistence.models import Step
-from modules.persistence import repos
-from modules.storage import s3 as s3mod
+from modules.persistence import registry_cache, repos
+from modules.queue import producer
+from modules.storage import renditions, s3 as s3mod
+from services.worker.tasks.artifact_buffer import ArtifactBuffer
 
 import gc
 from multiprocessing import get_context
 import contextlib
 
+_log = logging.getLogger(__name__)
+
 
 def _env_truthy(name: str, default: str = "0") -> bool:
     return (os.getenv(name, default) or "").lower() in {"1", "true", "yes", "on"}
@@ -235,6 +240,7 @@ def generate(*, job_id: str) -> dict[str, Any]:
         job, _ = repos.get_job_with_steps(session, job_uuid)
         assert job is not None
         params = job.params_json
+        priority = job.priority
 
     prompt: str = params.get("prompt", "")
     negative: str | None = params.get("negative_prompt")
@@ -279,21 +285,19 @@ def generate(*, job_id: str) -> dict[str, Any]:
     # Resolve model path: prefer registry by model_id, else default registry model, else env fallback
     selected_model_path = None
     model_source = "env_fallback"
+    # Registry lookups are served from the in-process cache (no DB round trip when warm)
     model_id_param = params.get("model_id")
-    with get_session() as session:
-        if model_id_param:
-            m = repos.get_model(session, model_id_param)
-            if m and m.installed and m.enabled and m.local_path:
-                selected_model_path = m.local_path
-                model_source = "registry"
-            else:
-                # explicit selection but unavailable
-                selected_model_path = None
-        if not selected_model_path:
-            mdef = repos.get_default_model(session, kind="sdxl-checkpoint")
-            if mdef and mdef.installed and mdef.enabled and mdef.local_path:
-                selected_model_path = mdef.local_path
-                model_source = "registry"
+    if model_id_param:
+        m = registry_cache.get_model(model_id_param)
+        if m and m.available:
+            selected_model_path = m.local_path
+            model_source = "registry"
+        # else: explicit selection but unavailable
+    if not selected_model_path:
+        mdef = registry_cache.get_default_model(kind="sdxl-checkpoint")
+        if mdef and mdef.available:
+            selected_model_path = mdef.local_path
+            model_source = "registry"
 
     env_model_path = os.getenv(
         "DF_GENERATE_MODEL_PATH",
@@ -304,28 +308,16 @@ def generate(*, job_id: str) -> dict[str, Any]:
     # If using FLUX engine, best-effort resolve SRPO transformer from registry to a concrete file path
     if engine == "flux-srpo":
         srpo_path = None
-        with get_session() as session:
-            # If an explicit model_id is provided and is a flux-transformer, use it
-            if model_id_param:
-                m = repos.get_model(session, model_id_param)
-                if m and m.installed and m.enabled and m.local_path and m.kind == "flux-transformer":
-                    # Pick the first safetensors file from files_json
-                    files = m.files_json or []
-                    for f in files:
-                        p = f.get("path")
-                        if isinstance(p, str) and p.endswith(".safetensors"):
-                            srpo_path = os.path.join(m.local_path, p)
-                            break
-            # Else use default flux-transformer
-            if not srpo_path:
-                mdef = repos.get_default_model(session, kind="flux-transformer")
-                if mdef and mdef.installed and mdef.enabled and mdef.local_path:
-                    files = mdef.files_json or []
-                    for f in files:
-                        p = f.get("path")
-                        if isinstance(p, str) and p.endswith(".safetensors"):
-                            srpo_path = os.path.join(mdef.local_path, p)
-                            break
+        # If an explicit model_id is provided and is a flux-transformer, use its first safetensors file
+        if model_id_param:
+            m = registry_cache.get_model(model_id_param)
+            if m and m.available and m.kind == "flux-transformer":
+                srpo_path = m.weights_path
+        # Else use default flux-transformer
+        if not srpo_path:
+            mdef = registry_cache.get_default_model(kind="flux-transformer")
+            if mdef and mdef.available:
+                srpo_path = mdef.weights_path
         if srpo_path and os.path.exists(srpo_path):
             os.environ["DF_FLUX_SRPO_TRANSFORMER_PATH"] = srpo_path
             try:
@@ -361,6 +353,8 @@ def generate(*, job_id: str) -> dict[str, Any]:
         pass
 
     fake = os.getenv("DF_FAKE_RUNNER", "0").lower() in {"1", "true"}
+    # Artifacts + artifact.written events are persisted in bulk on a flush cadence
+    artifacts = ArtifactBuffer(job_id=job_uuid, step_id=step.id)
     try:
         fmt = "png"
         ts = _now_ts()
@@ -406,35 +400,29 @@ def generate(*, job_id: str) -> dict[str, Any]:
 
             key = f"dreamforge/default/jobs/{job_id}/generate/{ts}_{idx}_{width}x{height}_{seed_i}.{fmt}"
             s3mod.upload_bytes(cfg, key, data, content_type="image/png")
+            # Render the gallery preview while the image is still in memory
+            preview = renditions.eager_preview(cfg, key, data)
 
-            with get_session() as session:
-                repos.insert_artifact(
-                    session,
-                    job_id=job_uuid,
-                    step_id=step.id,
-                    format=fmt,
-                    width=width,
-                    height=height,
-                    seed=seed_i,
-                    item_index=idx,
-                    s3_key=key,
-                    checksum=None,
-                    metadata_json={
-                        "prompt": prompt,
-                        "negative_prompt": negative,
-                        "seed": seed_i,
-                        "engine": engine,
-                    },
-                )
-                repos.append_event(
-                    session,
-                    job_id=job_uuid,
-                    step_id=step.id,
-                    code="artifact.written",
-                    payload={"s3_key": key, "seed": seed_i, "item_index": idx},
-                )
+            artifacts.add(
+                format=fmt,
+                width=width,
+                height=height,
+                seed=seed_i,
+                item_index=idx,
+                s3_key=key,
+                checksum=None,
+                metadata_json={
+                    "prompt": prompt,
+                    "negative_prompt": negative,
+                    "seed": seed_i,
+                    "engine": engine,
+                    **({"preview_key": preview} if preview else {}),
+                },
+                event_payload={"s3_key": key, "seed": seed_i, "item_index": idx},
+            )
 
         # Mark success only after all items complete
+        artifacts.flush()
         with get_session() as session:
             repos.mark_step_finished(session, step.id, "succeeded")
             repos.mark_job_status(session, job_uuid, "succeeded")
@@ -452,16 +440,16 @@ def generate(*, job_id: str) -> dict[str, Any]:
 
                     task_upscale(job_id=str(job_uuid))
                 else:
-                    from celery import Celery  # import here to avoid worker import cycles
-
-                    broker = os.getenv("DF_REDIS_URL", "redis://127.0.0.1:6379/0")
-                    app = Celery("df_worker_chain", broker=broker)
-                    app.conf.update(broker_connection_retry_on_startup=True)
-                    app.send_task("jobs.upscale", kwargs={"job_id": str(job_uuid)}, queue="gpu.default")
+                    producer.enqueue("jobs.upscale", kwargs={"job_id": str(job_uuid)}, queue=producer.queue_for(priority))
         except Exception:
             pass
         return {"status": "ok", "artifact_keys": count}
     except Exception as exc:  # noqa: BLE001
+        # Keep records of items that were uploaded before the failure
+        try:
+            artifacts.flush()
+        except Exception:  # noqa: BLE001
+            _log.exception("generate %s: recording uploaded artifacts failed", job_uuid)
         with get_session() as session:
             repos.mark_step_finished(session, step.id, "failed")
             repos.mark_job_status(session, job_uuid, "failed", error={"code": "internal", "message": str(exc)})
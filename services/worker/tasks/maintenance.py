@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import asdict
+from typing import Any
+
+from botocore.exceptions import ClientError
+from celery import shared_task
+
+from modules.persistence import archive, repos
+from modules.persistence.db import get_session
+from modules.storage import renditions
+from modules.storage import s3 as s3mod
+
+_log = logging.getLogger(__name__)
+
+
+@shared_task(name="maintenance.archive_jobs")
+def archive_jobs() -> dict[str, Any]:
+    """Move terminal jobs older than DF_ARCHIVE_AFTER_DAYS to cold storage (beat-scheduled)."""
+    days = archive.archive_after_days()
+    if days <= 0:
+        return {"skipped": "DF_ARCHIVE_AFTER_DAYS not set"}
+    report = archive.run_archive(
+        older_than_days=days,
+        batch_size=int(os.getenv("DF_ARCHIVE_BATCH_SIZE", "100")),
+        max_batches=int(os.getenv("DF_ARCHIVE_MAX_BATCHES", "50")),
+    )
+    out = asdict(report)
+    out.pop("keys")
+    return out
+
+
+@shared_task(name="maintenance.render_preview")
+def render_preview(artifact_id: str) -> dict[str, Any]:
+    """Render and record the preview of an artifact that has none (older artifacts, failed eager renders)."""
+    with get_session() as session:
+        art = repos.get_artifact(session, artifact_id)
+        if art is None:
+            return {"skipped": "artifact not found"}
+        recorded = (art.metadata_json or {}).get("preview_key")
+        if recorded:
+            return {"preview_key": recorded}
+        s3_key = art.s3_key
+    try:
+        key = renditions.ensure_preview(s3mod.from_env(), s3_key)
+    except ClientError as exc:
+        if exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode") != 404:
+            raise
+        _log.warning("artifact %s: object %s missing from storage; no preview", artifact_id, s3_key)
+        return {"skipped": "artifact object missing from storage"}
+    with get_session() as session:
+        repos.set_artifact_preview(session, artifact_id, key)
+    return {"preview_key": key}
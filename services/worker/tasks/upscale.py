@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import io
+import logging
 import os
 import uuid as _uuid
 from typing import Any, Callable
@@ -10,11 +11,14 @@ from PIL import Image
 
 from modules.persistence.db import get_session
 from modules.persistence import repos
-from modules.storage import s3 as s3mod
+from modules.storage import renditions, s3 as s3mod
 from multiprocessing import get_context
+from services.worker.tasks.artifact_buffer import ArtifactBuffer
 from services.worker.upscalers.registry import get_upscaler
 from services.worker.upscalers.base import UpscaleError
 
+_log = logging.getLogger(__name__)
+
 
 def _scale_factor(job_id: _uuid.UUID) -> int:
     with get_session() as session:
@@ -52,6 +56,8 @@ def upscale(*, job_id: str) -> dict[str, Any]:
             impl = step_meta.metadata_json.get("impl")
             strict_scale = bool(step_meta.metadata_json.get("strict_scale", False))
 
+    # Upscaled artifacts + artifact.written events are persisted in bulk on a flush cadence
+    written = ArtifactBuffer(job_id=job_uuid, step_id=up_step.id)
     try:
         with get_session() as session:
             artifacts = repos.list_artifacts_by_job(session, job_uuid)
@@ -97,29 +103,26 @@ def upscale(*, job_id: str) -> dict[str, Any]:
             if "/upscale/" not in key:
                 key = f"dreamforge/default/jobs/{job_id}/upscale/{os.path.basename(a.s3_key)}"
             s3mod.upload_bytes(cfg, key, out_bytes, content_type="image/png")
-
-            with get_session() as session:
-                repos.insert_artifact(
-                    session,
-                    job_id=job_uuid,
-                    step_id=up_step.id,
-                    format=fmt,
-                    width=w2,
-                    height=h2,
-                    seed=a.seed,
-                    item_index=a.item_index,
-                    s3_key=key,
-                    checksum=None,
-                    metadata_json={"scale": scale, "impl": impl or "auto", "strict_scale": strict_scale},
-                )
-                repos.append_event(
-                    session,
-                    job_id=job_uuid,
-                    step_id=up_step.id,
-                    code="artifact.written",
-                    payload={"s3_key": key, "item_index": a.item_index, "scale": scale},
-                )
-
+            preview = renditions.eager_preview(cfg, key, out_bytes)
+
+            written.add(
+                format=fmt,
+                width=w2,
+                height=h2,
+                seed=a.seed,
+                item_index=a.item_index,
+                s3_key=key,
+                checksum=None,
+                metadata_json={
+                    "scale": scale,
+                    "impl": impl or "auto",
+                    "strict_scale": strict_scale,
+                    **({"preview_key": preview} if preview else {}),
+                },
+                event_payload={"s3_key": key, "item_index": a.item_index, "scale": scale},
+            )
+
+        written.flush()
         with get_session() as session:
             repos.mark_step_finished(session, up_step.id, "succeeded")
             repos.mark_job_status(session, job_uuid, "succeeded")
@@ -127,6 +130,11 @@ def upscale(*, job_id: str) -> dict[str, Any]:
             repos.append_event(session, job_id=job_uuid, step_id=None, code="job.finish")
         return {"status": "ok"}
     except Exception as exc:  # noqa: BLE001
+        # Keep records of items that were uploaded before the failure
+        try:
+            written.flush()
+        except Exception:  # noqa: BLE001
+            _log.exception("upscale %s: recording uploaded artifacts failed", job_uuid)
         with get_session() as session:
             if up_step is not None:
                 repos.mark_step_finished(session, up_step.id, "failed")
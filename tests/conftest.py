@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+
+import pytest
+
+from modules.persistence.db import engine, track_queries
+
+
+@pytest.fixture
+def query_budget():
+    """Assert a block issues at most ``max_statements`` SQL statements.
+
+    Usage::
+
+        with query_budget(3, "job detail"):
+            client.get(f"/v1/jobs/{job_id}")
+    """
+
+    # Build the engine (and the SQLite dev schema) outside any budget
+    engine()
+
+    @contextmanager
+    def _budget(max_statements: int, name: str = "block"):
+        with track_queries("test", name, export=False) as stats:
+            yield stats
+        assert stats.count <= max_statements, (
+            f"{name}: {stats.count} statements (budget {max_statements}); slowest: {stats.slowest_sql}"
+        )
+
+    return _budget
@@ -0,0 +1,152 @@
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from modules.persistence import repos
+from modules.persistence.db import get_session
+from modules.queue import producer
+from services.api.app import app
+from services.api.utils import admission
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    monkeypatch.setenv("DF_CELERY_EAGER", "false")
+    monkeypatch.setenv("DF_REDIS_URL", "memory://")
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    monkeypatch.setenv("DF_ADMISSION_CACHE_S", "0")
+    monkeypatch.setenv("DF_ADMISSION_RETRY_MAX_S", "120")
+    producer.reset()
+    admission.reset()
+    yield
+    producer.reset()
+    admission.reset()
+
+
+def _job(prompt: str) -> dict:
+    return {"type": "generate", "prompt": prompt, "width": 64, "height": 64, "steps": 2}
+
+
+def _active() -> int:
+    with get_session() as session:
+        load = repos.get_job_load(session, finished_since=datetime.now(timezone.utc))
+    return load.queued + load.running
+
+
+def _purge_queue() -> None:
+    with producer.producer_app().connection_or_acquire() as conn:
+        try:
+            conn.default_channel.queue_purge(producer.DEFAULT_QUEUE)
+        except Exception:  # noqa: BLE001 - queue not declared yet
+            pass
+
+
+def test_active_job_limit_returns_429_with_retry_after(monkeypatch):
+    client = TestClient(app)
+    # A 1 s window: completions seeded by earlier runs against the dev database fall outside it
+    monkeypatch.setenv("DF_ADMISSION_WINDOW_S", "1")
+    monkeypatch.setenv("DF_ADMISSION_MAX_ACTIVE_JOBS", str(_active() + 2))
+
+    assert client.post("/v1/jobs", json=_job("a")).status_code in (200, 202)
+    key = f"admission-{uuid.uuid4()}"
+    keyed = client.post("/v1/jobs", json=_job("b"), headers={"Idempotency-Key": key})
+    assert keyed.status_code in (200, 202)
+
+    r = client.post("/v1/jobs", json=_job("c"))
+    assert r.status_code == 429
+    assert r.json()["detail"]["code"] == "overloaded"
+    # No completions observed yet: the maximum backoff
+    assert r.headers["Retry-After"] == "120"
+
+    # Replays are still answered while overloaded
+    replay = client.post("/v1/jobs", json=_job("b"), headers={"Idempotency-Key": key})
+    assert replay.status_code in (200, 202) and replay.headers["Idempotent-Replayed"] == "true"
+
+    # Batches are admitted or rejected as a whole
+    before = _active()
+    assert client.post("/v1/jobs:batch", json={"jobs": [_job("d"), _job("e")]}).status_code == 429
+    assert _active() == before
+
+
+def test_retry_after_follows_observed_throughput(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setenv("DF_ADMISSION_WINDOW_S", "300")
+    # 30 completions in the window: 0.1 jobs/s
+    with get_session() as session:
+        for i in range(30):
+            job = repos.create_job_with_step(session, job_type="generate", params={"prompt": f"done {i}"}, idempotency_key=None)
+            repos.mark_job_status(session, job.id, "succeeded")
+    monkeypatch.setenv("DF_ADMISSION_MAX_ACTIVE_JOBS", str(_active()))
+
+    r = client.post("/v1/jobs", json=_job("over"))
+    assert r.status_code == 429
+    # One job over the limit at >= 0.1 jobs/s (earlier tests may add completions)
+    assert 1 <= int(r.headers["Retry-After"]) <= 10
+
+
+def test_queue_depth_limit_per_queue(monkeypatch):
+    client = TestClient(app)
+    _purge_queue()
+    monkeypatch.setenv("DF_ADMISSION_MAX_QUEUE_DEPTH", "1000")
+    monkeypatch.setenv("DF_ADMISSION_QUEUE_LIMITS", f"{producer.DEFAULT_QUEUE}=2,gpu.low=50")
+    assert admission.queue_depth_limit("gpu.low") == 50
+    assert admission.queue_depth_limit("gpu.other") == 1000
+
+    for i in range(2):
+        assert client.post("/v1/jobs", json=_job(f"q{i}")).status_code in (200, 202)
+    assert producer.queue_depth(producer.DEFAULT_QUEUE) == 2
+    r = client.post("/v1/jobs", json=_job("q-over"))
+    assert r.status_code == 429
+    assert r.json()["detail"]["details"]["depth"] == 2
+
+
+def test_limits_off_by_default():
+    assert admission.check(producer.DEFAULT_QUEUE, 10_000).allowed
+
+
+def test_admitted_jobs_count_against_cached_load(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setenv("DF_ADMISSION_CACHE_S", "3600")
+    monkeypatch.setenv("DF_ADMISSION_MAX_ACTIVE_JOBS", str(_active() + 2))
+
+    # The cached count is loaded once; admitted jobs are added to it locally
+    assert client.post("/v1/jobs", json=_job("burst 1")).status_code in (200, 202)
+    assert client.post("/v1/jobs", json=_job("burst 2")).status_code in (200, 202)
+    assert client.post("/v1/jobs", json=_job("burst 3")).status_code == 429
+
+
+def test_admission_runs_outside_the_write_session(monkeypatch):
+    from contextlib import contextmanager
+
+    from services.api.routes import jobs as jobs_routes
+
+    open_sessions = []
+    admitted_inside = []
+
+    @contextmanager
+    def _tracking_session():
+        with get_session() as session:
+            open_sessions.append(session)
+            try:
+                yield session
+            finally:
+                open_sessions.remove(session)
+
+    real_admit = admission.admit
+
+    def _admit(queue: str, n: int = 1) -> None:
+        admitted_inside.append(bool(open_sessions))
+        real_admit(queue, n)
+
+    monkeypatch.setattr(jobs_routes, "get_session", _tracking_session)
+    monkeypatch.setattr(admission, "admit", _admit)
+    client = TestClient(app)
+    key = f"admission-{uuid.uuid4()}"
+    assert client.post("/v1/jobs", json=_job("single"), headers={"Idempotency-Key": key}).status_code in (200, 202)
+    batch = {"jobs": [{**_job("batched"), "idempotency_key": f"admission-{uuid.uuid4()}"}, _job("plain")]}
+    assert client.post("/v1/jobs:batch", json=batch).status_code == 200
+    assert admitted_inside == [False, False]
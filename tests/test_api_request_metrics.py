@@ -0,0 +1,75 @@
+import os
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from modules.persistence import repos
+from modules.persistence.db import get_session
+from services.api.app import app
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+
+
+def _value(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _finished_job() -> str:
+    with get_session() as session:
+        job = repos.create_job_with_step(session, job_type="generate", params={"prompt": "metrics"}, idempotency_key=None)
+        step = repos.get_step_by_name(session, job_id=job.id, name="generate")
+        for i in range(3):
+            repos.append_event(session, job_id=job.id, step_id=step.id, code="test.line", payload={"message": f"line {i}"})
+        repos.mark_job_status(session, job.id, "succeeded")
+        return str(job.id)
+
+
+def test_route_latency_size_and_status():
+    client = TestClient(app)
+    route = "GET /v1/jobs/{job_id}"
+    before_404 = _value("df_api_requests_total", route=route, status="404")
+    before_count = _value("df_api_request_seconds_count", route=route)
+    before_bytes = _value("df_api_response_bytes_sum", route=route)
+
+    r = client.get(f"/v1/jobs/{uuid.uuid4()}")
+    assert r.status_code == 404
+
+    # Labelled by route template, not raw path
+    assert _value("df_api_requests_total", route=route, status="404") == before_404 + 1
+    assert _value("df_api_request_seconds_count", route=route) == before_count + 1
+    assert _value("df_api_response_bytes_sum", route=route) == before_bytes + len(r.content)
+    assert _value("df_api_requests_in_flight") == 0
+
+    body = client.get("/metrics").text
+    assert "df_api_request_seconds_bucket" in body
+    assert "df_api_streams_active" in body
+
+
+def test_stream_gauges_frames_and_polls():
+    client = TestClient(app)
+    job_id = _finished_job()
+    frames = _value("df_api_sse_frames_total", kind="data")
+    sse_polls = _value("df_api_stream_db_polls_total", stream="sse")
+    ndjson_polls = _value("df_api_stream_db_polls_total", stream="ndjson")
+
+    r = client.get(f"/v1/jobs/{job_id}/logs")
+    assert r.status_code == 200 and len(r.text.splitlines()) == 3
+    assert _value("df_api_stream_db_polls_total", stream="ndjson") == ndjson_polls + 1
+
+    r = client.get(f"/v1/jobs/{job_id}/progress/stream")
+    assert r.status_code == 200
+    sent = r.text.count("event: ")
+    assert sent >= 4  # three step events and the progress frame
+    assert _value("df_api_sse_frames_total", kind="data") == frames + sent
+    assert _value("df_api_stream_db_polls_total", stream="sse") >= sse_polls + 1
+
+    # Both streams have closed
+    assert _value("df_api_streams_active", kind="sse") == 0
+    assert _value("df_api_streams_active", kind="ndjson") == 0
+    assert _value("df_api_requests_total", route="GET /v1/jobs/{job_id}/progress/stream", status="200") >= 1
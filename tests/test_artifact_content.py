@@ -0,0 +1,128 @@
+import io
+import os
+import re
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+
+import modules.storage.s3 as s3mod
+from modules.persistence import repos
+from modules.persistence.db import get_session
+from services.api.app import app
+
+_DATA = bytes(range(256)) * 4096  # 1 MiB
+_ETAG = '"abc123"'
+
+
+class _Body(io.BytesIO):
+    reads: list[int] = []
+
+    def read(self, n: int = -1) -> bytes:  # type: ignore[override]
+        _Body.reads.append(n)
+        return super().read(n)
+
+
+def _error(status: int, code: str, **extra: str) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": code, **extra}, "ResponseMetadata": {"HTTPStatusCode": status, "HTTPHeaders": {"etag": _ETAG}}},
+        "GetObject",
+    )
+
+
+class _FakeS3:
+    def __init__(self) -> None:
+        self.objects = {"jobs/x/art.png": _DATA}
+
+    def get_object(self, Bucket: str, Key: str, Range: str | None = None, IfNoneMatch: str | None = None):  # noqa: N803
+        data = self.objects.get(Key)
+        if data is None:
+            raise _error(404, "NoSuchKey")
+        if IfNoneMatch == _ETAG:
+            raise _error(304, "304")
+        out = {"ETag": _ETAG, "LastModified": datetime(2026, 1, 1, tzinfo=timezone.utc), "ContentType": "image/png"}
+        if Range:
+            m = re.fullmatch(r"bytes=(\d*)-(\d*)", Range)
+            assert m
+            start, end = m.group(1), m.group(2)
+            if start == "":
+                first, last = len(data) - int(end), len(data) - 1
+            else:
+                first, last = int(start), min(int(end) if end else len(data) - 1, len(data) - 1)
+            if first >= len(data):
+                raise _error(416, "InvalidRange", ActualObjectSize=str(len(data)))
+            out["ContentRange"] = f"bytes {first}-{last}/{len(data)}"
+            data = data[first : last + 1]
+        out["ContentLength"] = len(data)
+        out["Body"] = _Body(data)
+        return out
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    monkeypatch.setenv("DF_MINIO_ENDPOINT", "http://example.invalid")
+    monkeypatch.setenv("DF_MINIO_ACCESS_KEY", "x")
+    monkeypatch.setenv("DF_MINIO_SECRET_KEY", "y")
+    monkeypatch.setenv("DF_MINIO_BUCKET", "dreamforge")
+    monkeypatch.setenv("DF_ARTIFACT_CHUNK_BYTES", str(64 * 1024))
+    fake = _FakeS3()
+    monkeypatch.setattr(s3mod, "client", lambda cfg: fake)
+    _Body.reads = []
+
+
+def _artifact(key: str = "jobs/x/art.png") -> str:
+    with get_session() as session:
+        job = repos.create_job_with_step(session, job_type="generate", params={"prompt": "content"}, idempotency_key=None)
+        step = repos.get_step_by_name(session, job_id=job.id, name="generate")
+        art = repos.insert_artifact(
+            session, job_id=job.id, step_id=step.id, format="png", width=64, height=64, seed=1, item_index=0, s3_key=key, checksum=None
+        )
+        return str(art.id)
+
+
+def test_full_download_streams_in_chunks():
+    client = TestClient(app)
+    r = client.get(f"/v1/artifacts/{_artifact()}/content")
+    assert r.status_code == 200
+    assert r.content == _DATA
+    assert r.headers["content-type"] == "image/png"
+    assert r.headers["content-length"] == str(len(_DATA))
+    assert r.headers["etag"] == _ETAG
+    assert "immutable" in r.headers["cache-control"]
+    assert r.headers["accept-ranges"] == "bytes"
+    # Relayed chunk by chunk, never read whole
+    assert _Body.reads and all(n == 64 * 1024 for n in _Body.reads)
+
+
+def test_range_requests():
+    client = TestClient(app)
+    art_id = _artifact()
+    r = client.get(f"/v1/artifacts/{art_id}/content", headers={"Range": "bytes=100-199"})
+    assert r.status_code == 206
+    assert r.content == _DATA[100:200]
+    assert r.headers["content-range"] == f"bytes 100-199/{len(_DATA)}"
+    assert r.headers["content-length"] == "100"
+
+    r = client.get(f"/v1/artifacts/{art_id}/content", headers={"Range": "bytes=-10"})
+    assert r.status_code == 206 and r.content == _DATA[-10:]
+
+    r = client.get(f"/v1/artifacts/{art_id}/content", headers={"Range": f"bytes={len(_DATA)}-"})
+    assert r.status_code == 416
+    assert r.json()["detail"]["code"] == "range_not_satisfiable"
+    assert r.headers["content-range"] == f"bytes */{len(_DATA)}"
+
+
+def test_not_modified_and_missing():
+    client = TestClient(app)
+    r = client.get(f"/v1/artifacts/{_artifact()}/content", headers={"If-None-Match": _ETAG})
+    assert r.status_code == 304
+    assert r.headers["etag"] == _ETAG and r.content == b""
+
+    assert client.get(f"/v1/artifacts/{uuid.uuid4()}/content").status_code == 404
+    r = client.get(f"/v1/artifacts/{_artifact('jobs/x/gone.png')}/content")
+    assert r.status_code == 404
+    assert r.json()["detail"]["code"] == "not_found"
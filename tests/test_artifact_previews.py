@@ -0,0 +1,158 @@
+import io
+import os
+import uuid
+from pathlib import Path
+
+import pytest
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import modules.storage.s3 as s3mod
+from modules.persistence import repos
+from modules.persistence.db import get_session
+from modules.queue import producer
+from modules.storage import renditions
+from services.api.app import app
+
+
+def _png(width: int, height: int) -> bytes:
+    out = io.BytesIO()
+    Image.linear_gradient("L").resize((width, height)).convert("RGB").save(out, format="PNG")
+    return out.getvalue()
+
+
+@pytest.fixture()
+def store(monkeypatch, tmp_path):
+    monkeypatch.setenv("DF_CELERY_EAGER", "true")
+    monkeypatch.setenv("DF_FAKE_RUNNER", "1")
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    monkeypatch.setenv("DF_MINIO_ENDPOINT", "http://example.invalid")
+    monkeypatch.setenv("DF_MINIO_ACCESS_KEY", "x")
+    monkeypatch.setenv("DF_MINIO_SECRET_KEY", "y")
+    monkeypatch.setenv("DF_MINIO_BUCKET", "dreamforge")
+    root = tmp_path / "s3"
+    uploads: list[str] = []
+
+    def _upload_bytes(cfg, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:  # noqa: ARG001
+        uploads.append(key)
+        p = root / Path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(data)
+
+    def _download_bytes(cfg, key: str) -> bytes:  # noqa: ARG001
+        return (root / Path(key)).read_bytes()
+
+    class _Client:
+        def head_object(self, Bucket: str, Key: str) -> dict:  # noqa: N803
+            if not (root / Path(Key)).exists():
+                raise ClientError({"Error": {"Code": "404"}, "ResponseMetadata": {"HTTPStatusCode": 404}}, "HeadObject")
+            return {}
+
+    monkeypatch.setattr(s3mod, "upload_bytes", _upload_bytes)
+    monkeypatch.setattr(s3mod, "download_bytes", _download_bytes)
+    monkeypatch.setattr(s3mod, "client", lambda cfg: _Client())
+    monkeypatch.setattr(s3mod, "presign_get", lambda cfg, key, expires=None: f"http://signed.local/{key}")
+    return root, uploads
+
+
+def test_render_fits_box_and_derives_key():
+    data = renditions.render(_png(1024, 768), size=256, fmt="webp")
+    img = Image.open(io.BytesIO(data))
+    assert img.format == "WEBP" and img.size == (256, 192)
+    assert len(data) < len(_png(1024, 768)) / 5
+    jpeg = Image.open(io.BytesIO(renditions.render(_png(300, 600), size=128, fmt="jpeg")))
+    assert jpeg.format == "JPEG" and jpeg.size == (64, 128)
+
+    assert renditions.preview_key("jobs/a/x_1.png", 512, "webp") == "jobs/a/x_1.preview-512.webp"
+    assert renditions.preview_key("jobs/a.b/x", 256, "jpeg") == "jobs/a.b/x.preview-256.jpg"
+
+
+def test_worker_renders_preview_eagerly(store):
+    root, _ = store
+    client = TestClient(app)
+    r = client.post("/v1/jobs", json={"type": "generate", "prompt": "preview", "width": 64, "height": 64, "steps": 2})
+    job_id = r.json()["job"]["id"]
+
+    art = client.get(f"/v1/jobs/{job_id}/artifacts").json()["artifacts"][0]
+    key = renditions.preview_key(art["s3_key"])
+    assert art["preview_url"] == f"http://signed.local/{key}"
+    assert Image.open(root / key).format == "WEBP"
+
+
+def _legacy_artifact(src: str) -> tuple[str, str]:
+    """An artifact recorded without a preview, as written before previews existed."""
+    s3mod.upload_bytes(None, src, _png(2048, 2048))
+    with get_session() as session:
+        job = repos.create_job_with_step(session, job_type="generate", params={"prompt": "legacy"}, idempotency_key=None)
+        step = repos.get_step_by_name(session, job_id=job.id, name="generate")
+        art = repos.insert_artifact(
+            session, job_id=job.id, step_id=step.id, format="png", width=2048, height=2048, seed=1, item_index=0, s3_key=src, checksum=None
+        )
+        return str(job.id), str(art.id)
+
+
+def test_preview_rendered_on_first_request(store, monkeypatch):
+    root, uploads = store
+    monkeypatch.setenv("DF_PREVIEW_SIZE", "128")
+    src = f"dreamforge/default/jobs/{uuid.uuid4()}/generate/big.png"
+    job_id, art_id = _legacy_artifact(src)
+
+    client = TestClient(app)
+    first = client.get(f"/v1/jobs/{job_id}/artifacts")
+    listed = first.json()["artifacts"][0]
+    assert listed["preview_url"] == f"/v1/artifacts/{art_id}/preview"
+
+    # DF_CELERY_EAGER: the worker task runs in-process
+    r = client.get(listed["preview_url"], follow_redirects=False)
+    key = renditions.preview_key(src)
+    assert r.status_code == 302
+    assert r.headers["location"] == f"http://signed.local/{key}"
+    assert Image.open(root / key).size == (128, 128)
+
+    # Recorded on the artifact: later listings sign it directly, nothing is re-rendered
+    before = len(uploads)
+    assert client.get(f"/v1/artifacts/{art_id}/preview", follow_redirects=False).status_code == 302
+    assert len(uploads) == before
+    relisted = client.get(f"/v1/jobs/{job_id}/artifacts", headers={"If-None-Match": first.headers["ETag"]})
+    assert relisted.status_code == 200
+    assert relisted.json()["artifacts"][0]["preview_url"] == f"http://signed.local/{key}"
+
+
+def test_preview_is_rendered_by_a_worker_not_the_api(store, monkeypatch):
+    root, _ = store
+    monkeypatch.setenv("DF_CELERY_EAGER", "false")
+    monkeypatch.setenv("DF_REDIS_URL", "memory://")
+    producer.reset()
+    src = f"dreamforge/default/jobs/{uuid.uuid4()}/generate/big.png"
+    job_id, art_id = _legacy_artifact(src)
+    api_side = {"on": True}
+    real_render = renditions.render
+
+    def _render(*args, **kwargs):
+        assert not api_side["on"], "the API rendered a preview"
+        return real_render(*args, **kwargs)
+
+    monkeypatch.setattr(renditions, "render", _render)
+
+    client = TestClient(app)
+    low = producer.queue_for("low")
+    before = producer.queue_depth(low) or 0
+    r = client.get(f"/v1/artifacts/{art_id}/preview", follow_redirects=False)
+    assert r.status_code == 202
+    assert r.json()["code"] == "preview_pending" and r.headers["Retry-After"] == "2"
+    # Polling does not enqueue the render again
+    assert client.get(f"/v1/artifacts/{art_id}/preview", follow_redirects=False).status_code == 202
+    assert producer.queue_depth(low) == before + 1
+
+    from services.worker.tasks.maintenance import render_preview
+
+    api_side["on"] = False
+
+    key = render_preview(art_id)["preview_key"]
+    assert key == renditions.preview_key(src)
+    r = client.get(f"/v1/artifacts/{art_id}/preview", follow_redirects=False)
+    assert r.status_code == 302 and r.headers["location"] == f"http://signed.local/{key}"
+    assert (root / key).exists()
+    producer.reset()
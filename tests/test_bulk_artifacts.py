@@ -0,0 +1,60 @@
+from sqlalchemy import event
+
+from modules.persistence import repos
+from modules.persistence.db import engine, get_session
+from services.worker.tasks.artifact_buffer import ArtifactBuffer
+
+
+def _job_and_step():
+    with get_session() as session:
+        job = repos.create_job_with_step(session, job_type="generate", params={"prompt": "b"}, idempotency_key=None)
+        step = repos.get_step_by_name(session, job_id=job.id, name="generate")
+    return job, step
+
+
+def _item(i: int) -> dict:
+    return {"format": "png", "width": 8, "height": 8, "seed": i, "item_index": i, "s3_key": f"bulk/{i}.png"}
+
+
+def test_bulk_insert_uses_one_statement_per_table():
+    job, step = _job_and_step()
+    statements = []
+    listener = lambda *a, **k: statements.append(a[2])  # noqa: E731
+    event.listen(engine(), "before_cursor_execute", listener)
+    try:
+        with get_session() as session:
+            n = repos.insert_artifacts_bulk(session, job_id=job.id, step_id=step.id, artifacts=[_item(i) for i in range(25)])
+    finally:
+        event.remove(engine(), "before_cursor_execute", listener)
+    assert n == 25
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 2
+
+    with get_session() as session:
+        arts = repos.list_artifacts_by_job(session, job.id)
+        evts = [e for e in repos.iter_events(session, job.id) if e.code == "artifact.written"]
+    assert [a.item_index for a in arts] == list(range(25))
+    assert sorted(e.payload_json["item_index"] for e in evts) == list(range(25))
+
+
+def test_buffer_flushes_on_item_cadence():
+    job, step = _job_and_step()
+    buf = ArtifactBuffer(job_id=job.id, step_id=step.id, flush_every=3, flush_s=3600)
+    buf.add(**_item(0))
+    buf.add(**_item(1))
+    with get_session() as session:
+        assert repos.list_artifacts_by_job(session, job.id) == []
+    buf.add(**_item(2))
+    buf.add(**_item(3))
+    with get_session() as session:
+        assert len(repos.list_artifacts_by_job(session, job.id)) == 3
+    buf.flush()
+    assert buf.written == 4
+
+
+def test_buffer_flushes_on_time_cadence():
+    job, step = _job_and_step()
+    buf = ArtifactBuffer(job_id=job.id, step_id=step.id, flush_every=100, flush_s=0)
+    buf.add(**_item(0))
+    with get_session() as session:
+        assert len(repos.list_artifacts_by_job(session, job.id)) == 1
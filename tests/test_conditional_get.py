@@ -0,0 +1,103 @@
+import os
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from modules.persistence import repos
+from modules.persistence.db import get_session
+from services.api.app import app
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch, tmp_path):
+    monkeypatch.setenv("DF_CELERY_EAGER", "true")
+    monkeypatch.setenv("DF_FAKE_RUNNER", "1")
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    monkeypatch.setenv("DF_MINIO_ENDPOINT", "http://example.invalid")
+    monkeypatch.setenv("DF_MINIO_ACCESS_KEY", "x")
+    monkeypatch.setenv("DF_MINIO_SECRET_KEY", "y")
+    monkeypatch.setenv("DF_MINIO_BUCKET", "dreamforge")
+
+    import modules.storage.s3 as s3mod
+
+    outdir = tmp_path / "s3"
+
+    def _upload_bytes(cfg, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:  # noqa: ARG001
+        p = outdir / Path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(data)
+
+    def _presign_get(cfg, key: str, expires=None):  # noqa: ARG001
+        return f"http://signed.local/{key}"
+
+    monkeypatch.setattr(s3mod, "upload_bytes", _upload_bytes)
+    monkeypatch.setattr(s3mod, "presign_get", _presign_get)
+
+
+def _create(client: TestClient) -> str:
+    r = client.post("/v1/jobs", json={"type": "generate", "prompt": "etag", "width": 64, "height": 64, "steps": 2, "count": 2})
+    assert r.status_code in (200, 202)
+    return r.json()["job"]["id"]
+
+
+@pytest.mark.parametrize("path", ["", "/artifacts", "/progress"])
+def test_if_none_match_returns_304_from_version_query(path, query_budget):
+    client = TestClient(app)
+    job_id = _create(client)
+    url = f"/v1/jobs/{job_id}{path}"
+
+    r1 = client.get(url)
+    assert r1.status_code == 200
+    etag = r1.headers["ETag"]
+    assert etag.startswith('"') and r1.headers["Cache-Control"] == "no-cache"
+
+    with query_budget(1, f"conditional GET {path or '/'}"):
+        r2 = client.get(url, headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.content == b""
+    assert r2.headers["ETag"] == etag
+
+    # List and weak forms match too; another tag does not
+    assert client.get(url, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_etag_changes_with_job_state():
+    client = TestClient(app)
+    job_id = _create(client)
+    tags = {p: client.get(f"/v1/jobs/{job_id}{p}").headers["ETag"] for p in ("", "/artifacts", "/progress")}
+    assert len(set(tags.values())) == 3  # one tag per representation
+
+    with get_session() as session:
+        step = repos.get_step_by_name(session, job_id=job_id, name="generate")
+        repos.append_event(session, job_id=job_id, step_id=step.id, code="test.tick", payload={})
+        repos.mark_job_status(session, job_id, "failed", error={"code": "test", "message": "x"})
+
+    r = client.get(f"/v1/jobs/{job_id}", headers={"If-None-Match": tags[""]})
+    assert r.status_code == 200 and r.json()["status"] == "failed"
+    assert r.headers["ETag"] != tags[""]
+    assert client.get(f"/v1/jobs/{job_id}/progress", headers={"If-None-Match": tags["/progress"]}).status_code == 200
+
+
+def test_log_events_keep_job_status_etag():
+    client = TestClient(app)
+    job_id = _create(client)
+    job_tag = client.get(f"/v1/jobs/{job_id}").headers["ETag"]
+    progress_tag = client.get(f"/v1/jobs/{job_id}/progress").headers["ETag"]
+
+    with get_session() as session:
+        step = repos.get_step_by_name(session, job_id=job_id, name="generate")
+        repos.append_event(session, job_id=job_id, step_id=step.id, code="log", payload={"message": "tick"})
+
+    # The status body renders no events: still 304. Progress is built from events
+    assert client.get(f"/v1/jobs/{job_id}", headers={"If-None-Match": job_tag}).status_code == 304
+    assert client.get(f"/v1/jobs/{job_id}/progress", headers={"If-None-Match": progress_tag}).status_code == 200
+
+
+def test_unknown_job_is_still_404():
+    client = TestClient(app)
+    missing = "00000000-0000-0000-0000-000000000000"
+    assert client.get(f"/v1/jobs/{missing}", headers={"If-None-Match": "*"}).status_code == 404
+    assert client.get(f"/v1/jobs/{missing}/progress", headers={"If-None-Match": "*"}).status_code == 404
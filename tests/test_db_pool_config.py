@@ -0,0 +1,61 @@
+import httpx
+import pytest
+
+from modules.persistence import db
+
+PG_URL = "postgresql+psycopg://u:p@localhost:5432/df"
+
+
+def test_role_defaults_applied(monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in ("DF_DB_POOL_SIZE", "DF_DB_API_POOL_SIZE", "DF_DB_STATEMENT_TIMEOUT_MS"):
+        monkeypatch.delenv(name, raising=False)
+    api = db._engine_options(PG_URL, "api")
+    worker = db._engine_options(PG_URL, "worker")
+    assert api["pool_size"] == 20 and api["max_overflow"] == 20
+    assert api["pool_pre_ping"] is True
+    assert api["connect_args"]["options"] == "-c statement_timeout=15000"
+    assert api["connect_args"]["prepare_threshold"] == 5
+    assert worker["pool_size"] == 4
+    assert "options" not in worker["connect_args"]
+
+
+def test_role_specific_env_wins_over_generic(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DF_DB_POOL_SIZE", "7")
+    monkeypatch.setenv("DF_DB_API_POOL_SIZE", "33")
+    monkeypatch.setenv("DF_DB_POOL_PRE_PING", "false")
+    monkeypatch.setenv("DF_DB_PREPARE_THRESHOLD", "-1")
+    assert db._engine_options(PG_URL, "api")["pool_size"] == 33
+    opts = db._engine_options(PG_URL, "worker")
+    assert opts["pool_size"] == 7
+    assert opts["pool_pre_ping"] is False
+    assert opts["connect_args"]["prepare_threshold"] is None
+
+
+def test_sqlite_skips_pool_sizing() -> None:
+    opts = db._engine_options("sqlite+pysqlite:///db/dev.sqlite3", "api")
+    assert "pool_size" not in opts and opts["query_cache_size"] == 500
+
+
+def test_engine_pool_sized_per_role(monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in ("DF_DB_POOL_SIZE", "DF_DB_MAX_OVERFLOW", "DF_DB_API_POOL_SIZE", "DF_DB_WORKER_MAX_OVERFLOW"):
+        monkeypatch.delenv(name, raising=False)
+    api = db.build_engine(PG_URL, "api")
+    worker = db.build_engine(PG_URL, "worker")
+    assert (api.pool.size(), api.pool._max_overflow) == (20, 20)
+    assert (worker.pool.size(), worker.pool._max_overflow) == (4, 4)
+
+    # Overrides are read when the engine is built, not when the module is imported
+    monkeypatch.setenv("DF_DB_WORKER_MAX_OVERFLOW", "1")
+    worker = db.build_engine(PG_URL, "worker")
+    assert (worker.pool.size(), worker.pool._max_overflow) == (4, 1)
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_exported() -> None:
+    from services.api.app import app
+
+    db.build_engine(PG_URL, "api")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        body = (await client.get("/metrics")).text
+    assert 'df_db_pool_checked_out{role="api"} 0.0' in body
+    assert 'df_db_pool_utilization{role="api"} 0.0' in body
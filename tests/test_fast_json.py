@@ -0,0 +1,46 @@
+import datetime as dt
+import importlib
+import json
+import uuid
+
+import pytest
+
+from services.api.utils import fastjson
+from services.api.utils.streaming import ndjson_line, sse_event
+
+_UID = uuid.UUID("12345678-1234-5678-1234-567812345678")
+_SAMPLES = [
+    {"ts": dt.datetime(2026, 1, 2, 3, 4, 5), "id": _UID},
+    {"ts": dt.datetime(2026, 1, 2, 3, 4, 5, 120000, tzinfo=dt.timezone.utc), "n": [1, 2.5, None, True]},
+    {"message": "café ☕", "nested": {"k": "v"}},
+    {"ts": dt.datetime(2026, 1, 2, 5, 4, 5, tzinfo=dt.timezone(dt.timedelta(hours=2))), "d": dt.date(2026, 1, 2)},
+]
+
+
+@pytest.mark.parametrize("obj", _SAMPLES)
+def test_backends_agree(obj):
+    assert fastjson.dumps(obj) == fastjson._stdlib_dumps(obj)
+
+
+def test_datetimes_render_as_utc_z_and_uuids_as_strings():
+    out = json.loads(fastjson.dumps(_SAMPLES[0]))
+    assert out == {"ts": "2026-01-02T03:04:05Z", "id": "12345678-1234-5678-1234-567812345678"}
+    assert json.loads(fastjson.dumps(_SAMPLES[1]))["ts"] == "2026-01-02T03:04:05.120000Z"
+    # Other offsets are converted, not passed through
+    assert json.loads(fastjson.dumps(_SAMPLES[3]))["ts"] == "2026-01-02T03:04:05Z"
+
+
+def test_stream_framing():
+    assert ndjson_line({"a": 1}) == b'{"a":1}\n'
+    assert sse_event("progress", {"p": 0.5}) == b'event: progress\ndata: {"p":0.5}\n\n'
+
+
+def test_stdlib_backend_can_be_forced(monkeypatch):
+    monkeypatch.setenv("DF_JSON_BACKEND", "stdlib")
+    mod = importlib.reload(fastjson)
+    try:
+        assert mod.BACKEND == "stdlib"
+        assert mod.dumps(_SAMPLES[0]) == b'{"ts":"2026-01-02T03:04:05Z","id":"12345678-1234-5678-1234-567812345678"}'
+    finally:
+        monkeypatch.delenv("DF_JSON_BACKEND")
+        importlib.reload(fastjson)
@@ -0,0 +1,88 @@
+import os
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import String, cast, update
+
+from modules.persistence import repos
+from modules.persistence.db import get_session
+from modules.persistence.models import Job
+from services.api.app import app
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch, tmp_path):
+    monkeypatch.setenv("DF_CELERY_EAGER", "true")
+    monkeypatch.setenv("DF_FAKE_RUNNER", "1")
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    monkeypatch.setenv("DF_MINIO_ENDPOINT", "http://example.invalid")
+    monkeypatch.setenv("DF_MINIO_ACCESS_KEY", "x")
+    monkeypatch.setenv("DF_MINIO_SECRET_KEY", "y")
+    monkeypatch.setenv("DF_MINIO_BUCKET", "dreamforge")
+
+    import modules.storage.s3 as s3mod
+
+    outdir = tmp_path / "s3"
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    def _upload_bytes(cfg, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:  # noqa: ARG001
+        p = outdir / Path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(data)
+
+    monkeypatch.setattr(s3mod, "upload_bytes", _upload_bytes)
+
+
+PAYLOAD = {"type": "generate", "prompt": "idem", "width": 64, "height": 64, "steps": 2}
+
+
+def test_retry_with_same_key_returns_existing_job():
+    client = TestClient(app)
+    key = f"idem-{uuid.uuid4()}"
+    r1 = client.post("/v1/jobs", json=PAYLOAD, headers={"Idempotency-Key": key})
+    assert r1.status_code == 200
+    r2 = client.post("/v1/jobs", json=PAYLOAD, headers={"Idempotency-Key": key})
+    assert r2.status_code == 200
+    assert r2.json()["job"]["id"] == r1.json()["job"]["id"]
+    assert r2.headers.get("Idempotent-Replayed") == "true"
+    # Replay reports the current state of the original job (already ran eagerly)
+    assert r2.json()["job"]["status"] == "succeeded"
+
+
+def test_same_key_with_different_params_is_conflict():
+    client = TestClient(app)
+    key = f"idem-{uuid.uuid4()}"
+    assert client.post("/v1/jobs", json=PAYLOAD, headers={"Idempotency-Key": key}).status_code == 200
+    r = client.post("/v1/jobs", json={**PAYLOAD, "prompt": "other"}, headers={"Idempotency-Key": key})
+    assert r.status_code == 409
+    assert r.json()["detail"]["code"] == "idempotency_conflict"
+
+
+def test_insert_on_conflict_raises_with_owner():
+    key = f"idem-{uuid.uuid4()}"
+    with get_session() as session:
+        first = repos.create_job_with_step(session, job_type="generate", params={"prompt": "a"}, idempotency_key=key)
+    with get_session() as session:
+        with pytest.raises(repos.IdempotencyConflict) as exc:
+            repos.create_job_with_step(session, job_type="generate", params={"prompt": "a"}, idempotency_key=key)
+    assert str(exc.value.job.id) == str(first.id)
+
+
+def test_expired_key_is_released():
+    key = f"idem-{uuid.uuid4()}"
+    with get_session() as session:
+        old = repos.create_job_with_step(session, job_type="generate", params={"prompt": "a"}, idempotency_key=key)
+        session.execute(
+            update(Job)
+            .where(cast(Job.id, String) == str(old.id))
+            .values(created_at=old.created_at - timedelta(hours=2))
+        )
+    with get_session() as session:
+        assert repos.find_job_by_idempotency_key(session, key, ttl_s=3600) is None
+    with get_session() as session:
+        new = repos.create_job_with_step(session, job_type="generate", params={"prompt": "a"}, idempotency_key=key)
+    assert str(new.id) != str(old.id)
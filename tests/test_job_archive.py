@@ -0,0 +1,127 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from modules.persistence import archive, repos
+from modules.persistence.db import get_session
+from modules.persistence.models import ArchivedJob, Event, Job
+from services.api.app import app
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch, tmp_path):
+    monkeypatch.setenv("DF_CELERY_EAGER", "true")
+    monkeypatch.setenv("DF_FAKE_RUNNER", "1")
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    monkeypatch.setenv("DF_MINIO_ENDPOINT", "http://example.invalid")
+    monkeypatch.setenv("DF_MINIO_ACCESS_KEY", "x")
+    monkeypatch.setenv("DF_MINIO_SECRET_KEY", "y")
+    monkeypatch.setenv("DF_MINIO_BUCKET", "dreamforge")
+
+    import modules.storage.s3 as s3mod
+
+    outdir = tmp_path / "s3"
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    def _upload_bytes(cfg, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:  # noqa: ARG001
+        p = outdir / Path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(data)
+
+    def _download_bytes(cfg, key: str) -> bytes:  # noqa: ARG001
+        return (outdir / Path(key)).read_bytes()
+
+    monkeypatch.setattr(s3mod, "upload_bytes", _upload_bytes)
+    monkeypatch.setattr(s3mod, "download_bytes", _download_bytes)
+    return outdir
+
+
+def _age(job_id: str, days: int) -> None:
+    with get_session() as session:
+        session.execute(
+            update(Job).where(Job.id == repos._uuid.UUID(job_id)).values(updated_at=datetime.now(timezone.utc) - timedelta(days=days))
+        )
+
+
+def test_archive_moves_old_terminal_jobs_and_get_falls_back(_env):
+    client = TestClient(app)
+    r = client.post("/v1/jobs", json={"type": "generate", "prompt": "archive me", "width": 64, "height": 64, "steps": 2, "count": 2})
+    job_id = r.json()["job"]["id"]
+    live = client.get(f"/v1/jobs/{job_id}").json()
+    assert live["status"] == "succeeded"
+    _age(job_id, 40)
+
+    report = archive.run_archive(older_than_days=30, batch_size=1)
+    assert report.archived >= 1
+    key = next(k for k in report.keys if job_id in k)
+    assert key.startswith("archive/jobs/") and key.endswith(".ndjson.gz")
+    assert (_env / key).exists()
+
+    with get_session() as session:
+        assert session.get(Job, repos._uuid.UUID(job_id)) is None
+        assert session.scalars(select(Event).where(Event.job_id == repos._uuid.UUID(job_id))).first() is None
+        assert session.get(ArchivedJob, repos._uuid.UUID(job_id)) is not None
+
+    archived = client.get(f"/v1/jobs/{job_id}")
+    assert archived.status_code == 200
+    # Timestamps come back UTC-aware (SQLite returns naive values for the live row)
+    strip = lambda d: {k: v for k, v in d.items() if k not in {"created_at", "updated_at"}}  # noqa: E731
+    assert strip(archived.json()) == strip(live)
+    assert archived.json()["summary"] == {"count": 2, "completed": 2}
+
+    doc = archive.load_archived_job(job_id)
+    assert len(doc.artifacts) == 2
+    assert any(e["code"] == "artifact.written" for e in doc.events)
+
+
+def test_recent_and_active_jobs_are_kept():
+    client = TestClient(app)
+    r = client.post("/v1/jobs", json={"type": "generate", "prompt": "keep me", "width": 64, "height": 64, "steps": 2})
+    job_id = r.json()["job"]["id"]
+    with get_session() as session:
+        queued = repos.create_job_with_step(session, job_type="generate", params={"prompt": "q"}, idempotency_key=None)
+        queued_id = str(queued.id)
+    _age(queued_id, 90)
+
+    report = archive.run_archive(older_than_days=30)
+    assert all(job_id not in k and queued_id not in k for k in report.keys)
+    assert client.get(f"/v1/jobs/{job_id}").status_code == 200
+    assert client.get(f"/v1/jobs/{queued_id}").status_code == 200
+
+
+def test_dry_run_writes_nothing(_env):
+    client = TestClient(app)
+    r = client.post("/v1/jobs", json={"type": "generate", "prompt": "dry", "width": 64, "height": 64, "steps": 2})
+    job_id = r.json()["job"]["id"]
+    _age(job_id, 400)
+
+    report = archive.run_archive(older_than_days=365, dry_run=True)
+    assert any(job_id in k for k in report.keys)
+    assert report.archived == 0
+    assert not any(job_id in str(p) for p in _env.rglob("*.ndjson.gz"))
+    assert client.get(f"/v1/jobs/{job_id}").status_code == 200
+
+
+def test_documents_without_newer_columns_get_their_defaults(_env):
+    client = TestClient(app)
+    r = client.post("/v1/jobs", json={"type": "generate", "prompt": "old doc", "width": 64, "height": 64, "steps": 2})
+    job_id = r.json()["job"]["id"]
+    _age(job_id, 40)
+    report = archive.run_archive(older_than_days=30)
+    key = next(k for k in report.keys if job_id in k)
+
+    # Rewrite the document as it was archived before jobs.priority existed
+    lines = [json.loads(line) for line in gzip.decompress((_env / key).read_bytes()).decode("utf-8").splitlines()]
+    lines[0]["row"].pop("priority")
+    (_env / key).write_bytes(gzip.compress("\n".join(json.dumps(rec) for rec in lines).encode("utf-8")))
+
+    archived = client.get(f"/v1/jobs/{job_id}")
+    assert archived.status_code == 200
+    assert archived.json()["priority"] == "normal"
@@ -0,0 +1,42 @@
+from sqlalchemy import event
+
+from modules.persistence import repos
+from modules.persistence.db import engine, get_session
+
+
+def _seed_chain_job(n_generate: int, n_upscale: int):
+    with get_session() as session:
+        job = repos.create_job_with_chain(
+            session, job_type="generate", params={"prompt": "d", "count": n_generate}, idempotency_key=None
+        )
+        for name, n in (("generate", n_generate), ("upscale", n_upscale)):
+            step = repos.get_step_by_name(session, job_id=job.id, name=name)
+            for i in range(n):
+                repos.insert_artifact(
+                    session, job_id=job.id, step_id=step.id, format="png", width=8, height=8,
+                    seed=i, item_index=i, s3_key=f"k/{job.id}/{name}/{i}.png", checksum=None,
+                )
+        return job.id
+
+
+def test_job_detail_single_statement_with_step_counts():
+    job_id = _seed_chain_job(3, 1)
+    statements = []
+    listener = lambda *a, **k: statements.append(a[2])  # noqa: E731
+    event.listen(engine(), "before_cursor_execute", listener)
+    try:
+        with get_session() as session:
+            detail = repos.get_job_detail(session, job_id)
+    finally:
+        event.remove(engine(), "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    assert detail is not None
+    assert str(detail.job.id) == str(job_id)
+    assert [(s.name, s.artifact_count) for s in detail.steps] == [("generate", 3), ("upscale", 1)]
+    assert detail.artifact_count == 4
+
+
+def test_job_detail_missing_job():
+    with get_session() as session:
+        assert repos.get_job_detail(session, "00000000-0000-0000-0000-000000000000") is None
@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from modules.persistence import repos
+from modules.persistence.db import get_session
+from modules.queue import producer
+from services.api.app import app
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    # Queued jobs stay queued: publishes go to an in-memory broker nobody consumes
+    monkeypatch.setenv("DF_CELERY_EAGER", "false")
+    monkeypatch.setenv("DF_REDIS_URL", "memory://")
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    # Only the change signal can wake a waiter quickly; the safety-net poll is far away
+    monkeypatch.setenv("DF_SSE_POLL_MS", "20000")
+    producer.reset()
+    yield
+    producer.reset()
+
+
+def _queued_job(client: TestClient) -> str:
+    r = client.post("/v1/jobs", json={"type": "generate", "prompt": "wait", "width": 64, "height": 64, "steps": 2})
+    assert r.status_code in (200, 202)
+    return r.json()["job"]["id"]
+
+
+def _set_status_later(job_id: str, status: str, delay: float = 0.3) -> threading.Thread:
+    def _run() -> None:
+        time.sleep(delay)
+        with get_session() as session:
+            repos.mark_job_status(session, job_id, status)
+
+    t = threading.Thread(target=_run)
+    t.start()
+    return t
+
+
+def test_wait_until_terminal_wakes_on_job_signal():
+    client = TestClient(app)
+    job_id = _queued_job(client)
+    t = _set_status_later(job_id, "succeeded")
+    t0 = time.monotonic()
+    r = client.get(f"/v1/jobs/{job_id}", params={"wait": "10s", "until": "terminal"})
+    elapsed = time.monotonic() - t0
+    t.join()
+    assert r.status_code == 200 and r.json()["status"] == "succeeded"
+    assert 0.2 < elapsed < 5
+
+
+def test_wait_until_change_holds_until_the_job_changes():
+    client = TestClient(app)
+    job_id = _queued_job(client)
+    etag = client.get(f"/v1/jobs/{job_id}").headers["ETag"]
+
+    # Nothing changes: the request is held for the whole wait, then 304
+    t0 = time.monotonic()
+    r = client.get(f"/v1/jobs/{job_id}", params={"wait": "600ms"}, headers={"If-None-Match": etag})
+    assert r.status_code == 304 and time.monotonic() - t0 >= 0.5
+
+    t = _set_status_later(job_id, "running")
+    r = client.get(f"/v1/jobs/{job_id}", params={"wait": "10s", "until": "change"}, headers={"If-None-Match": etag})
+    t.join()
+    assert r.status_code == 200 and r.json()["status"] == "running"
+
+
+def test_wait_until_change_ignores_log_events():
+    client = TestClient(app)
+    job_id = _queued_job(client)
+
+    def _log_later() -> None:
+        time.sleep(0.1)
+        with get_session() as session:
+            step = repos.get_step_by_name(session, job_id=job_id, name="generate")
+            repos.append_event(session, job_id=job_id, step_id=step.id, code="log", payload={"message": "tick"})
+
+    t = threading.Thread(target=_log_later)
+    t.start()
+    t0 = time.monotonic()
+    r = client.get(f"/v1/jobs/{job_id}", params={"wait": "600ms", "until": "change"})
+    t.join()
+    # The status body is unchanged by a log line: the request is held for the whole wait
+    assert r.status_code == 200 and r.json()["status"] == "queued"
+    assert time.monotonic() - t0 >= 0.5
+
+
+def test_wait_returns_immediately_when_state_already_matches():
+    client = TestClient(app)
+    job_id = _queued_job(client)
+    with get_session() as session:
+        repos.mark_job_status(session, job_id, "failed", error={"code": "x", "message": "x"})
+
+    for params, headers in (({"wait": "10s", "until": "terminal"}, {}), ({"wait": "10s"}, {"If-None-Match": '"stale"'})):
+        t0 = time.monotonic()
+        r = client.get(f"/v1/jobs/{job_id}", params=params, headers=headers)
+        assert r.status_code == 200 and r.json()["status"] == "failed"
+        assert time.monotonic() - t0 < 1.0
+
+
+def test_wait_validation():
+    client = TestClient(app)
+    job_id = _queued_job(client)
+    assert client.get(f"/v1/jobs/{job_id}", params={"wait": "soon"}).json()["detail"]["code"] == "invalid_input"
+    assert client.get(f"/v1/jobs/{job_id}", params={"wait": "1s", "until": "never"}).status_code == 422
+    missing = "00000000-0000-0000-0000-000000000000"
+    t0 = time.monotonic()
+    assert client.get(f"/v1/jobs/{missing}", params={"wait": "10s"}).status_code == 404
+    assert time.monotonic() - t0 < 1.0
@@ -0,0 +1,53 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from modules.persistence import notify, repos
+from modules.persistence.db import get_session
+from services.api.app import app
+
+
+def _queued_job():
+    with get_session() as session:
+        return repos.create_job_with_step(session, job_type="generate", params={"prompt": "n"}, idempotency_key=None)
+
+
+def test_commit_wakes_subscribers_and_rollback_does_not():
+    job = _queued_job()
+    sub = notify.subscribe(job.id)
+    try:
+        try:
+            with get_session() as session:
+                repos.append_event(session, job_id=job.id, step_id=None, code="test.rollback")
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        assert sub.wait(0.05) is False
+
+        with get_session() as session:
+            repos.append_event(session, job_id=job.id, step_id=None, code="test.commit")
+        assert sub.wait(1.0) is True
+    finally:
+        sub.close()
+
+
+def test_sse_stream_wakes_on_change_instead_of_polling(monkeypatch):
+    # A poll interval far longer than the test: only a change signal can end the stream quickly
+    monkeypatch.setenv("DF_SSE_POLL_MS", "60000")
+    job = _queued_job()
+
+    def _finish() -> None:
+        time.sleep(0.3)
+        with get_session() as session:
+            repos.mark_job_status(session, job.id, "succeeded")
+            repos.append_event(session, job_id=job.id, step_id=None, code="job.finish")
+
+    t = threading.Thread(target=_finish)
+    t.start()
+    t0 = time.time()
+    r = TestClient(app).get(f"/v1/jobs/{job.id}/progress/stream")
+    t.join()
+    assert r.status_code == 200
+    assert time.time() - t0 < 10
+    assert r.text.count('"code":"job.finish"') == 1
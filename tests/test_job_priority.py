@@ -0,0 +1,95 @@
+import os
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from modules.queue import producer
+from services.api.app import app
+from services.api.utils import admission
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    monkeypatch.setenv("DF_CELERY_EAGER", "false")
+    monkeypatch.setenv("DF_REDIS_URL", "memory://")
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    producer.reset()
+    admission.reset()
+    yield
+    producer.reset()
+    admission.reset()
+
+
+def _job(prompt: str, priority: str | None = None) -> dict:
+    body = {"type": "generate", "prompt": prompt, "width": 64, "height": 64, "steps": 2}
+    if priority is not None:
+        body["priority"] = priority
+    return body
+
+
+def _depths() -> dict[str, int]:
+    return {q: producer.queue_depth(q) or 0 for q in producer.PRIORITY_QUEUES.values()}
+
+
+def test_queue_for_maps_priorities():
+    assert producer.queue_for("high") == "gpu.high"
+    assert producer.queue_for("normal") == producer.DEFAULT_QUEUE
+    assert producer.queue_for("low") == "gpu.low"
+    assert producer.queue_for(None) == producer.DEFAULT_QUEUE
+    assert producer.queue_for("urgent") == producer.DEFAULT_QUEUE
+
+
+def test_priority_selects_queue_and_is_reported():
+    client = TestClient(app)
+    before = _depths()
+
+    high = client.post("/v1/jobs", json=_job("interactive", "high"))
+    assert high.status_code in (200, 202)
+    default = client.post("/v1/jobs", json=_job("plain"))
+    assert default.status_code in (200, 202)
+
+    after = _depths()
+    assert after["gpu.high"] == before["gpu.high"] + 1
+    assert after["gpu.default"] == before["gpu.default"] + 1
+    assert after["gpu.low"] == before["gpu.low"]
+
+    assert client.get(f"/v1/jobs/{high.json()['job']['id']}").json()["priority"] == "high"
+    assert client.get(f"/v1/jobs/{default.json()['job']['id']}").json()["priority"] == "normal"
+
+
+def test_batch_routes_each_entry_by_priority():
+    client = TestClient(app)
+    before = _depths()
+
+    r = client.post("/v1/jobs:batch", json={"jobs": [_job("b1", "low"), _job("b2", "high"), _job("b3", "low"), _job("b4")]})
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert all(res["job"] is not None for res in results)
+
+    after = _depths()
+    assert after["gpu.low"] - before["gpu.low"] == 2
+    assert after["gpu.high"] - before["gpu.high"] == 1
+    assert after["gpu.default"] - before["gpu.default"] == 1
+    assert client.get(f"/v1/jobs/{results[0]['job']['id']}").json()["priority"] == "low"
+
+
+def test_priority_is_part_of_idempotency_fingerprint_only_when_not_normal():
+    client = TestClient(app)
+    key = f"prio-{uuid.uuid4()}"
+    first = client.post("/v1/jobs", json=_job("idem"), headers={"Idempotency-Key": key})
+    assert first.status_code in (200, 202)
+    # An explicit default is the same request
+    same = client.post("/v1/jobs", json=_job("idem", "normal"), headers={"Idempotency-Key": key})
+    assert same.headers.get("Idempotent-Replayed") == "true"
+    assert same.json()["job"]["id"] == first.json()["job"]["id"]
+
+    other = client.post("/v1/jobs", json=_job("idem", "high"), headers={"Idempotency-Key": key})
+    assert other.status_code == 409
+
+
+def test_invalid_priority_is_rejected():
+    client = TestClient(app)
+    r = client.post("/v1/jobs", json=_job("bad", "urgent"))
+    assert r.status_code == 422
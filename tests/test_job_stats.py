@@ -0,0 +1,94 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, update
+
+from modules.persistence import repos
+from modules.persistence.db import get_session
+from modules.persistence.models import Job
+from services.api.app import app
+from services.api.routes import jobs as jobs_routes
+
+# Far enough ahead that the windows only see jobs seeded here
+NOW = datetime(2031, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    monkeypatch.setattr(jobs_routes, "_STATS_CACHE", None)
+    yield
+    # Future-dated rows would sort first in other tests' job listings
+    with get_session() as session:
+        session.execute(delete(Job).where(Job.id.in_(_SEEDED)))
+    _SEEDED.clear()
+
+
+_SEEDED: list = []
+
+
+def _job(status: str, *, created: datetime, finished: datetime | None = None) -> None:
+    with get_session() as session:
+        job = repos.create_job_with_step(session, job_type="generate", params={"prompt": "stats"}, idempotency_key=None)
+        _SEEDED.append(job.id)
+        session.execute(
+            update(Job).where(Job.id == job.id).values(status=status, created_at=created, updated_at=finished or created)
+        )
+
+
+def test_window_counts_and_durations():
+    # Succeeded within the last minute, durations 10/20/30/40 s
+    for i, d in enumerate((10, 20, 30, 40)):
+        end = NOW - timedelta(seconds=5 + i)
+        _job("succeeded", created=end - timedelta(seconds=d), finished=end)
+    # Older completions: only in the 15 minute window
+    _job("succeeded", created=NOW - timedelta(seconds=800), finished=NOW - timedelta(seconds=600))
+    _job("failed", created=NOW - timedelta(seconds=700), finished=NOW - timedelta(seconds=650))
+    _job("queued", created=NOW - timedelta(seconds=90))
+
+    with get_session() as session:
+        stats = repos.get_job_stats(session, now=NOW, windows=[900, 60])
+    w60, w900 = stats.windows
+    assert (w60.window_s, w60.succeeded, w60.failed) == (60, 4, 0)
+    assert w60.duration_p50_s == pytest.approx(25.0, abs=0.01)
+    assert w60.duration_p95_s == pytest.approx(38.5, abs=0.01)
+    assert (w900.succeeded, w900.failed) == (5, 1)
+    assert w900.duration_p95_s == pytest.approx(40 + 0.8 * (200 - 40), abs=0.01)
+    assert stats.oldest_queued_at is not None and stats.oldest_queued_at <= NOW - timedelta(seconds=90)
+    assert stats.counts[("succeeded", "generate")] >= 5
+
+
+def test_sqlite_percentiles_match_percentile_cont():
+    # Reference values from Postgres: percentile_cont(q) WITHIN GROUP (ORDER BY v)
+    assert repos._percentile_cont([], 0.5) is None
+    assert repos._percentile_cont([7.0], 0.95) == 7.0
+    values = [1.0, 2.0, 4.0, 8.0, 16.0]
+    assert repos._percentile_cont(values, 0.5) == 4.0
+    assert repos._percentile_cont(values, 0.95) == pytest.approx(14.4)
+    assert repos._percentile_cont(values, 0.0) == 1.0 and repos._percentile_cont(values, 1.0) == 16.0
+
+
+def test_stats_endpoint_cached_and_not_shadowed(query_budget, monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setenv("DF_JOBS_STATS_CACHE_S", "0")
+    before = client.get("/v1/jobs/stats").json()
+    _job("running", created=datetime.now(timezone.utc))
+
+    monkeypatch.setenv("DF_JOBS_STATS_CACHE_S", "60")
+    monkeypatch.setattr(jobs_routes, "_STATS_CACHE", None)
+    with query_budget(2, "job stats"):
+        r = client.get("/v1/jobs/stats")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["by_status"]["running"] == before["by_status"]["running"] + 1
+    assert body["by_type"]["generate"]["running"] == body["by_status"]["running"]
+    assert set(body["by_status"]) == {"queued", "running", "succeeded", "failed"}
+    assert [w["window_s"] for w in body["windows"]] == [60, 300, 900, 3600]
+
+    # Within the TTL the snapshot is served without touching the database
+    _job("running", created=datetime.now(timezone.utc))
+    with query_budget(0, "job stats (cached)"):
+        assert client.get("/v1/jobs/stats").json() == body
@@ -0,0 +1,174 @@
+import json
+import os
+import uuid
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from modules.persistence import repos
+from modules.persistence.db import get_session
+from modules.queue import producer
+from services.api.app import app
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch, tmp_path):
+    monkeypatch.setenv("DF_CELERY_EAGER", "false")
+    monkeypatch.setenv("DF_REDIS_URL", "memory://")
+    monkeypatch.setenv("DF_FAKE_RUNNER", "1")
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    monkeypatch.setenv("DF_MINIO_ENDPOINT", "http://example.invalid")
+    monkeypatch.setenv("DF_MINIO_ACCESS_KEY", "x")
+    monkeypatch.setenv("DF_MINIO_SECRET_KEY", "y")
+    monkeypatch.setenv("DF_MINIO_BUCKET", "dreamforge")
+
+    import modules.storage.s3 as s3mod
+
+    outdir = tmp_path / "s3"
+
+    def _upload_bytes(cfg, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:  # noqa: ARG001
+        p = outdir / Path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(data)
+
+    monkeypatch.setattr(s3mod, "upload_bytes", _upload_bytes)
+    producer.reset()
+    yield
+    producer.reset()
+
+
+def _job(prompt: str, **extra):
+    return {"type": "generate", "prompt": prompt, "width": 64, "height": 64, "steps": 2, **extra}
+
+
+def test_batch_creates_jobs_with_per_entry_errors(query_budget):
+    client = TestClient(app)
+    body = {
+        "jobs": [
+            _job("one"),
+            _job("bad count", count=0),
+            _job("chained", chain={"upscale": {"scale": 2, "impl": "diffusion", "strict_scale": True}}),
+            _job("chained ok", chain={"upscale": {"scale": 4}}),
+            _job("two"),
+        ]
+    }
+    with query_budget(4, "batch submit"):
+        r = client.post("/v1/jobs:batch", json=body)
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert [x["index"] for x in results] == [0, 1, 2, 3, 4]
+    assert results[1]["error"]["code"] == "invalid_input" and results[1]["job"] is None
+    assert results[2]["error"]["code"] == "invalid_input"
+    ok = [x["job"]["id"] for x in results if x["job"]]
+    assert len(ok) == 3
+
+    with get_session() as session:
+        for job_id in ok:
+            job, steps = repos.get_job_with_steps(session, job_id)
+            assert job.status == "queued"
+        _, chained_steps = repos.get_job_with_steps(session, results[3]["job"]["id"])
+    assert [s.name for s in chained_steps] == ["generate", "upscale"]
+    assert chained_steps[1].metadata_json["scale"] == 4
+
+
+def test_batch_idempotency_keys_replay_and_conflict():
+    client = TestClient(app)
+    k1, k2 = f"batch-{uuid.uuid4()}", f"batch-{uuid.uuid4()}"
+    first = client.post("/v1/jobs:batch", json={"jobs": [_job("k1", idempotency_key=k1)]}).json()["results"][0]
+    assert first["replayed"] is False
+
+    r = client.post(
+        "/v1/jobs:batch",
+        json={
+            "jobs": [
+                _job("k1", idempotency_key=k1),  # replay of the earlier request
+                _job("changed", idempotency_key=k1),  # same key, other params
+                _job("k2", idempotency_key=k2),
+                _job("k2", idempotency_key=k2),  # repeated within the batch
+            ]
+        },
+    ).json()["results"]
+    assert r[0]["replayed"] is True and r[0]["job"]["id"] == first["job"]["id"]
+    assert r[1]["error"]["code"] == "idempotency_conflict"
+    assert r[2]["replayed"] is False
+    assert r[3]["replayed"] is True and r[3]["job"]["id"] == r[2]["job"]["id"]
+
+    # The single-job endpoint shares the key space
+    single = client.post("/v1/jobs", json=_job("k2"), headers={"Idempotency-Key": k2})
+    assert single.headers.get("Idempotent-Replayed") == "true"
+    assert single.json()["job"]["id"] == r[2]["job"]["id"]
+
+
+def test_batch_repeat_of_failed_entry_reports_its_error():
+    client = TestClient(app)
+    key = f"batch-{uuid.uuid4()}"
+    assert client.post("/v1/jobs", json=_job("original"), headers={"Idempotency-Key": key}).status_code in (200, 202)
+
+    r = client.post(
+        "/v1/jobs:batch", json={"jobs": [_job("other", idempotency_key=key), _job("other", idempotency_key=key)]}
+    ).json()["results"]
+    assert r[0]["error"]["code"] == "idempotency_conflict"
+    assert r[1]["error"]["code"] == "idempotency_conflict"
+    assert r[1]["error"]["message"].startswith("duplicate of failed item 0")
+    assert r[1]["error"]["details"]["index"] == 0
+
+
+def test_batch_items_are_documented_and_validated_per_entry():
+    client = TestClient(app)
+    schema = client.get("/openapi.json").json()["components"]["schemas"]
+    items = schema["JobBatchRequest"]["properties"]["jobs"]["items"]
+    assert {"$ref": "#/components/schemas/JobBatchItem"} in items["anyOf"]
+    assert "idempotency_key" in schema["JobBatchItem"]["properties"]
+    assert "prompt" in schema["JobBatchItem"]["required"]
+
+    r = client.post("/v1/jobs:batch", json={"jobs": [_job("empty key", idempotency_key=""), _job("fine")]})
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert results[0]["error"]["code"] == "invalid_input"
+    assert results[0]["error"]["details"]["errors"][0]["loc"] == ["idempotency_key"]
+    assert results[1]["job"] is not None
+
+
+def test_batch_size_limit(monkeypatch):
+    monkeypatch.setenv("DF_JOBS_BATCH_MAX", "2")
+    client = TestClient(app)
+    r = client.post("/v1/jobs:batch", json={"jobs": [_job("a"), _job("b"), _job("c")]})
+    assert r.status_code == 422
+    assert r.json()["detail"]["code"] == "invalid_input"
+
+
+def test_batch_enqueue_failure_marks_jobs_failed(monkeypatch):
+    monkeypatch.setenv("DF_REDIS_URL", "redis://127.0.0.1:1/0")
+    monkeypatch.setenv("DF_ENQUEUE_MAX_RETRIES", "0")
+    producer.reset()
+    client = TestClient(app)
+    results = client.post("/v1/jobs:batch", json={"jobs": [_job("x"), _job("y")]}).json()["results"]
+    assert all(x["error"]["code"] == "infra_unavailable" for x in results)
+    with get_session() as session:
+        assert repos.get_job(session, results[0]["error"]["details"]["job_id"]).status == "failed"
+
+
+def test_cli_jobs_submit_streams_jsonl_in_chunks(tmp_path, monkeypatch, capsys):
+    from tools.dreamforge_cli import main as cli
+
+    client = TestClient(app)
+    calls = []
+
+    def _post(url: str, payload: dict, timeout: float):  # noqa: ARG001
+        calls.append(len(payload["jobs"]))
+        return client.post("/v1/jobs:batch", json=payload).json()
+
+    monkeypatch.setattr(cli, "_post_json", _post)
+    path = tmp_path / "jobs.jsonl"
+    lines = [json.dumps(_job(f"cli {i}")) for i in range(5)] + ["", "not json"]
+    path.write_text("\n".join(lines) + "\n")
+
+    rc = cli.main(["jobs", "submit", "--file", str(path), "--chunk-size", "2"])
+    out = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert rc == 1  # one line failed
+    assert calls == [2, 2, 1]
+    assert [o["line"] for o in out] == [1, 2, 3, 4, 5, 7]
+    assert sum(1 for o in out if o.get("job")) == 5
+    assert out[-1]["error"]["code"] == "invalid_json"
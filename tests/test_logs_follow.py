@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from modules.persistence import repos
+from modules.persistence.db import get_session
+from modules.persistence.models import Event
+from services.api.app import app
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    monkeypatch.setenv("DF_LOGS_PAGE_SIZE", "100")
+    # Follow mode must be woken by the change signal, not by polling
+    monkeypatch.setenv("DF_SSE_POLL_MS", "20000")
+
+
+def _job_with_events(n: int, *, status: str = "running") -> tuple[str, str]:
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with get_session() as session:
+        job = repos.create_job_with_step(session, job_type="generate", params={"prompt": "logs"}, idempotency_key=None)
+        step = repos.get_step_by_name(session, job_id=job.id, name="generate")
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "job_id": job.id,
+                "step_id": step.id,
+                # Pairs of events share a timestamp: the cursor must tie-break on id
+                "ts": base + timedelta(milliseconds=i // 2),
+                "code": "test.line",
+                "level": "info",
+                "payload_json": {"message": f"line {i}"},
+            }
+            for i in range(n)
+        ]
+        session.execute(insert(Event), rows)
+        repos.mark_job_status(session, job.id, status)
+        return str(job.id), str(step.id)
+
+
+def _append_then_finish(job_id: str, step_id: str, messages: list[str], delay: float = 0.3) -> threading.Thread:
+    def _run() -> None:
+        for m in messages:
+            time.sleep(delay)
+            with get_session() as session:
+                repos.append_event(session, job_id=job_id, step_id=uuid.UUID(step_id), code="test.live", payload={"message": m})
+        time.sleep(delay)
+        with get_session() as session:
+            repos.append_event(session, job_id=job_id, step_id=uuid.UUID(step_id), code="test.last", payload={"message": "bye"})
+            repos.mark_job_status(session, job_id, "succeeded")
+
+    t = threading.Thread(target=_run)
+    t.start()
+    return t
+
+
+def test_logs_page_through_large_job_in_order(query_budget):
+    job_id, _ = _job_with_events(1050, status="succeeded")
+    client = TestClient(app)
+
+    with query_budget(20, "logs 1050 events"):
+        r = client.get(f"/v1/jobs/{job_id}/logs", params={"since_ts": "2025-12-31T00:00:00Z"})
+    lines = [json.loads(x) for x in r.text.splitlines()]
+    assert len(lines) == 1050
+    order = [int(x["message"].split()[1]) // 2 for x in lines]  # timestamp rank
+    assert order == sorted(order)
+    assert len({x["message"] for x in lines}) == 1050  # no gaps or duplicates across page boundaries
+
+    r = client.get(f"/v1/jobs/{job_id}/logs", params={"tail": 150})
+    tail = [json.loads(x)["message"] for x in r.text.splitlines()]
+    assert len(tail) == 150
+    assert set(tail) == {f"line {i}" for i in range(900, 1050)}
+
+
+def test_logs_follow_streams_new_events_until_terminal():
+    job_id, step_id = _job_with_events(3)
+    client = TestClient(app)
+    t = _append_then_finish(job_id, step_id, ["a", "b"])
+    t0 = time.monotonic()
+    with client.stream("GET", f"/v1/jobs/{job_id}/logs", params={"follow": "true"}) as r:
+        lines = [json.loads(x) for x in r.iter_lines() if x.strip()]
+    t.join()
+    assert time.monotonic() - t0 < 10
+    assert [x["message"] for x in lines][-3:] == ["a", "b", "bye"]
+    assert len(lines) == 6
+
+
+def test_logs_follow_on_terminal_job_returns_backlog():
+    job_id, _ = _job_with_events(5, status="failed")
+    r = TestClient(app).get(f"/v1/jobs/{job_id}/logs", params={"follow": "true"})
+    assert len(r.text.splitlines()) == 5
+
+
+def test_cli_logs_tail_follow(capsys):
+    from tools.dreamforge_cli import main as cli
+
+    job_id, step_id = _job_with_events(2)
+    t = _append_then_finish(job_id, step_id, ["x"], delay=0.2)
+    rc = cli.main(["logs", "tail", job_id, "-f", "--poll-s", "20"])
+    t.join()
+    out = [json.loads(x) for x in capsys.readouterr().out.splitlines()]
+    assert rc == 0
+    messages = [x["message"] for x in out]
+    assert sorted(messages[:2]) == ["line 0", "line 1"]  # same ts, id order
+    assert messages[2:] == ["x", "bye"]
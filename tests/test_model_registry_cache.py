@@ -0,0 +1,92 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text, update
+
+from modules.persistence import registry_cache, repos
+from modules.persistence.db import get_session
+from modules.persistence.models import Model
+from services.api.app import app
+
+
+def _seed(name: str) -> str:
+    with get_session() as session:
+        m = repos.upsert_model(session, name=name, kind="flux-transformer", version="1", source_uri=f"hf:{name}")
+        repos.mark_model_installed(
+            session,
+            model_id=m.id,
+            local_path=f"/models/flux-transformer/{name}",
+            files_json=[{"path": "README.md"}, {"path": "w.safetensors"}],
+            installed=True,
+        )
+        # Rows persist in the dev database across runs: reset what tests change
+        repos.set_model_enabled(session, model_id=m.id, enabled=True)
+        return str(m.id)
+
+
+def test_warm_lookups_issue_no_statements(query_budget):
+    model_id = _seed("cache-warm")
+    first = registry_cache.get_model(model_id)
+    assert first is not None and first.available
+    assert first.weights_path == "/models/flux-transformer/cache-warm/w.safetensors"
+
+    with query_budget(0, "warm registry lookups"):
+        assert registry_cache.get_model(model_id) is first
+        assert registry_cache.get_model(model_id).weights_path == first.weights_path
+
+
+def test_local_registry_write_invalidates_immediately():
+    model_id = _seed("cache-local")
+    assert registry_cache.get_model(model_id).enabled is True
+
+    with get_session() as session:
+        repos.set_model_enabled(session, model_id=model_id, enabled=False)
+    assert registry_cache.get_model(model_id).enabled is False
+
+
+def test_remote_change_seen_after_version_bump(monkeypatch):
+    model_id = _seed("cache-remote")
+    assert registry_cache.get_model(model_id).local_path.endswith("cache-remote")
+
+    # Another process changes the row and bumps the version (no local commit hook fires)
+    with get_session() as session:
+        session.execute(
+            update(Model).where(Model.name == "cache-remote").values(local_path="/elsewhere")
+        )
+        session.execute(text("UPDATE registry_version SET version = version + 1 WHERE id = 1"))
+
+    # Within the TTL the snapshot is still served ...
+    monkeypatch.setenv("DF_MODEL_CACHE_TTL_S", "3600")
+    assert registry_cache.get_model(model_id).local_path.endswith("cache-remote")
+    # ... once it lapses, one version read detects the change
+    monkeypatch.setenv("DF_MODEL_CACHE_TTL_S", "0")
+    assert registry_cache.get_model(model_id).local_path == "/elsewhere"
+
+
+def test_registry_writes_bump_version():
+    with get_session() as session:
+        before = repos.get_registry_version(session)
+    _seed("cache-bump")
+    with get_session() as session:
+        # upsert, install, enable: one bump per registry write
+        assert repos.get_registry_version(session) == before + 3
+
+
+def test_snapshots_are_read_only_and_id_misses_not_cached():
+    model_id = _seed("cache-frozen")
+    m = registry_cache.get_model(model_id)
+    with pytest.raises(TypeError):
+        m.files_json[0]["path"] = "other.safetensors"  # type: ignore[index]
+    assert isinstance(m.capabilities, tuple)
+
+    missing = str(uuid.uuid4())
+    assert registry_cache.get_model(missing) is None
+    assert ("id", missing) not in registry_cache._CACHE._entries
+
+
+def test_models_api_serializes_frozen_snapshot():
+    model_id = _seed("cache-api")
+    r = TestClient(app).get(f"/v1/models/{model_id}")
+    assert r.status_code == 200
+    assert r.json()["files_json"] == [{"path": "README.md"}, {"path": "w.safetensors"}]
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+import boto3
+import pytest
+
+import modules.storage.s3 as s3mod
+
+
+@pytest.fixture(autouse=True)
+def _clean(monkeypatch):
+    monkeypatch.delenv("DF_S3_PUBLIC_ENDPOINT", raising=False)
+    monkeypatch.delenv("DF_MINIO_PUBLIC_ENDPOINT", raising=False)
+    s3mod.clear_caches()
+    yield
+    s3mod.clear_caches()
+
+
+def _cfg() -> s3mod.S3Config:
+    return s3mod.S3Config(endpoint="http://minio.internal:9000", access_key="x", secret_key="y", bucket="dreamforge", region="us-east-1")
+
+
+def _count_clients(monkeypatch) -> list[str]:
+    built: list[str] = []
+    orig = boto3.session.Session.client
+
+    def _client(self, *a, **kw):
+        built.append(kw.get("endpoint_url"))
+        return orig(self, *a, **kw)
+
+    monkeypatch.setattr(boto3.session.Session, "client", _client)
+    return built
+
+
+def test_clients_are_built_once_per_endpoint(monkeypatch):
+    built = _count_clients(monkeypatch)
+    monkeypatch.setenv("DF_S3_PUBLIC_ENDPOINT", "https://cdn.example.com")
+    cfg = _cfg()
+    for i in range(50):
+        s3mod.presign_get(cfg, f"jobs/a/{i}.png", expires=timedelta(hours=1))
+    assert s3mod.client(cfg) is s3mod.client(cfg)
+    assert built == ["https://cdn.example.com", "http://minio.internal:9000"]
+
+
+def test_presigned_urls_are_reused_within_an_expiry_bucket(monkeypatch):
+    monkeypatch.setenv("DF_PRESIGN_BUCKET_S", "300")
+    clock = [1_800_000_010.0]
+    monkeypatch.setattr(s3mod.time, "time", lambda: clock[0])
+    cfg = _cfg()
+    ttl = timedelta(seconds=3600)
+
+    first = s3mod.presign_get(cfg, "jobs/a/0.png", expires=ttl)
+    clock[0] += 200  # same bucket
+    assert s3mod.presign_get(cfg, "jobs/a/0.png", expires=ttl) == first
+    assert s3mod.presign_get(cfg, "jobs/a/1.png", expires=ttl) != first
+
+    expiry = s3mod.presign_expiry(ttl, 1_800_000_010.0)
+    assert expiry.timestamp() == 1_800_003_900  # rounded up to the bucket boundary
+    q = parse_qs(urlparse(first).query)
+    if "X-Amz-Expires" in q:  # SigV4: relative lifetime
+        assert int(q["X-Amz-Expires"][0]) >= 3600
+    else:  # SigV2 query auth: absolute expiry
+        assert int(q["Expires"][0]) == 1_800_003_900
+
+    clock[0] += 200  # next bucket: new signature, later expiry
+    assert s3mod.presign_get(cfg, "jobs/a/0.png", expires=ttl) != first
+
+
+def test_presign_cache_is_bounded_and_can_be_disabled(monkeypatch):
+    cfg = _cfg()
+    monkeypatch.setenv("DF_PRESIGN_CACHE_MAX", "3")
+    for i in range(10):
+        s3mod.presign_get(cfg, f"k{i}")
+    assert len(s3mod._URLS) == 3
+
+    s3mod.clear_caches()
+    monkeypatch.setenv("DF_PRESIGN_CACHE_MAX", "0")
+    s3mod.presign_get(cfg, "k0")
+    assert len(s3mod._URLS) == 0
+
+
+def test_artifact_listing_reports_bucketed_expiry(monkeypatch, tmp_path):
+    import os
+
+    from fastapi.testclient import TestClient
+
+    from modules.persistence import repos
+    from modules.persistence.db import get_session
+    from services.api.app import app
+
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    monkeypatch.setenv("DF_MINIO_ENDPOINT", "http://minio.internal:9000")
+    monkeypatch.setenv("DF_MINIO_ACCESS_KEY", "x")
+    monkeypatch.setenv("DF_MINIO_SECRET_KEY", "y")
+    monkeypatch.setenv("DF_MINIO_BUCKET", "dreamforge")
+    monkeypatch.setenv("DF_S3_REGION", "us-east-1")
+
+    with get_session() as session:
+        job = repos.create_job_with_step(session, job_type="generate", params={"prompt": "p", "count": 3}, idempotency_key=None)
+        step = repos.get_step_by_name(session, job_id=job.id, name="generate")
+        repos.insert_artifacts_bulk(
+            session,
+            job_id=job.id,
+            step_id=step.id,
+            artifacts=[{"format": "png", "width": 8, "height": 8, "seed": i, "item_index": i, "s3_key": f"k/{i}.png"} for i in range(3)],
+        )
+        job_id = str(job.id)
+
+    built = _count_clients(monkeypatch)
+    client = TestClient(app)
+    first = client.get(f"/v1/jobs/{job_id}/artifacts").json()["artifacts"]
+    again = client.get(f"/v1/jobs/{job_id}/artifacts").json()["artifacts"]
+    assert [a["url"] for a in first] == [a["url"] for a in again]
+    assert len(built) <= 1
+    bucket = int(os.getenv("DF_PRESIGN_BUCKET_S", "300"))
+    assert first[0]["expires_at"].endswith("Z")
+    from datetime import datetime
+
+    ts = datetime.fromisoformat(first[0]["expires_at"].replace("Z", "+00:00")).timestamp()
+    assert ts % bucket == 0
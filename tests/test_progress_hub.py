@@ -0,0 +1,179 @@
+import asyncio
+import datetime as dt
+import threading
+
+import pytest
+
+from modules.persistence import notify
+from services.api.utils.progress_hub import FeedEvent, ProgressHub, Snapshot
+
+
+class _FakeJob:
+    """Snapshot source standing in for the DB; counts how often it is queried."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.events: list[FeedEvent] = []
+        self.progress = 0.0
+        self.terminal = False
+        self._lock = threading.Lock()
+
+    def add_event(self, n: int) -> None:
+        ts = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc) + dt.timedelta(seconds=n)
+        self.events.append(FeedEvent(id=f"e{n}", ts=ts, frame=f"event: log\ndata: {n}\n\n".encode()))
+
+    def snapshot(self, job_id: str, cursor: dt.datetime | None) -> Snapshot:  # noqa: ARG002
+        with self._lock:
+            self.calls += 1
+            events = [e for e in self.events if cursor is None or e.ts >= cursor]
+            return Snapshot(events=events, progress={"progress": self.progress}, terminal=self.terminal)
+
+
+async def _collect(stream, out: list[bytes]) -> None:
+    async for frame in stream:
+        out.append(frame)
+
+
+@pytest.mark.asyncio
+async def test_many_subscribers_share_one_feed(monkeypatch):
+    monkeypatch.setenv("DF_SSE_POLL_MS", "60000")  # only notifications wake the feed
+    job = _FakeJob()
+    job.add_event(1)
+    hub = ProgressHub(job.snapshot)
+
+    outs = [[] for _ in range(20)]
+    tasks = [asyncio.create_task(_collect(hub.stream("job-a", None), o)) for o in outs]
+    await asyncio.sleep(0.1)
+    assert job.calls == 1
+
+    job.add_event(2)
+    job.progress = 0.5
+    notify.publish_local("job-a")
+    await asyncio.sleep(0.1)
+    job.progress = 1.0
+    job.terminal = True
+    notify.publish_local("job-a")
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=5)
+
+    # One snapshot per wake-up regardless of the number of subscribers
+    assert job.calls == 3
+    for out in outs:
+        body = b"".join(out)
+        assert body.count(b"data: 1\n") == 1 and body.count(b"data: 2\n") == 1
+        assert body.count(b"event: progress") == 3
+
+
+@pytest.mark.asyncio
+async def test_progress_only_emitted_on_change(monkeypatch):
+    monkeypatch.setenv("DF_SSE_POLL_MS", "20")
+    job = _FakeJob()
+    hub = ProgressHub(job.snapshot)
+    out: list[bytes] = []
+    task = asyncio.create_task(_collect(hub.stream("job-b", None), out))
+    await asyncio.sleep(0.3)  # many poll ticks, nothing changes
+    assert job.calls > 3
+    assert b"".join(out).count(b"event: progress") == 1
+
+    job.terminal = True
+    job.progress = 1.0
+    await asyncio.wait_for(task, timeout=5)
+    assert b"".join(out).count(b"event: progress") == 2
+
+
+@pytest.mark.asyncio
+async def test_late_subscriber_gets_history_since_ts(monkeypatch):
+    monkeypatch.setenv("DF_SSE_POLL_MS", "60000")
+    job = _FakeJob()
+    for n in range(1, 4):
+        job.add_event(n)
+    hub = ProgressHub(job.snapshot)
+    first: list[bytes] = []
+    t1 = asyncio.create_task(_collect(hub.stream("job-c", None), first))
+    await asyncio.sleep(0.05)
+
+    late: list[bytes] = []
+    since = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc) + dt.timedelta(seconds=2)
+    t2 = asyncio.create_task(_collect(hub.stream("job-c", since), late))
+    await asyncio.sleep(0.05)
+    assert job.calls == 1
+
+    job.terminal = True
+    notify.publish_local("job-c")
+    await asyncio.wait_for(asyncio.gather(t1, t2), timeout=5)
+    assert b"data: 1\n" not in b"".join(late)
+    assert b"data: 2\n" in b"".join(late) and b"data: 3\n" in b"".join(late)
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_detached(monkeypatch):
+    monkeypatch.setenv("DF_SSE_POLL_MS", "60000")
+    monkeypatch.setenv("DF_SSE_QUEUE_MAX", "2")
+    job = _FakeJob()
+    hub = ProgressHub(job.snapshot)
+    stream = hub.stream("job-d", None)
+    assert (await stream.__anext__()).startswith(b"event: progress")  # joined, then stops reading
+
+    for n in range(1, 6):
+        job.add_event(n)
+    notify.publish_local("job-d")
+    await asyncio.sleep(0.1)
+
+    rest = [frame async for frame in stream]
+    assert len(rest) == 3  # two queued frames, then the slow_consumer error
+    assert b"slow_consumer" in rest[-1]
+
+
+@pytest.mark.asyncio
+async def test_reconnect_right_after_close_gets_a_live_feed(monkeypatch):
+    monkeypatch.setenv("DF_SSE_POLL_MS", "60000")
+    job = _FakeJob()
+    job.add_event(1)
+    hub = ProgressHub(job.snapshot)
+
+    first = hub.stream("job-e", None)
+    assert b"data: 1\n" in await first.__anext__()
+    await first.aclose()  # cancels the feed task; it has not unwound yet
+
+    out: list[bytes] = []
+    task = asyncio.create_task(_collect(hub.stream("job-e", None), out))
+    await asyncio.sleep(0.05)
+    job.add_event(2)
+    job.terminal = True
+    notify.publish_local("job-e")
+    await asyncio.wait_for(task, timeout=5)
+    body = b"".join(out)
+    assert b"data: 1\n" in body and b"data: 2\n" in body
+
+
+@pytest.mark.asyncio
+async def test_history_is_capped_and_old_events_are_backfilled(monkeypatch):
+    monkeypatch.setenv("DF_SSE_POLL_MS", "60000")
+    monkeypatch.setenv("DF_SSE_HISTORY_MAX", "3")
+    job = _FakeJob()
+    hub = ProgressHub(job.snapshot)
+    first: list[bytes] = []
+    t1 = asyncio.create_task(_collect(hub.stream("job-f", None), first))
+    await asyncio.sleep(0.05)
+    for n in range(1, 9):
+        job.add_event(n)
+        notify.publish_local("job-f")
+        await asyncio.sleep(0.02)
+
+    feed = next(iter(hub._feeds.values()))
+    assert [e.id for e in feed.history] == ["e6", "e7", "e8"]
+    assert feed.seen == {"e6", "e7", "e8"}
+
+    late: list[bytes] = []
+    since = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc) + dt.timedelta(seconds=4)
+    t2 = asyncio.create_task(_collect(hub.stream("job-f", since), late))
+    await asyncio.sleep(0.05)
+    job.terminal = True
+    notify.publish_local("job-f")
+    await asyncio.wait_for(asyncio.gather(t1, t2), timeout=5)
+
+    body = b"".join(late)
+    assert b"data: 3\n" not in body
+    for n in range(4, 9):
+        assert body.count(f"data: {n}\n".encode()) == 1
+    assert body.index(b"data: 4\n") < body.index(b"data: 8\n")
+    assert all(b"".join(first).count(f"data: {n}\n".encode()) == 1 for n in range(1, 9))
@@ -0,0 +1,118 @@
+import os
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from modules.persistence.db import track_queries
+from services.api.app import app
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch, tmp_path):
+    monkeypatch.setenv("DF_CELERY_EAGER", "true")
+    monkeypatch.setenv("DF_FAKE_RUNNER", "1")
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    monkeypatch.setenv("DF_MINIO_ENDPOINT", "http://example.invalid")
+    monkeypatch.setenv("DF_MINIO_ACCESS_KEY", "x")
+    monkeypatch.setenv("DF_MINIO_SECRET_KEY", "y")
+    monkeypatch.setenv("DF_MINIO_BUCKET", "dreamforge")
+
+    import modules.storage.s3 as s3mod
+
+    outdir = tmp_path / "s3"
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    def _upload_bytes(cfg, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:  # noqa: ARG001
+        p = outdir / Path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(data)
+
+    monkeypatch.setattr(s3mod, "upload_bytes", _upload_bytes)
+
+
+def _route_count(route: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "df_db_statements_per_unit_count", {"scope": "route", "name": route}
+    )
+    return value or 0.0
+
+
+def test_job_routes_stay_within_statement_budget(query_budget):
+    client = TestClient(app)
+    r = client.post("/v1/jobs", json={"type": "generate", "prompt": "budget", "width": 64, "height": 64, "steps": 2})
+    assert r.status_code in (200, 202)
+    job_id = r.json()["job"]["id"]
+
+    with query_budget(2, "job detail"):
+        assert client.get(f"/v1/jobs/{job_id}").status_code == 200
+    with query_budget(4, "progress"):
+        assert client.get(f"/v1/jobs/{job_id}/progress").status_code == 200
+
+
+def test_route_metrics_use_route_template():
+    client = TestClient(app)
+    r = client.post("/v1/jobs", json={"type": "generate", "prompt": "metrics", "width": 64, "height": 64, "steps": 2})
+    job_id = r.json()["job"]["id"]
+
+    before = _route_count("GET /v1/jobs/{job_id}")
+    assert client.get(f"/v1/jobs/{job_id}").status_code == 200
+    assert _route_count("GET /v1/jobs/{job_id}") == before + 1
+
+    body = client.get("/metrics").text
+    assert 'df_db_statements_per_unit_count{name="GET /v1/jobs/{job_id}",scope="route"}' in body
+    # Raw ids never become label values
+    assert job_id not in body
+
+
+def test_task_statements_are_attributed(monkeypatch):
+    # Importing the worker app starts its metrics server once per process; use the port
+    # test_worker_health expects so test order does not matter.
+    monkeypatch.setenv("DF_WORKER_METRICS_PORT", "9010")
+    import services.worker.celery_app  # noqa: F401  (connects task_prerun/postrun hooks)
+    from services.worker.tasks.generate import generate
+
+    before = REGISTRY.get_sample_value(
+        "df_db_statements_per_unit_count", {"scope": "task", "name": "jobs.generate"}
+    ) or 0.0
+    # apply() runs the task through Celery's tracer, which fires the signals
+    generate.apply(kwargs={"job_id": "00000000-0000-0000-0000-000000000000"})
+    after = REGISTRY.get_sample_value(
+        "df_db_statements_per_unit_count", {"scope": "task", "name": "jobs.generate"}
+    )
+    assert after == before + 1
+
+
+def test_nested_tracking_counts_in_every_active_unit():
+    from sqlalchemy import text
+
+    from modules.persistence.db import get_session
+
+    with track_queries("test", "outer", export=False) as outer:
+        with track_queries("test", "inner", export=False) as inner:
+            with get_session() as session:
+                session.execute(text("SELECT 1"))
+        with get_session() as session:
+            session.execute(text("SELECT 1"))
+    assert inner.count == 1
+    assert outer.count == 2
+    assert outer.slowest_sql.startswith("SELECT 1")
+
+
+def test_failed_statements_are_counted():
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    from modules.persistence.db import get_session
+
+    with track_queries("test", "failing", export=False) as stats:
+        with pytest.raises(OperationalError):
+            with get_session() as session:
+                session.execute(text("SELECT * FROM no_such_table"))
+        with get_session() as session:
+            session.execute(text("SELECT 1"))
+            assert not session.connection().info.get("df_query_t0")
+    assert stats.count == 2
+    assert stats.slowest_sql is not None
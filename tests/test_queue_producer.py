@@ -0,0 +1,55 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from modules.queue import producer
+from services.api.app import app
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    monkeypatch.setenv("DF_CELERY_EAGER", "false")
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    monkeypatch.setenv("DF_REDIS_URL", "memory://")
+    producer.reset()
+    yield
+    producer.reset()
+
+
+def _enqueued(task: str, result: str) -> float:
+    return REGISTRY.get_sample_value("df_enqueue_total", {"task": task, "result": result}) or 0.0
+
+
+def test_producer_app_is_built_once_and_reused():
+    first = producer.producer_app()
+    before = _enqueued("jobs.generate", "ok")
+    for i in range(5):
+        producer.enqueue("jobs.generate", kwargs={"job_id": f"j{i}"})
+    assert producer.producer_app() is first
+    assert _enqueued("jobs.generate", "ok") == before + 5
+    assert REGISTRY.get_sample_value("df_enqueue_seconds_count", {"task": "jobs.generate"}) >= 5
+
+
+def test_post_jobs_enqueues_through_shared_producer():
+    client = TestClient(app)
+    before = _enqueued("jobs.generate", "ok")
+    for i in range(3):
+        r = client.post("/v1/jobs", json={"type": "generate", "prompt": f"queued {i}", "width": 64, "height": 64, "steps": 2})
+        assert r.status_code in (200, 202)
+        assert r.json()["job"]["status"] == "queued"
+    assert _enqueued("jobs.generate", "ok") == before + 3
+
+
+def test_broker_down_marks_job_failed(monkeypatch):
+    monkeypatch.setenv("DF_REDIS_URL", "redis://127.0.0.1:1/0")
+    monkeypatch.setenv("DF_ENQUEUE_MAX_RETRIES", "0")
+    producer.reset()
+    client = TestClient(app)
+    before = _enqueued("jobs.generate", "error")
+    r = client.post("/v1/jobs", json={"type": "generate", "prompt": "no broker", "width": 64, "height": 64, "steps": 2})
+    assert r.status_code == 503
+    assert r.json()["detail"]["code"] == "infra_unavailable"
+    assert _enqueued("jobs.generate", "error") == before + 1
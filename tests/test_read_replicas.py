@@ -0,0 +1,71 @@
+import os
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from modules.persistence import db, repos
+from services.api.app import app
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch, tmp_path):
+    monkeypatch.setenv("DF_CELERY_EAGER", "true")
+    monkeypatch.setenv("DF_FAKE_RUNNER", "1")
+    if os.getenv("DF_DB_URL"):
+        monkeypatch.delenv("DF_DB_URL", raising=False)
+    monkeypatch.setenv("DF_MINIO_ENDPOINT", "http://example.invalid")
+    monkeypatch.setenv("DF_MINIO_ACCESS_KEY", "x")
+    monkeypatch.setenv("DF_MINIO_SECRET_KEY", "y")
+    monkeypatch.setenv("DF_MINIO_BUCKET", "dreamforge")
+
+    import modules.storage.s3 as s3mod
+
+    def _upload_bytes(cfg, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:  # noqa: ARG001
+        p = tmp_path / "s3" / Path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(data)
+
+    monkeypatch.setattr(s3mod, "upload_bytes", _upload_bytes)
+
+    # An empty SQLite file stands in for a replica that has not caught up yet
+    db.configure_replicas([f"sqlite+pysqlite:///{tmp_path / 'replica.sqlite3'}"])
+    yield
+    db.configure_replicas([])
+    db._RECENT_WRITES.clear()
+
+
+def test_reads_route_to_replica_unless_pinned():
+    with db.get_read_session() as session:
+        assert db.on_replica(session)
+    db.note_write("job-1")
+    with db.get_read_session(sticky_key="job-1") as session:
+        assert not db.on_replica(session)
+
+
+def test_read_your_writes_after_create():
+    client = TestClient(app)
+    r = client.post("/v1/jobs", json={"type": "generate", "prompt": "rr", "width": 64, "height": 64, "steps": 2})
+    job_id = r.json()["job"]["id"]
+    # Job only exists on the primary; pinned reads must still find it
+    assert client.get(f"/v1/jobs/{job_id}").status_code == 200
+    assert client.get(f"/v1/jobs/{job_id}/progress").status_code == 200
+
+
+def test_replica_miss_falls_back_to_primary():
+    with db.get_session() as session:
+        job = repos.create_job_with_step(session, job_type="generate", params={"prompt": "x"}, idempotency_key=None)
+    client = TestClient(app)
+    # Not pinned (created outside this API process) and absent on the replica
+    r = client.get(f"/v1/jobs/{job.id}")
+    assert r.status_code == 200
+    assert r.json()["id"] == str(job.id)
+    assert db._pinned_to_primary(str(job.id))
+
+
+def test_lagging_replica_is_skipped(monkeypatch):
+    monkeypatch.setenv("DF_DB_REPLICA_MAX_LAG_S", "1")
+    db._REPLICAS[0].lag_s = 30.0
+    db._REPLICAS[0].checked_at = 1e18  # suppress the refresh
+    with db.get_read_session() as session:
+        assert not db.on_replica(session)
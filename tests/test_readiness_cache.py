@@ -0,0 +1,145 @@
+import asyncio
+import os
+import time
+
+import httpx
+import pytest
+import sqlalchemy.exc
+
+from modules.storage import s3 as s3mod
+from services.api.app import app
+from services.api.config import Settings
+from services.api.utils import readiness
+
+
+class _FakeS3:
+    def __init__(self) -> None:
+        self.heads = 0
+
+    def head_bucket(self, Bucket: str) -> None:  # noqa: N803 - boto3 signature
+        self.heads += 1
+
+
+@pytest.fixture()
+def deps(monkeypatch, tmp_path):
+    monkeypatch.setenv("DF_READY_CHECKS", "db,s3")
+    monkeypatch.setenv("DF_DB_URL", f"sqlite:///{tmp_path / 'ready.sqlite3'}")
+    for name, value in {
+        "DF_MINIO_ENDPOINT": "http://minio:9000",
+        "DF_MINIO_ACCESS_KEY": "k",
+        "DF_MINIO_SECRET_KEY": "s",
+        "DF_MINIO_BUCKET": "b",
+    }.items():
+        monkeypatch.setenv(name, value)
+    pings = {"n": 0, "fail": False, "urls": []}
+    real_ping = readiness._ping_db
+
+    def ping(url: str) -> None:
+        pings["n"] += 1
+        pings["urls"].append(url)
+        time.sleep(0.05)
+        if pings["fail"]:
+            raise RuntimeError("db down")
+        real_ping(url)
+
+    monkeypatch.setattr(readiness, "_ping_db", ping)
+    fake = _FakeS3()
+    monkeypatch.setattr(s3mod, "client", lambda cfg: fake)
+    readiness.reset()
+    yield pings, fake
+    readiness.reset()
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_probes_share_one_check(deps, monkeypatch):
+    pings, fake = deps
+    monkeypatch.setenv("DF_READY_CACHE_S", "60")
+    async with _client() as client:
+        responses = await asyncio.gather(*(client.get("/readyz") for _ in range(20)))
+        assert all(r.status_code == 200 for r in responses)
+        assert pings["n"] == 1 and fake.heads == 1
+
+        metrics = (await client.get("/metrics")).text
+        assert 'df_api_ready_check_seconds_count{dependency="db"}' in metrics
+        assert 'df_api_ready_check_up{dependency="s3"} 1.0' in metrics
+
+
+@pytest.mark.asyncio
+async def test_stale_result_served_while_refreshing(deps, monkeypatch):
+    pings, _ = deps
+    monkeypatch.setenv("DF_READY_CACHE_S", "0")
+    monkeypatch.setenv("DF_READY_STALE_S", "60")
+    async with _client() as client:
+        assert (await client.get("/readyz")).status_code == 200
+        pings["fail"] = True
+
+        # Stale but within the grace window: answered from cache, refresh runs behind
+        start = time.monotonic()
+        assert (await client.get("/readyz")).status_code == 200
+        assert time.monotonic() - start < 0.05
+        for _ in range(100):
+            if pings["n"] >= 2 and not readiness._CHECKS["db"]._refreshing:
+                break
+            await asyncio.sleep(0.01)
+
+        r = await client.get("/readyz")
+        assert r.status_code == 503
+        assert "db: db down" in r.text
+
+
+@pytest.mark.asyncio
+async def test_expired_result_is_checked_inline(deps, monkeypatch):
+    pings, _ = deps
+    monkeypatch.setenv("DF_READY_CACHE_S", "0")
+    monkeypatch.setenv("DF_READY_STALE_S", "0")
+    url = os.environ["DF_DB_URL"]
+    monkeypatch.delenv("DF_DB_URL")
+    monkeypatch.setattr(readiness, "get_settings", lambda: Settings(db_url=None))
+    async with _client() as client:
+        r = await client.get("/readyz")
+        assert r.status_code == 503 and "DF_DB_URL not set" in r.text
+        monkeypatch.setenv("DF_DB_URL", url)
+        assert (await client.get("/readyz")).status_code == 200
+        assert pings["n"] == 1
+
+
+@pytest.mark.asyncio
+async def test_settings_fallbacks_when_env_unset(deps, monkeypatch, tmp_path):
+    pings, fake = deps
+    for name in ("DF_DB_URL", "DF_MINIO_ENDPOINT", "DF_MINIO_ACCESS_KEY", "DF_MINIO_SECRET_KEY", "DF_MINIO_BUCKET"):
+        monkeypatch.delenv(name)
+    settings = Settings(
+        db_url=f"sqlite:///{tmp_path / 'settings.sqlite3'}",
+        s3_endpoint="http://minio:9000",
+        s3_access_key="k",
+        s3_secret_key="s",
+        s3_bucket="b",
+    )
+    monkeypatch.setattr(readiness, "get_settings", lambda: settings)
+    async with _client() as client:
+        assert (await client.get("/readyz")).status_code == 200
+    assert pings["urls"] == [settings.db_url] and fake.heads == 1
+
+
+def test_db_probe_fails_fast_when_its_pool_is_busy(monkeypatch, tmp_path):
+    monkeypatch.setenv("DF_READY_DB_TIMEOUT_S", "0.2")
+    url = f"sqlite:///{tmp_path / 'busy.sqlite3'}"
+    with readiness._probe_engine(url).connect():
+        start = time.monotonic()
+        with pytest.raises(sqlalchemy.exc.TimeoutError):
+            readiness._ping_db(url)
+        assert time.monotonic() - start < 1.0
+    readiness._ping_db(url)
+
+
+def test_db_probe_bounds_postgres_connect_and_statement(monkeypatch):
+    monkeypatch.setenv("DF_READY_DB_TIMEOUT_S", "1")
+    calls = []
+    monkeypatch.setattr(readiness, "create_engine", lambda url, **kw: calls.append(kw) or object())
+    readiness._probe_engine("postgresql+psycopg://u:p@db-probe-test:5432/df")
+    assert calls[0]["pool_timeout"] == 1.0 and calls[0]["pool_size"] == 1 and calls[0]["max_overflow"] == 0
+    assert calls[0]["connect_args"] == {"connect_timeout": 1, "options": "-c statement_timeout=1000"}
@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from .main import main
+import os
+
+# Select CLI pool defaults before the persistence engine is created.
+os.environ.setdefault("DF_DB_ROLE", "cli")
+
+from .main import main  # noqa: E402
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -40,16 +40,16 @@ def cmd_jobs_list(args: argparse.Namespace) -> int:
 
 def cmd_jobs_get(args: argparse.Namespace) -> int:
     with get_session() as session:
-        job, steps = repos.get_job_with_steps(session, args.id)
-        if not job:
-            print(json.dumps({"error": {"code": "not_found", "message": "job not found"}}))
-            return 2
-        arts = repos.list_artifacts_by_job(session, job.id)
+        detail = repos.get_job_detail(session, args.id)
+    if not detail:
+        print(json.dumps({"error": {"code": "not_found", "message": "job not found"}}))
+        return 2
+    job, steps = detail.job, detail.steps
     try:
         count = int(job.params_json.get("count", 1)) if isinstance(job.params_json, dict) else 1
     except Exception:
         count = 1
-    summary = {"count": max(1, min(count, 100)), "completed": len(arts)}
+    summary = {"count": max(1, min(count, 100)), "completed": detail.artifact_count}
     payload = {
         "id": str(job.id),
         "type": job.type,
@@ -112,27 +112,153 @@ def _parse_since_ts(value: str | None) -> dt.datetime | None:
         return None
 
 
+def _logline(e) -> dict:
+    line = {
+        "ts": _iso(e.ts),
+        "level": e.level,
+        "code": e.code,
+        "message": e.payload_json.get("message") if isinstance(e.payload_json, dict) else e.code,
+        "job_id": str(e.job_id),
+        **({"step_id": str(e.step_id)} if e.step_id else {}),
+    }
+    if isinstance(e.payload_json, dict) and "item_index" in e.payload_json:
+        line["item_index"] = e.payload_json.get("item_index")
+    return line
+
+
 def cmd_logs_tail(args: argparse.Namespace) -> int:
+    from modules.persistence import notify
+
     with get_session() as session:
         job = repos.get_job(session, args.job_id)
         if not job:
             print(json.dumps({"error": {"code": "not_found", "message": "job not found"}}))
             return 2
-        since = _parse_since_ts(args.since_ts)
-        tail = int(args.tail) if args.tail else None
-        events = repos.iter_events(session, args.job_id, since_ts=since, tail=tail)
-    for e in events:
-        line = {
-            "ts": _iso(e.ts),
-            "level": e.level,
-            "code": e.code,
-            "message": e.payload_json.get("message") if isinstance(e.payload_json, dict) else e.code,
-            "job_id": str(e.job_id),
-            **({"step_id": str(e.step_id)} if e.step_id else {}),
-        }
-        if isinstance(e.payload_json, dict) and "item_index" in e.payload_json:
-            line["item_index"] = e.payload_json.get("item_index")
-        sys.stdout.write(json.dumps(line) + "\n")
+    since = _parse_since_ts(args.since_ts)
+    tail = int(args.tail) if args.tail else None
+    follow = bool(args.follow)
+    page_size = max(1, int(os.getenv("DF_LOGS_PAGE_SIZE", "500")))
+    poll_s = float(args.poll_s)
+
+    # Same keyset cursor as the API stream; -f waits on the job change signal (LISTEN on Postgres)
+    sub = notify.subscribe(args.job_id) if follow else None
+    if follow:
+        notify.start_listener()
+    cursor = None
+    first = True
+    try:
+        while True:
+            with get_session() as session:
+                status = repos.get_job_status(session, args.job_id) if follow else None
+                if first and since is None and tail:
+                    cursor = repos.tail_cursor(session, args.job_id, tail)
+                events = repos.page_events(session, args.job_id, after=cursor, since_ts=since, limit=page_size)
+                lines = [_logline(e) for e in events]
+            first = False
+            if events:
+                cursor = repos.EventCursor(ts=events[-1].ts, id=events[-1].id)
+            for line in lines:
+                sys.stdout.write(json.dumps(line) + "\n")
+            sys.stdout.flush()
+            if len(events) == page_size:
+                continue
+            if sub is None or status is None or status in {"succeeded", "failed"}:
+                return 0
+            sub.wait(poll_s)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        if sub is not None:
+            sub.close()
+
+
+def _post_json(url: str, payload: dict, timeout: float) -> dict:
+    import urllib.error
+    import urllib.request
+
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json", "Accept": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read())
+    except urllib.error.HTTPError as exc:
+        body = json.loads(exc.read() or b"{}")
+        detail = body.get("detail") if isinstance(body, dict) else None
+        raise RuntimeError(json.dumps(detail) if detail else f"HTTP {exc.code}") from exc
+
+
+def _iter_jsonl_chunks(path: str, size: int):
+    """Yield ``[(line_no, obj_or_error), ...]`` chunks without loading the whole file."""
+    chunk: list[tuple[int, object]] = []
+    fh = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for n, raw in enumerate(fh, start=1):
+            if not raw.strip():
+                continue
+            try:
+                chunk.append((n, json.loads(raw)))
+            except json.JSONDecodeError as exc:
+                chunk.append((n, exc))
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+
+
+def cmd_jobs_submit(args: argparse.Namespace) -> int:
+    api = (args.api or os.getenv("DF_API_BASE") or "http://127.0.0.1:8001").rstrip("/")
+    size = max(1, int(args.chunk_size))
+    failed = 0
+    for chunk in _iter_jsonl_chunks(args.file, size):
+        out: dict[int, dict] = {}
+        batch = []
+        for n, obj in chunk:
+            if isinstance(obj, Exception):
+                out[n] = {"line": n, "error": {"code": "invalid_json", "message": str(obj)}}
+            else:
+                batch.append((n, obj))
+        if batch:
+            try:
+                resp = _post_json(f"{api}/v1/jobs:batch", {"jobs": [o for _, o in batch]}, float(args.timeout))
+                for r in resp.get("results", []):
+                    n = batch[int(r["index"])][0]
+                    out[n] = {"line": n, **{k: v for k, v in r.items() if k != "index" and v is not None}}
+            except Exception as exc:  # noqa: BLE001
+                for n, _ in batch:
+                    out[n] = {"line": n, "error": {"code": "request_failed", "message": str(exc)}}
+        for n in sorted(out):
+            failed += 1 if "error" in out[n] else 0
+            sys.stdout.write(json.dumps(out[n]) + "\n")
+        sys.stdout.flush()
+    return 1 if failed else 0
+
+
+def cmd_archive_run(args: argparse.Namespace) -> int:
+    from modules.persistence import archive
+
+    days = float(args.older_than_days) if args.older_than_days is not None else archive.archive_after_days()
+    if days <= 0:
+        print(json.dumps({"error": {"code": "invalid_input", "message": "--older-than-days (or DF_ARCHIVE_AFTER_DAYS) must be > 0"}}))
+        return 2
+    try:
+        report = archive.run_archive(
+            older_than_days=days,
+            batch_size=int(args.batch_size),
+            max_batches=int(args.max_batches) if args.max_batches is not None else None,
+            dry_run=bool(args.dry_run),
+        )
+    except Exception as exc:  # noqa: BLE001
+        print(json.dumps({"error": {"code": "archive_failed", "message": str(exc)}}))
+        return 1
+    print(json.dumps({"cutoff": report.cutoff, "dry_run": report.dry_run, "archived": report.archived, "batches": report.batches, "keys": report.keys}))
     return 0
 
 
@@ -228,6 +354,13 @@ def build_parser() -> argparse.ArgumentParser:
     p_jg.add_argument("id", help="Job UUID")
     p_jg.set_defaults(func=cmd_jobs_get)
 
+    p_js = spj.add_parser("submit", help="Submit jobs from a JSONL file via POST /v1/jobs:batch (NDJSON results)")
+    p_js.add_argument("--file", required=True, help="JSONL file, one job request per line ('-' for stdin)")
+    p_js.add_argument("--chunk-size", default=100, help="Jobs per batch request")
+    p_js.add_argument("--api", default=None, help="API base URL (default: DF_API_BASE or http://127.0.0.1:8001)")
+    p_js.add_argument("--timeout", default=30, help="Per-request timeout in seconds")
+    p_js.set_defaults(func=cmd_jobs_submit)
+
     # artifacts
     p_art = sp.add_parser("artifacts", help="Browse artifacts")
     spa2 = p_art.add_subparsers(dest="subcmd")
@@ -244,8 +377,20 @@ def build_parser() -> argparse.ArgumentParser:
     p_tail.add_argument("job_id", help="Job UUID")
     p_tail.add_argument("--tail", default=None, help="Last N events")
     p_tail.add_argument("--since-ts", default=None, help="ISO timestamp (e.g., 2025-09-18T04:00:00Z)")
+    p_tail.add_argument("-f", "--follow", action="store_true", help="Keep printing new events until the job is terminal")
+    p_tail.add_argument("--poll-s", default=1.0, help="With -f: re-check interval when no change signal arrives")
     p_tail.set_defaults(func=cmd_logs_tail)
 
+    # archive
+    p_archive = sp.add_parser("archive", help="Cold archival of terminal jobs")
+    spar = p_archive.add_subparsers(dest="subcmd")
+    p_ar = spar.add_parser("run", help="Export old succeeded/failed jobs to the bucket and delete their rows")
+    p_ar.add_argument("--older-than-days", default=None, help="Age threshold (default: DF_ARCHIVE_AFTER_DAYS)")
+    p_ar.add_argument("--batch-size", default=100, help="Jobs per export/delete transaction")
+    p_ar.add_argument("--max-batches", default=None, help="Stop after N batches")
+    p_ar.add_argument("--dry-run", action="store_true", help="List keys for the first batch without writing")
+    p_ar.set_defaults(func=cmd_archive_run)
+
     return p
 
 